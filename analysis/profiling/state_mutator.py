@@ -0,0 +1,93 @@
+"""Measures how many times per second the StateMutator can apply and reverse a sequence of instructions
+
+Instructions given to `apply` are compiled every time, which is how they were always applied.
+Instructions given to `apply_compiled` are compiled once, which is how the search applies outcomes it re-uses
+
+The numbers are printed next to RECORDED_BASELINE: the instruction tuples applied by the mutator before it kept a hash,
+compiled its instructions, or told the evaluation what changed. To compare on another machine, re-measure the baseline
+by running the "instruction tuples" case against that version of the mutator"""
+import time
+import timeit
+from collections import defaultdict
+
+import constants
+from showdown.search.objects import State
+from showdown.search.objects import Side
+from showdown.state.pokemon import Pokemon as StatePokemon
+from showdown.search.objects import Pokemon
+from showdown.search.state_mutator import StateMutator
+from showdown.search.state_mutator import compile_instructions
+
+
+NUMBER = 20000
+REPEAT = 5
+
+# apply+reverse per second of the instruction tuples by the original mutator, measured with this script on a 1-CPU machine
+RECORDED_BASELINE = 48000
+
+state = State(
+    Side(
+        Pokemon.from_state_pokemon_dict(StatePokemon("pikachu", 100).to_dict()),
+        {
+            "rattata": Pokemon.from_state_pokemon_dict(StatePokemon("rattata", 100).to_dict()),
+        },
+        defaultdict(int),
+        False
+    ),
+    Side(
+        Pokemon.from_state_pokemon_dict(StatePokemon("pikachu", 100).to_dict()),
+        dict(),
+        defaultdict(int),
+        False
+    ),
+    None,
+    None,
+    False,
+    False
+)
+state.self.active.moves = [
+    {
+        'id': 'return',
+        'disabled': False,
+        'current_pp': 16
+    }
+]
+
+# the same instructions as tests/test_state_mutator.py
+instructions = [
+    (constants.MUTATOR_DAMAGE, constants.SELF, 25),
+    (constants.MUTATOR_HEAL, constants.OPPONENT, 10),
+    (constants.MUTATOR_BOOST, constants.SELF, constants.ATTACK, 2),
+    (constants.MUTATOR_UNBOOST, constants.OPPONENT, constants.SPEED, 1),
+    (constants.MUTATOR_APPLY_STATUS, constants.OPPONENT, constants.BURN),
+    (constants.MUTATOR_APPLY_VOLATILE_STATUS, constants.SELF, constants.CONFUSION),
+    (constants.MUTATOR_SIDE_START, constants.OPPONENT, constants.SPIKES, 1),
+    (constants.MUTATOR_DISABLE_MOVE, constants.SELF, "return"),
+    (constants.MUTATOR_ENABLE_MOVE, constants.SELF, "return"),
+    (constants.MUTATOR_REMOVE_VOLATILE_STATUS, constants.SELF, constants.CONFUSION),
+    (constants.MUTATOR_SWITCH, constants.SELF, "pikachu", "rattata"),
+    (constants.MUTATOR_DAMAGE, constants.SELF, 10),
+    (constants.MUTATOR_SIDE_END, constants.OPPONENT, constants.SPIKES, 1),
+    (constants.MUTATOR_REMOVE_STATUS, constants.OPPONENT, constants.BURN),
+]
+compiled_instructions = compile_instructions(instructions)
+
+mutator = StateMutator(state)
+
+
+def apply_and_reverse():
+    mutator.apply(instructions)
+    mutator.reverse(instructions)
+
+
+def apply_and_reverse_compiled():
+    mutator.apply_compiled(compiled_instructions)
+    mutator.reverse_compiled(compiled_instructions)
+
+
+for name, function in (("instruction tuples", apply_and_reverse), ("compiled instructions", apply_and_reverse_compiled)):
+    seconds = min(timeit.Timer(function, timer=time.process_time).repeat(number=NUMBER, repeat=REPEAT))
+    per_second = round(NUMBER / seconds)
+    print("{}: {} apply+reverse per second ({:.2f}x the recorded baseline of {})".format(
+        name, per_second, per_second / RECORDED_BASELINE, RECORDED_BASELINE
+    ))
@@ -4,6 +4,65 @@ import logging
 
 damage_calc_type = 'average'
 
+# the outcomes of a pair of moves with a probability below `branch_probability_floor` are not searched,
+# and only the `max_branches` most likely outcomes are searched. The probability of the outcomes that are
+# not searched is shared out between the ones that are
+branch_probability_floor = 0
+max_branches = None
+
+# "expectiminimax" searches every move to a fixed depth, "mcts" uses Monte-Carlo tree search
+search_engine = 'expectiminimax'
+
+# the search depth used when there is no time budget
+search_depth = 2
+
+# when there is a time budget the search deepens until it runs out of time or reaches `max_search_depth`
+# if the battle timer is on, the budget is `timer_budget_fraction` of the time left for the turn
+# (or `search_time_budget` if that is smaller)
+search_time_budget = None
+max_search_depth = 4
+timer_budget_fraction = 0.25
+
+# the number of threads that decisions are searched on, and the number of processes that the root of
+# each search is split across. 0 processes searches in the same process that is running the battle
+# decisions are searched one at a time, so the threads never use the (unlocked) caches at the same time
+search_threads = 1
+search_processes = 0
+
+# prune the parts of the search that cannot change the score of a move. This does not change any scores
+search_pruning = True
+
+# order the options in a pruned search so that the strongest options are searched first
+move_ordering = True
+
+# MCTS runs `mcts_iterations` iterations (or until the time budget is used up) that each look `mcts_max_depth` turns ahead
+mcts_iterations = 2000
+mcts_max_depth = 4
+mcts_exploration = 100
+
+transposition_table_size = 10000
+
+# the instructions generated for a state and a pair of moves are cached for the whole battle
+# the cache holds at most `instruction_cache_size` states and `instruction_cache_max_instructions` instructions
+# 0 turns the cache off
+instruction_cache_size = 100000
+instruction_cache_max_instructions = 2000000
+
+# the score of each pokemon is cached for the whole battle
+evaluation_cache_size = 100000
+
+# the damage rolls of each attack are cached for the whole battle
+damage_cache_size = 10000
+
+# the weights that states are scored with. `evaluation_file` is a JSON file of named weight sets (see evaluations.py)
+# and `evaluation` is the name of the one to use. When it is None, the one named after the format is used if there is one
+evaluation_file = None
+evaluation = None
+
+# check the state hash and the evaluation that the search keeps up to date against a full re-computation after
+# every instruction. This is slow, and is only for finding instructions that do not update them correctly
+debug_state_hash = False
+
 save_replay = False
 log_to_file = False
 logging_directory = "{}/{}".format(os.getcwd(), "logs/")
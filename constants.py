@@ -4,10 +4,15 @@ SEARCH_LADDER = "SEARCH_LADDER"
 BOT_MODES = [CHALLENGE_USER, ACCEPT_CHALLENGE, SEARCH_LADDER]
 DEFAULT_MODE = "gen7randombattle"
 
+EXPECTIMINIMAX = "expectiminimax"
+MCTS = "mcts"
+SEARCH_ENGINES = [EXPECTIMINIMAX, MCTS]
+
 START_STRING = "|start"
 RQID = 'rqid'
 TEAM_PREVIEW_POKE = "poke"
 START_TEAM_PREVIEW = "clearpoke"
+TIMER_TIME_LEFT_REGEX = r"Time left: (\d+) sec this turn"
 
 UNKOWN_POKEMON_FORMES = ['silvally', 'arceus']
 
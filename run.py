@@ -5,9 +5,12 @@ import config
 from config import logger
 
 from data.mods.apply_mods import apply_mods
+from showdown.evaluate_state.evaluations import apply_evaluation
 
 from teams import load_team
 from showdown.run_battle import pokemon_battle
+from showdown.search_service import SearchService
+from showdown.search.move_plan import build_move_plans
 from websocket_communication import PSWebsocketClient
 
 import json
@@ -21,6 +24,27 @@ async def showdown():
     env.read_env()
     config.log_to_file = env.bool("LOG_TO_FILE", config.log_to_file)
     config.save_replay = env.bool("SAVE_REPLAY", config.save_replay)
+    config.search_engine = env("SEARCH_ENGINE", config.search_engine)
+    config.branch_probability_floor = env.float("BRANCH_PROBABILITY_FLOOR", config.branch_probability_floor)
+    config.max_branches = env.int("MAX_BRANCHES", config.max_branches)
+    config.search_depth = env.int("SEARCH_DEPTH", config.search_depth)
+    config.search_time_budget = env.float("SEARCH_TIME_BUDGET", config.search_time_budget)
+    config.max_search_depth = env.int("MAX_SEARCH_DEPTH", config.max_search_depth)
+    config.search_threads = env.int("SEARCH_THREADS", config.search_threads)
+    config.search_processes = env.int("SEARCH_PROCESSES", config.search_processes)
+    config.search_pruning = env.bool("SEARCH_PRUNING", config.search_pruning)
+    config.move_ordering = env.bool("MOVE_ORDERING", config.move_ordering)
+    config.mcts_iterations = env.int("MCTS_ITERATIONS", config.mcts_iterations)
+    config.mcts_max_depth = env.int("MCTS_MAX_DEPTH", config.mcts_max_depth)
+    config.mcts_exploration = env.float("MCTS_EXPLORATION", config.mcts_exploration)
+    config.transposition_table_size = env.int("TRANSPOSITION_TABLE_SIZE", config.transposition_table_size)
+    config.instruction_cache_size = env.int("INSTRUCTION_CACHE_SIZE", config.instruction_cache_size)
+    config.instruction_cache_max_instructions = env.int("INSTRUCTION_CACHE_MAX_INSTRUCTIONS", config.instruction_cache_max_instructions)
+    config.evaluation_cache_size = env.int("EVALUATION_CACHE_SIZE", config.evaluation_cache_size)
+    config.damage_cache_size = env.int("DAMAGE_CACHE_SIZE", config.damage_cache_size)
+    config.evaluation_file = env("EVALUATION_FILE", config.evaluation_file)
+    config.evaluation = env("EVALUATION", config.evaluation)
+    config.debug_state_hash = env.bool("DEBUG_STATE_HASH", config.debug_state_hash)
     logger.setLevel(env("LOG_LEVEL", "DEBUG"))
     websocket_uri = env("WEBSOCKET_URI", "sim.smogon.com:8000")
     username = env("PS_USERNAME")
@@ -31,12 +55,19 @@ async def showdown():
     run_count = int(env("RUN_COUNT", 1))
 
     apply_mods(pokemon_mode)
+    apply_evaluation(pokemon_mode)
+    build_move_plans()
     original_pokedex = deepcopy(pokedex)
     original_move_json = deepcopy(all_move_json)
 
     if bot_mode not in constants.BOT_MODES:
         raise ValueError("{} is not a valid bot mode".format(bot_mode))
 
+    if config.search_engine not in constants.SEARCH_ENGINES:
+        raise ValueError("{} is not a valid search engine".format(config.search_engine))
+
+    search_service = SearchService(pokemon_mode, config.search_threads, config.search_processes)
+
     ps_websocket_client = await PSWebsocketClient.create(username, password, websocket_uri)
     await ps_websocket_client.login()
 
@@ -57,7 +88,7 @@ async def showdown():
             raise ValueError("Invalid Bot Mode")
 
         is_random_battle = "random" in pokemon_mode
-        winner = await pokemon_battle(ps_websocket_client, is_random_battle)
+        winner = await pokemon_battle(ps_websocket_client, is_random_battle, search_service)
 
         if winner == username:
             wins += 1
@@ -86,6 +117,8 @@ async def showdown():
         if battles_run >= run_count:
             break
 
+    search_service.shutdown()
+
 
 if __name__ == "__main__":
     asyncio.get_event_loop().run_until_complete(showdown())
@@ -1,13 +1,17 @@
 from .damage_calculator import DamageCalculator
 from .damage_calculator import damage_multipication_array
 from .damage_calculator import pokemon_type_indicies
+from .damage_calculator import type_pair_index
+from .damage_calculator import type_effectiveness_table
+from .damage_calculator import get_type_effectiveness
+from .batch_damage_calculator import calculate_damage_batch
 
 
 def _get_damage_multiplier(move_type, defending_pokemon_types):
-    multiplier = 1
-    for pkmn_type in defending_pokemon_types:
-        multiplier *= damage_multipication_array[pokemon_type_indicies[move_type]][pokemon_type_indicies[pkmn_type]]
-    return multiplier
+    """`defending_pokemon_types` is a list of types or the `type_pair` of a pokemon"""
+    if not isinstance(defending_pokemon_types, int):
+        defending_pokemon_types = type_pair_index(defending_pokemon_types)
+    return get_type_effectiveness(move_type, defending_pokemon_types)
 
 
 def is_super_effective(move_type, defending_pokemon_types):
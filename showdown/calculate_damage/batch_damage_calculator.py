@@ -0,0 +1,206 @@
+import numpy as np
+
+import constants
+from showdown.helpers import boost_multiplier_lookup
+from .damage_calculator import damage_multipication_array
+from .damage_calculator import pokemon_type_indicies
+from .damage_calculator import clean_string
+from .damage_calculator import type_index
+from .damage_calculator import DamageCalculator
+
+
+TYPE_EFFECTIVENESS = np.array(damage_multipication_array)
+
+# indexed by a boost + 6
+BOOST_MULTIPLIERS = np.array([boost_multiplier_lookup[boost] for boost in range(-6, 7)])
+
+# the damage roll multipliers of each calc_type, in the same order as DamageCalculator._get_damage_rolls
+DAMAGE_ROLLS = {
+    'average': (0.925,),
+    'max': (1,),
+    'min_max': (0.85, 1),
+    'min_max_average': (0.85, 0.925, 1),
+    'all': (0.85, 0.86, 0.87, 0.88, 0.89, 0.90, 0.91, 0.92, 0.93, 0.94, 0.95, 0.96, 0.97, 0.98, 0.99, 1),
+}
+
+# the column of each category in the stat arrays
+PHYSICAL = 0
+SPECIAL = 1
+CATEGORY_INDEXES = {
+    constants.PHYSICAL: PHYSICAL,
+    constants.SPECIAL: SPECIAL
+}
+
+# pads the types of a pokemon that has fewer types than the others
+NO_TYPE = -1
+
+
+class PokemonArrays:
+    """The values that a damage calculation reads from each of a list of pokemon
+
+       `attack` and `defense` hold the boosted physical and special stat of each pokemon in their two columns.
+       `types` holds the type indexes of each pokemon, padded with NO_TYPE"""
+
+    __slots__ = ('level', 'attack', 'defense', 'types', 'burned', 'rock')
+
+    def __init__(self, level, attack, defense, types, burned, rock):
+        self.level = level
+        self.attack = attack
+        self.defense = defense
+        self.types = types
+        self.burned = burned
+        self.rock = rock
+
+    @classmethod
+    def from_pokemon(cls, pokemon):
+        type_count = max((len(pkmn.types) for pkmn in pokemon), default=1)
+        return PokemonArrays(
+            np.array([pkmn.level for pkmn in pokemon], dtype=float),
+            _boosted_stats(pokemon, ('attack', 'attack_boost'), ('special_attack', 'special_attack_boost')),
+            _boosted_stats(pokemon, ('defense', 'defense_boost'), ('special_defense', 'special_defense_boost')),
+            np.array(
+                [
+                    [type_index(t) for t in pkmn.types] + [NO_TYPE] * (type_count - len(pkmn.types))
+                    for pkmn in pokemon
+                ],
+                dtype=int
+            ).reshape(len(pokemon), type_count),
+            np.array([pkmn.status == constants.BURN for pkmn in pokemon], dtype=bool),
+            np.array(['rock' in pkmn.types for pkmn in pokemon], dtype=bool)
+        )
+
+
+class MoveTable:
+    """The values that a damage calculation reads from each of a list of moves
+
+       `category` is PHYSICAL or SPECIAL, and `damaging` is False for a move that is neither"""
+
+    __slots__ = ('base_power', 'category', 'type', 'damaging')
+
+    def __init__(self, base_power, category, move_type, damaging):
+        self.base_power = base_power
+        self.category = category
+        self.type = move_type
+        self.damaging = damaging
+
+    @classmethod
+    def from_moves(cls, moves):
+        get_move = DamageCalculator()._get_move
+        base_powers = []
+        categories = []
+        move_types = []
+        damaging = []
+        for move in moves:
+            move = get_move(move)
+            if move is None:
+                raise TypeError("Invalid move")
+
+            category = CATEGORY_INDEXES.get(clean_string(move.get(constants.CATEGORY)))
+            base_powers.append(move[constants.BASE_POWER])
+            categories.append(PHYSICAL if category is None else category)
+            move_types.append(type_index(move[constants.TYPE]))
+            damaging.append(category is not None and move[constants.BASE_POWER] != 0)
+
+        return MoveTable(
+            np.array(base_powers, dtype=float),
+            np.array(categories, dtype=int),
+            np.array(move_types, dtype=int),
+            np.array(damaging, dtype=bool)
+        )
+
+
+def _boosted_stats(pokemon, physical, special):
+    return np.array(
+        [
+            [
+                BOOST_MULTIPLIERS[getattr(pkmn, boost) + 6] * getattr(pkmn, stat)
+                for stat, boost in (physical, special)
+            ]
+            for pkmn in pokemon
+        ],
+        dtype=float
+    ).reshape(len(pokemon), 2)
+
+
+def calculate_damage_batch(attackers, defenders, moves, conditions: dict=None, calc_type='average'):
+    """Calculates the damage of every move used by every attacker against every defender at once
+
+       `attackers` and `defenders` are PokemonArrays, or lists of pokemon. `moves` is a MoveTable, or a list of moves.
+       Returns an integer array with the shape (attackers, moves, defenders, rolls) that holds the same rolls as
+       DamageCalculator.calculate_damage, in order and without removing duplicates.
+       The rolls of a move that does not deal damage are 0"""
+    try:
+        roll_multipliers = np.array(DAMAGE_ROLLS[calc_type])
+    except KeyError:
+        raise ValueError("{} is not one of {}".format(calc_type, list(DAMAGE_ROLLS)))
+
+    if not isinstance(attackers, PokemonArrays):
+        attackers = PokemonArrays.from_pokemon(attackers)
+    if not isinstance(defenders, PokemonArrays):
+        defenders = PokemonArrays.from_pokemon(defenders)
+    if not isinstance(moves, MoveTable):
+        moves = MoveTable.from_moves(moves)
+
+    if conditions is None:
+        conditions = {}
+
+    # rock types get 1.5x SPDEF in sand
+    defense = defenders.defense
+    if conditions.get(constants.WEATHER) == constants.SAND:
+        defense = defense.copy()
+        defense[defenders.rock, SPECIAL] = np.trunc(defense[defenders.rock, SPECIAL] * 1.5)
+
+    # (attackers, moves, defenders)
+    attack = attackers.attack[:, moves.category][:, :, None]
+    defense = defense[:, moves.category].T[None, :, :]
+    damage = (np.trunc((2 * attackers.level) / 5) + 2)[:, None, None] * moves.base_power[None, :, None]
+    damage = np.trunc(damage * attack / defense)
+    damage = np.trunc(damage / 50) + 2
+    damage = damage * _modifier(attackers, defenders, moves, conditions)
+
+    rolls = np.trunc(damage[..., None] * roll_multipliers).astype(int)
+    rolls[:, ~moves.damaging] = 0
+    return rolls
+
+
+def _modifier(attackers, defenders, moves, conditions):
+    """The product of the modifiers in DamageCalculator.calculate_modifier, multiplied in the same order"""
+    # (moves, defenders)
+    type_effectiveness = np.ones((len(moves.type), len(defenders.types)))
+    for column in range(defenders.types.shape[1]):
+        defender_types = defenders.types[None, :, column]
+        type_effectiveness = type_effectiveness * np.where(
+            defender_types == NO_TYPE,
+            1,
+            TYPE_EFFECTIVENESS[moves.type[:, None], defender_types]
+        )
+
+    # (moves,)
+    weather = np.ones(len(moves.type))
+    weather_name = conditions.get(constants.WEATHER)
+    if isinstance(weather_name, str):
+        weather_name = clean_string(weather_name)
+        if weather_name == constants.SUN:
+            weather[moves.type == pokemon_type_indicies['fire']] = 1.5
+        elif weather_name == constants.RAIN:
+            weather[moves.type == pokemon_type_indicies['water']] = 1.5
+        elif weather_name == constants.DESOLATE_LAND:
+            weather[moves.type == pokemon_type_indicies['water']] = 0
+
+    # (attackers, moves)
+    stab = np.where((attackers.types[:, None, :] == moves.type[None, :, None]).any(axis=2), 1.5, 1)
+    burn = np.where(attackers.burned[:, None] & (moves.category == PHYSICAL)[None, :], 0.5, 1)
+
+    # (moves,)
+    light_screen = np.where(bool(conditions.get(constants.LIGHT_SCREEN)) & (moves.category == SPECIAL), 0.5, 1)
+    reflect = np.where(bool(conditions.get(constants.REFLECT)) & (moves.category == PHYSICAL), 0.5, 1)
+    aurora_veil = 0.5 if conditions.get(constants.AURORA_VEIL) else 1
+
+    modifier = type_effectiveness[None, :, :]
+    modifier = modifier * weather[None, :, None]
+    modifier = modifier * stab[:, :, None]
+    modifier = modifier * burn[:, :, None]
+    modifier = modifier * light_screen[None, :, None]
+    modifier = modifier * reflect[None, :, None]
+    modifier = modifier * aurora_veil
+    return modifier
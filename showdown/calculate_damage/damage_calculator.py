@@ -46,11 +46,72 @@ damage_multipication_array = [[1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1/2, 0, 1, 1,
                               [1, 1/2, 1, 1, 1, 1, 2, 1/2, 1, 1, 1, 1, 1, 1, 2, 2, 1/2, 1, 1],
                               [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1]]
 
+# every combination of one or two defending types. A pokemon's `type_pair` is its index in this list
+type_pairs = [(t,) for t in range(len(pokemon_type_indicies))] + [
+    (first, second) for first in range(len(pokemon_type_indicies)) for second in range(len(pokemon_type_indicies))
+]
+type_pair_indexes = {type_pair: i for i, type_pair in enumerate(type_pairs)}
+
+
+def _get_type_pair_multiplier(attacking_type_index, type_pair):
+    multiplier = 1
+    for defending_type_index in type_pair:
+        multiplier *= damage_multipication_array[attacking_type_index][defending_type_index]
+    return multiplier
+
+
+# the damage multiplier of each attacking type index against each type pair
+type_effectiveness_table = [
+    [_get_type_pair_multiplier(attacking_type_index, type_pair) for type_pair in type_pairs]
+    for attacking_type_index in range(len(pokemon_type_indicies))
+]
+
+
+def type_index(pokemon_type):
+    try:
+        return pokemon_type_indicies[pokemon_type]
+    except KeyError:
+        return pokemon_type_indicies[clean_string(pokemon_type)]
+
+
+def type_pair_index(types):
+    """Returns the index of `types` in `type_pairs`. A combination of more than two types is added to the table"""
+    type_pair = tuple(type_index(t) for t in types)
+    try:
+        return type_pair_indexes[type_pair]
+    except KeyError:
+        type_pair_indexes[type_pair] = len(type_pairs)
+        type_pairs.append(type_pair)
+        for attacking_type_index, multipliers in enumerate(type_effectiveness_table):
+            multipliers.append(_get_type_pair_multiplier(attacking_type_index, type_pair))
+        return type_pair_indexes[type_pair]
+
+
+def get_type_effectiveness(attacking_type, type_pair):
+    """The damage multiplier of a move of `attacking_type` against a pokemon whose `type_pair` is given"""
+    return type_effectiveness_table[type_index(attacking_type)][type_pair]
+
+# the pokemon attributes that hold each stat that a damage calculation uses, and its boost
+STAT_ATTRIBUTES = {
+    constants.ATTACK: 'attack',
+    constants.DEFENSE: 'defense',
+    constants.SPECIAL_ATTACK: 'special_attack',
+    constants.SPECIAL_DEFENSE: 'special_defense',
+}
+BOOST_ATTRIBUTES = {
+    constants.ATTACK: 'attack_boost',
+    constants.DEFENSE: 'defense_boost',
+    constants.SPECIAL_ATTACK: 'special_attack_boost',
+    constants.SPECIAL_DEFENSE: 'special_defense_boost',
+}
+
 
 class DamageCalculator:
+    """`cache` is an optional LRUCache that remembers the damage rolls of a calculation
+       so that calculating the same attack against the same defender again is a lookup"""
 
-    def __init__(self):
-        pass
+    def __init__(self, cache=None):
+        self.cache = cache
 
     def calculate_modifier(self, attacker, defender, attacking_move, conditions: dict):
 
@@ -136,6 +197,18 @@ class DamageCalculator:
         if conditions is None:
             conditions = {}
 
+        if self.cache is None:
+            return self._calculate_damage(attacker, defender, attacking_move, conditions, calc_type, attack, defense)
+
+        key = damage_key(attacker, defender, attacking_move, conditions, calc_type, attack, defense)
+        damage_rolls = self.cache.get(key)
+        if damage_rolls is None:
+            damage_rolls = tuple(self._calculate_damage(attacker, defender, attacking_move, conditions, calc_type, attack, defense))
+            self.cache.put(key, damage_rolls)
+
+        return list(damage_rolls)
+
+    def _calculate_damage(self, attacker, defender, attacking_move, conditions, calc_type, attack, defense):
         attacking_stats = attacker.calculate_boosted_stats()
         defending_stats = defender.calculate_boosted_stats()
 
@@ -156,18 +229,46 @@ class DamageCalculator:
         return list(set(damage_rolls))
 
 
+def get_type_key(pkmn):
+    """The `type_pair` of `pkmn`, or a tuple of its types for a pokemon that does not have a `type_pair`"""
+    try:
+        return pkmn.type_pair
+    except AttributeError:
+        return tuple(pkmn.types)
+
+
+def damage_key(attacker, defender, attacking_move, conditions, calc_type, attack, defense):
+    """Everything that the damage of `attacking_move` depends on. `attack` and `defense` are the stats that the move uses"""
+    return (
+        attacker.level,
+        getattr(attacker, STAT_ATTRIBUTES[attack]),
+        getattr(attacker, BOOST_ATTRIBUTES[attack]),
+        get_type_key(attacker),
+        attacker.status,
+        getattr(defender, STAT_ATTRIBUTES[defense]),
+        getattr(defender, BOOST_ATTRIBUTES[defense]),
+        get_type_key(defender),
+        attacking_move[constants.BASE_POWER],
+        attacking_move[constants.TYPE],
+        attacking_move[constants.CATEGORY],
+        conditions.get(constants.WEATHER),
+        conditions.get(constants.REFLECT),
+        conditions.get(constants.LIGHT_SCREEN),
+        conditions.get(constants.AURORA_VEIL),
+        calc_type
+    )
+
+
 def clean_string(s):
     return s.lower().replace(' ', '')
 
 
 def type_effectiveness_modifier(attacking_move, defending_pokemon):
-    modifier = 1
-    attacking_type_index = pokemon_type_indicies[clean_string(attacking_move[constants.TYPE])]
-    for pkmn_type in defending_pokemon.types:
-        defending_type_index = pokemon_type_indicies[clean_string(pkmn_type)]
-        modifier *= damage_multipication_array[attacking_type_index][defending_type_index]
-
-    return modifier
+    try:
+        type_pair = defending_pokemon.type_pair
+    except AttributeError:
+        type_pair = type_pair_index(defending_pokemon.types)
+    return get_type_effectiveness(attacking_move[constants.TYPE], type_pair)
 
 
 def weather_modifier(attacking_move: namedtuple, weather: str):
@@ -0,0 +1,170 @@
+import numpy as np
+
+import constants
+from showdown.helpers import normalize_name
+from showdown.search.state_mutator import OPCODES
+from showdown.search.state_mutator import BOOSTS
+from . import scoring
+from .evaluate import count_unrevealed_opponent_pokemon
+from .matchup_table import MatchupTable
+
+
+SWITCH = OPCODES[constants.MUTATOR_SWITCH]
+APPLY_VOLATILE_STATUS = OPCODES[constants.MUTATOR_APPLY_VOLATILE_STATUS]
+REMOVE_VOLATILE_STATUS = OPCODES[constants.MUTATOR_REMOVE_VOLATILE_STATUS]
+DAMAGE = OPCODES[constants.MUTATOR_DAMAGE]
+HEAL = OPCODES[constants.MUTATOR_HEAL]
+BOOST = OPCODES[constants.MUTATOR_BOOST]
+UNBOOST = OPCODES[constants.MUTATOR_UNBOOST]
+APPLY_STATUS = OPCODES[constants.MUTATOR_APPLY_STATUS]
+REMOVE_STATUS = OPCODES[constants.MUTATOR_REMOVE_STATUS]
+SIDE_START = OPCODES[constants.MUTATOR_SIDE_START]
+SIDE_END = OPCODES[constants.MUTATOR_SIDE_END]
+
+# the column of each scored boost in the boost features
+SCORED_BOOST_COLUMNS = {
+    boost_index: scoring.SCORED_BOOSTS.index(stat) for boost_index, (stat, _) in enumerate(BOOSTS) if stat in scoring.SCORED_BOOSTS
+}
+BOOST_ATTRIBUTES = tuple(dict(BOOSTS)[stat] for stat in scoring.SCORED_BOOSTS)
+
+
+def volatile_status_score(volatile_status):
+    return scoring.VOLATILE_STATUS_SCORES.get(normalize_name(volatile_status), 0)
+
+
+class LeafFeatures:
+    """The values that `evaluate` reads from each of a batch of states that a node's instructions lead to
+
+       The pokemon of each side are indexed by their slot in the node's state: the active pokemon, then the reserves.
+       A side with fewer pokemon than the other is padded with fainted pokemon.
+       The weights are read from `scoring` when the features are created"""
+
+    def __init__(self, state, leaf_count, matchup_table):
+        self.matchup_table = matchup_table
+        self.status_codes = scoring.STATUS_CODES
+        self.side_condition_columns = scoring.SIDE_CONDITION_COLUMNS
+        sides = (state.self, state.opponent)
+        self.pokemon = [[side.active] + list(side.reserve.values()) for side in sides]
+        self.slots = [{pkmn.id: slot for slot, pkmn in enumerate(side_pokemon)} for side_pokemon in self.pokemon]
+        pokemon_count = max(len(side_pokemon) for side_pokemon in self.pokemon)
+
+        hp = np.zeros((2, pokemon_count))
+        maxhp = np.ones((2, pokemon_count))
+        boosts = np.zeros((2, pokemon_count, len(scoring.SCORED_BOOSTS)), dtype=int)
+        statuses = np.zeros((2, pokemon_count), dtype=int)
+        volatile_statuses = np.zeros((2, pokemon_count))
+        side_conditions = np.zeros((2, len(self.side_condition_columns)))
+        for side_index, side_pokemon in enumerate(self.pokemon):
+            for slot, pkmn in enumerate(side_pokemon):
+                hp[side_index, slot] = pkmn.hp
+                maxhp[side_index, slot] = pkmn.maxhp
+                boosts[side_index, slot] = [getattr(pkmn, attribute) for attribute in BOOST_ATTRIBUTES]
+                statuses[side_index, slot] = self.status_codes[pkmn.status]
+                volatile_statuses[side_index, slot] = sum(volatile_status_score(v) for v in pkmn.volatile_status)
+            for side_condition, count in sides[side_index].side_conditions.items():
+                if side_condition in self.side_condition_columns:
+                    side_conditions[side_index, self.side_condition_columns[side_condition]] = count
+
+        self.maxhp = maxhp
+        self.hp = np.repeat(hp[None], leaf_count, axis=0)
+        self.boosts = np.repeat(boosts[None], leaf_count, axis=0)
+        self.statuses = np.repeat(statuses[None], leaf_count, axis=0)
+        self.volatile_statuses = np.repeat(volatile_statuses[None], leaf_count, axis=0)
+        self.side_conditions = np.repeat(side_conditions[None], leaf_count, axis=0)
+        self.active = np.zeros((leaf_count, 2), dtype=int)
+        self.unrevealed_opponent_pokemon = count_unrevealed_opponent_pokemon(state)
+
+    def add_leaf(self, leaf, compiled_instructions):
+        """Sets the features of `leaf` to those of the node's state with `compiled_instructions` applied
+           Each instruction changes the features the same way that StateMutator changes the state"""
+        active = [0, 0]
+        # the volatile statuses of the pokemon that the instructions change them for
+        volatile_statuses = {}
+        for instruction in compiled_instructions:
+            opcode = instruction[0]
+            side_index = instruction[1]
+            if opcode == DAMAGE:
+                self.hp[leaf, side_index, active[side_index]] -= instruction[2]
+            elif opcode == HEAL:
+                self.hp[leaf, side_index, active[side_index]] += instruction[2]
+            elif opcode == BOOST or opcode == UNBOOST:
+                column = SCORED_BOOST_COLUMNS.get(instruction[2])
+                if column is not None:
+                    amount = instruction[3] if opcode == BOOST else -instruction[3]
+                    self.boosts[leaf, side_index, active[side_index], column] += amount
+            elif opcode == APPLY_STATUS:
+                self.statuses[leaf, side_index, active[side_index]] = self.status_codes[instruction[2]]
+            elif opcode == REMOVE_STATUS:
+                self.statuses[leaf, side_index, active[side_index]] = self.status_codes[None]
+            elif opcode == SWITCH:
+                active[side_index] = self.slots[side_index][instruction[3]]
+            elif opcode == SIDE_START or opcode == SIDE_END:
+                column = self.side_condition_columns.get(instruction[2])
+                if column is not None:
+                    if opcode == SIDE_START:
+                        self.side_conditions[leaf, side_index, column] += instruction[3]
+                    else:
+                        self.side_conditions[leaf, side_index, column] = 0
+            elif opcode == APPLY_VOLATILE_STATUS or opcode == REMOVE_VOLATILE_STATUS:
+                slot = active[side_index]
+                try:
+                    pokemon_volatile_statuses = volatile_statuses[(side_index, slot)]
+                except KeyError:
+                    pokemon_volatile_statuses = volatile_statuses[(side_index, slot)] = set(self.pokemon[side_index][slot].volatile_status)
+
+                volatile_status = instruction[2]
+                if opcode == APPLY_VOLATILE_STATUS and volatile_status not in pokemon_volatile_statuses:
+                    pokemon_volatile_statuses.add(volatile_status)
+                    self.volatile_statuses[leaf, side_index, slot] += volatile_status_score(volatile_status)
+                elif opcode == REMOVE_VOLATILE_STATUS and volatile_status in pokemon_volatile_statuses:
+                    pokemon_volatile_statuses.remove(volatile_status)
+                    self.volatile_statuses[leaf, side_index, slot] -= volatile_status_score(volatile_status)
+
+        self.active[leaf] = active
+
+    def scores(self):
+        """The score of each leaf, calculated the same way as `evaluate`"""
+        hp_fraction = self.hp / self.maxhp
+        alive = self.hp > 0
+
+        # the same sum as `evaluate_pokemon`, added up in the same order
+        alive_scores = scoring.ALIVE_SCORE_ARRAY[np.searchsorted(scoring.ALIVE_HP_FRACTION_ARRAY, hp_fraction, side='left')]
+        pokemon_scores = alive_scores.astype(float)
+        pokemon_scores = pokemon_scores + scoring.HP_SCORE * hp_fraction
+        for column, boost_scores in enumerate(scoring.BOOST_SCORE_ARRAY):
+            pokemon_scores = pokemon_scores + boost_scores[self.boosts[..., column] + 6]
+        pokemon_scores = pokemon_scores + scoring.STATUS_SCORE_ARRAY[self.statuses]
+        pokemon_scores = pokemon_scores + self.volatile_statuses
+        pokemon_scores = np.where(alive, np.round(pokemon_scores), 0)
+
+        leaves = np.arange(len(self.active))
+        active_alive = alive[leaves[:, None], [0, 1], self.active]
+        alive_reserves = alive.sum(axis=2) - active_alive
+        alive_reserves[:, 1] += self.unrevealed_opponent_pokemon
+
+        side_scores = pokemon_scores.sum(axis=2)
+        side_scores += self.side_conditions @ scoring.STATIC_SIDE_CONDITION_SCORE_ARRAY
+        side_scores += (self.side_conditions @ scoring.SIDE_CONDITION_SCORE_PER_RESERVE_ARRAY) * alive_reserves
+
+        matchup_scores = np.where(active_alive.all(axis=1), self._matchup_scores(), 0)
+        return (side_scores[:, 0] - side_scores[:, 1] + matchup_scores).astype(int)
+
+    def _matchup_scores(self):
+        return np.array([
+            self.matchup_table.get(self.pokemon[0][user_slot], self.pokemon[1][opponent_slot])
+            for user_slot, opponent_slot in self.active.tolist()
+        ])
+
+
+def evaluate_leaves(state, compiled_instruction_lists, matchup_table=None):
+    """Returns an array holding `evaluate` of `state` with each of `compiled_instruction_lists` applied
+       The instructions are not applied to `state`: their effect on the evaluation is calculated from the
+       state's features for all of the instruction lists at once
+
+       `matchup_table` is an optional MatchupTable that has been updated from `state`"""
+    if matchup_table is None:
+        matchup_table = MatchupTable()
+    features = LeafFeatures(state, len(compiled_instruction_lists), matchup_table)
+    for leaf, compiled_instructions in enumerate(compiled_instruction_lists):
+        features.add_leaf(leaf, compiled_instructions)
+    return features.scores()
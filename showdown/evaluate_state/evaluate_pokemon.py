@@ -1,48 +1,70 @@
 from showdown.helpers import normalize_name
-import constants
+from showdown.lru_cache import LRUCache
+import config
 from . import scoring
 
 
-cache = dict()
+evaluation_cache = LRUCache(config.evaluation_cache_size)
 
 
-def evaluate_pokemon(pkmn):
+def reset_evaluation_cache():
+    """Empties the cache, resets its counters, and sizes it to `config.evaluation_cache_size`
+       Runs at the start of each battle so that a long-running bot does not keep the scores of old battles"""
+    evaluation_cache.clear()
+    evaluation_cache.max_size = config.evaluation_cache_size
+
+
+def evaluation_key(pkmn):
+    """Everything that the score of `pkmn` depends on. The score does not depend on which pokemon it is"""
+    return (
+        pkmn.hp,
+        pkmn.maxhp,
+        pkmn.attack_boost,
+        pkmn.defense_boost,
+        pkmn.special_attack_boost,
+        pkmn.special_defense_boost,
+        pkmn.speed_boost,
+        pkmn.status,
+        pkmn.volatile_status.mask
+    )
 
-    try:
-        return cache[(pkmn.hp, pkmn.maxhp, pkmn.attack_boost, pkmn.defense_boost, pkmn.special_attack_boost, pkmn.special_defense_boost, pkmn.speed_boost, pkmn.status) + tuple(pkmn.volatile_status)]
-    except KeyError:
-        pass
+
+def evaluate_pokemon(pkmn):
+    key = evaluation_key(pkmn)
+    score = evaluation_cache.get(key)
+    if score is not None:
+        return score
 
     score = 0
     if pkmn.hp <= 0:
+        evaluation_cache.put(key, score)
         return score
 
     # an alive pokemon's value decreases as it passes certain HP-percentage barriers
     pkmn_hp_percent = (float(pkmn.hp) / pkmn.maxhp)
-    for k in sorted(scoring.POKEMON_ALIVE):
-        if pkmn_hp_percent <= k:
-            score += scoring.POKEMON_ALIVE[k]
+    for hp_fraction, alive_score in zip(scoring.ALIVE_HP_FRACTIONS, scoring.ALIVE_SCORES):
+        if pkmn_hp_percent <= hp_fraction:
+            score += alive_score
             break
 
-    score += scoring.POKEMON_HP * pkmn_hp_percent
+    score += scoring.HP_SCORE * pkmn_hp_percent
 
     # boosts have diminishing returns in terms of value to the evaluation
-    score += scoring.POKEMON_BOOST_DIMINISHING_RETURNS[pkmn.attack_boost] * scoring.POKEMON_BOOSTS[constants.ATTACK]
-    score += scoring.POKEMON_BOOST_DIMINISHING_RETURNS[pkmn.defense_boost] * scoring.POKEMON_BOOSTS[constants.DEFENSE]
-    score += scoring.POKEMON_BOOST_DIMINISHING_RETURNS[pkmn.special_attack_boost] * scoring.POKEMON_BOOSTS[constants.SPECIAL_ATTACK]
-    score += scoring.POKEMON_BOOST_DIMINISHING_RETURNS[pkmn.special_defense_boost] * scoring.POKEMON_BOOSTS[constants.SPECIAL_DEFENSE]
-    score += scoring.POKEMON_BOOST_DIMINISHING_RETURNS[pkmn.speed_boost] * scoring.POKEMON_BOOSTS[constants.SPEED]
+    attack_scores, defense_scores, special_attack_scores, special_defense_scores, speed_scores = scoring.BOOST_SCORES
+    score += attack_scores[pkmn.attack_boost + 6]
+    score += defense_scores[pkmn.defense_boost + 6]
+    score += special_attack_scores[pkmn.special_attack_boost + 6]
+    score += special_defense_scores[pkmn.special_defense_boost + 6]
+    score += speed_scores[pkmn.speed_boost + 6]
 
-    score += scoring.POKEMON_STATUSES[pkmn.status]
+    score += scoring.STATUS_SCORES[scoring.STATUS_CODES[pkmn.status]]
 
+    volatile_status_scores = scoring.VOLATILE_STATUS_SCORES
     for vol_stat in pkmn.volatile_status:
-        try:
-            score += scoring.POKEMON_VOLATILE_STATUSES[normalize_name(vol_stat)]
-        except KeyError:
-            pass
+        score += volatile_status_scores.get(normalize_name(vol_stat), 0)
 
     score = round(score)
 
-    cache[(pkmn.hp, pkmn.maxhp, pkmn.attack_boost, pkmn.defense_boost, pkmn.special_attack_boost, pkmn.special_defense_boost, pkmn.speed_boost, pkmn.status) + tuple(pkmn.volatile_status)] = score
+    evaluation_cache.put(key, score)
 
     return score
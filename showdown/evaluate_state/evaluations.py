@@ -0,0 +1,94 @@
+import json
+
+import config
+from config import logger
+from . import scoring
+from .evaluate_pokemon import reset_evaluation_cache
+
+
+DEFAULT_EVALUATION = 'default'
+
+# the weights of each evaluation, keyed by its name
+# an evaluation only has to name the weights it changes; the rest are the default's
+evaluations = {
+    DEFAULT_EVALUATION: scoring.get_weights()
+}
+
+
+def register_evaluation(name, weights):
+    """Registers (or replaces) the evaluation `name`
+       `weights` maps some of `scoring.WEIGHT_NAMES` to their value. A dict-valued weight only has to hold the
+       keys that it changes"""
+    unknown_names = set(weights) - set(scoring.WEIGHT_NAMES)
+    if unknown_names:
+        raise ValueError("Evaluation {} has unknown weights: {}".format(name, sorted(unknown_names)))
+    evaluations[name] = weights
+
+
+def parse_weights(weights):
+    """Converts the keys of weights read from JSON, which are all strings, to the keys that `scoring` uses"""
+    parsed = dict()
+    for name, value in weights.items():
+        if name == 'POKEMON_ALIVE':
+            value = {float(k): v for k, v in value.items()}
+        elif name == 'POKEMON_BOOST_DIMINISHING_RETURNS':
+            value = {int(k): v for k, v in value.items()}
+        elif name == 'POKEMON_STATUSES':
+            value = {None if k == 'null' else k: v for k, v in value.items()}
+        parsed[name] = value
+    return parsed
+
+
+def load_evaluations(path):
+    """Registers each evaluation in the JSON file at `path`, which maps an evaluation's name to its weights. e.g.
+       {"gen7ou": {"POKEMON_HP": 120, "POKEMON_STATUSES": {"par": -35, "null": 0}}}"""
+    with open(path) as f:
+        file_evaluations = json.load(f)
+
+    for name, weights in file_evaluations.items():
+        register_evaluation(name, parse_weights(weights))
+
+
+def get_evaluation_weights(name):
+    """The default weights, with those of the evaluation `name` in place of them"""
+    try:
+        evaluation = evaluations[name]
+    except KeyError:
+        raise ValueError("{} is not one of the evaluations: {}".format(name, list(evaluations)))
+
+    weights = dict()
+    for weight_name, value in evaluations[DEFAULT_EVALUATION].items():
+        weights[weight_name] = dict(value) if isinstance(value, dict) else value
+    for weight_name, value in evaluation.items():
+        if isinstance(value, dict):
+            weights[weight_name].update(value)
+        else:
+            weights[weight_name] = value
+    return weights
+
+
+def use_evaluation(name):
+    """Compiles the weights of the evaluation `name` into `scoring`, so that every evaluation uses them"""
+    scoring.set_weights(get_evaluation_weights(name))
+
+    # the cached scores are those of the previous weights
+    reset_evaluation_cache()
+
+
+def apply_evaluation(pokemon_mode):
+    """Loads `config.evaluation_file` and uses the evaluation `config.evaluation`
+       If there is no `config.evaluation`, the evaluation named after `pokemon_mode` is used if there is one,
+       otherwise the default one. Returns the name of the evaluation that is used"""
+    if config.evaluation_file:
+        load_evaluations(config.evaluation_file)
+
+    if config.evaluation:
+        name = config.evaluation
+    elif pokemon_mode in evaluations:
+        name = pokemon_mode
+    else:
+        name = DEFAULT_EVALUATION
+
+    use_evaluation(name)
+    logger.debug("Using the evaluation: {}".format(name))
+    return name
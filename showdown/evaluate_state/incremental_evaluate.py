@@ -0,0 +1,96 @@
+from .evaluate import evaluate_side_conditions
+from .evaluate import count_unrevealed_opponent_pokemon
+from .evaluate_pokemon import evaluate_pokemon
+from .matchup_table import MatchupTable
+
+
+class IncrementalEvaluator:
+    """Keeps the terms that `evaluate` adds up for a state so that the state can be evaluated again
+       by re-scoring only the pokemon and side-conditions that have changed since the last evaluation
+
+       StateMutator adds each pokemon that an instruction modifies to `changed_pokemon`,
+       and the index of each side whose side-conditions an instruction modifies to `changed_side_conditions`.
+       A switch does not change any of the terms: the pokemon on each side are scored the same whether they are
+       active or not, and the matchup and alive-reserve counts are looked up from the active pokemon
+
+       `matchup_table` is a MatchupTable that has been updated from the state. If it is not given,
+       the evaluator keeps its own table, which is discarded with the other terms"""
+
+    def __init__(self, matchup_table=None):
+        self.changed_pokemon = set()
+        self.changed_side_conditions = set()
+        self.shared_matchup_table = matchup_table
+        self.reset()
+
+    def reset(self):
+        """Discard every term so that they are all re-computed at the next evaluation
+           Must be called if the state is modified without telling this object"""
+        self.pokemon_terms = None
+        self.matchup_table = self.shared_matchup_table if self.shared_matchup_table is not None else MatchupTable()
+        self.changed_pokemon.clear()
+        self.changed_side_conditions.clear()
+
+    def _initialize(self, state):
+        # the side index, score, and whether it is alive for each pokemon
+        self.pokemon_terms = {}
+        self.pokemon_scores = [0, 0]
+        self.alive_counts = [0, 0]
+        for side_index, side in enumerate((state.self, state.opponent)):
+            self._update_pokemon(side_index, side.active)
+            for pkmn in side.reserve.values():
+                self._update_pokemon(side_index, pkmn)
+
+        self.sides = (state.self, state.opponent)
+        self.side_condition_terms = [self._side_condition_term(side) for side in self.sides]
+        self.unrevealed_opponent_pokemon = count_unrevealed_opponent_pokemon(state)
+
+    def _update_pokemon(self, side_index, pkmn):
+        old_term = self.pokemon_terms.get(pkmn)
+        if old_term is not None:
+            self.pokemon_scores[side_index] -= old_term[1]
+            self.alive_counts[side_index] -= old_term[2]
+
+        score = evaluate_pokemon(pkmn)
+        alive = pkmn.hp > 0
+        self.pokemon_terms[pkmn] = (side_index, score, alive)
+        self.pokemon_scores[side_index] += score
+        self.alive_counts[side_index] += alive
+
+    @staticmethod
+    def _side_condition_term(side):
+        # the score of the side-conditions that do not depend on the number of alive reserve pokemon,
+        # and the score for each alive reserve pokemon
+        static_score = evaluate_side_conditions(side.side_conditions, 0)
+        return static_score, evaluate_side_conditions(side.side_conditions, 1) - static_score
+
+    def _matchup(self, user_pkmn, opponent_pkmn):
+        if user_pkmn.hp <= 0 or opponent_pkmn.hp <= 0:
+            return 0
+        return self.matchup_table.get(user_pkmn, opponent_pkmn)
+
+    def evaluate(self, state):
+        """Returns the same value as `evaluate(state)`"""
+        if self.pokemon_terms is None:
+            self._initialize(state)
+        else:
+            for pkmn in self.changed_pokemon:
+                self._update_pokemon(self.pokemon_terms[pkmn][0], pkmn)
+            for side_index in self.changed_side_conditions:
+                self.side_condition_terms[side_index] = self._side_condition_term(self.sides[side_index])
+        self.changed_pokemon.clear()
+        self.changed_side_conditions.clear()
+
+        user_active = state.self.active
+        opponent_active = state.opponent.active
+        bot_alive_reserve_count = self.alive_counts[0] - (user_active.hp > 0)
+        opponent_alive_reserves_count = self.alive_counts[1] - (opponent_active.hp > 0) + self.unrevealed_opponent_pokemon
+
+        static_score, score_per_reserve = self.side_condition_terms[0]
+        score = self.pokemon_scores[0] + static_score + score_per_reserve * bot_alive_reserve_count
+
+        static_score, score_per_reserve = self.side_condition_terms[1]
+        score -= self.pokemon_scores[1] + static_score + score_per_reserve * opponent_alive_reserves_count
+
+        score += self._matchup(user_active, opponent_active)
+
+        return int(score)
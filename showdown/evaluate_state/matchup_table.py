@@ -0,0 +1,50 @@
+import constants
+from .evaluate_matchup import evaluate_alive_matchup
+
+
+def matchup_signature(pkmn):
+    """Everything about `pkmn` that `evaluate_alive_matchup` reads"""
+    return pkmn.speed, pkmn.type_pair, tuple(move[constants.ID] for move in pkmn.moves)
+
+
+class MatchupTable:
+    """The score of `evaluate_alive_matchup` for each pair of the bot's pokemon and the opponent's pokemon
+
+       A battle keeps one table and updates it from the state at the start of each decision.
+       Only the pairs whose speed, types, or moves changed since the last decision are re-scored.
+       None of those change during a search, so the scores are looked up without being checked"""
+
+    def __init__(self):
+        self.scores = dict()
+        self.signatures = dict()
+        self.updated = 0
+
+    def update(self, state):
+        """Re-scores the pairs of pokemon in `state` that have changed since they were last scored"""
+        self.updated = 0
+        user_pokemon = [state.self.active] + list(state.self.reserve.values())
+        opponent_pokemon = [state.opponent.active] + list(state.opponent.reserve.values())
+        opponent_signatures = [matchup_signature(pkmn) for pkmn in opponent_pokemon]
+        for user_pkmn in user_pokemon:
+            user_signature = matchup_signature(user_pkmn)
+            for opponent_pkmn, opponent_signature in zip(opponent_pokemon, opponent_signatures):
+                key = (user_pkmn.id, opponent_pkmn.id)
+                signature = (user_signature, opponent_signature)
+                if self.signatures.get(key) != signature:
+                    self.signatures[key] = signature
+                    self.scores[key] = evaluate_alive_matchup(user_pkmn, opponent_pkmn)
+                    self.updated += 1
+
+    def get(self, user_pkmn, opponent_pkmn):
+        key = (user_pkmn.id, opponent_pkmn.id)
+        try:
+            return self.scores[key]
+        except KeyError:
+            score = self.scores[key] = evaluate_alive_matchup(user_pkmn, opponent_pkmn)
+            return score
+
+    def __len__(self):
+        return len(self.scores)
+
+    def __repr__(self):
+        return "{}(pairs={}, updated={})".format(self.__class__.__name__, len(self.scores), self.updated)
@@ -1,3 +1,5 @@
+import numpy as np
+
 import constants
 
 POKEMON_ALIVE = {
@@ -67,3 +69,149 @@ WEAK_TO_OPPONENT_TYPE = 5
 FASTER_POKEMON_IN_MATCHUP = 10
 SUPER_EFFECTIVE_DAMAGING_MOVE = 5
 FASTER_POKEMON_WITH_SUPER_EFFECTIVE_DAMAGING_MOVE = 3
+
+# the weights that the evaluation uses, keyed by their name. They start as the values above, which are never changed,
+# and an evaluation (see `evaluations.py`) replaces some or all of them with `set_weights`
+weights = {
+    'POKEMON_ALIVE': dict(POKEMON_ALIVE),
+    'POKEMON_HP': POKEMON_HP,
+    'POKEMON_HIDDEN': POKEMON_HIDDEN,
+    'POKEMON_BOOSTS': dict(POKEMON_BOOSTS),
+    'POKEMON_BOOST_DIMINISHING_RETURNS': dict(POKEMON_BOOST_DIMINISHING_RETURNS),
+    'POKEMON_STATUSES': dict(POKEMON_STATUSES),
+    'POKEMON_VOLATILE_STATUSES': dict(POKEMON_VOLATILE_STATUSES),
+    'STATIC_SCORED_SIDE_CONDITIONS': dict(STATIC_SCORED_SIDE_CONDITIONS),
+    'POKEMON_COUNT_SCORED_SIDE_CONDITIONS': dict(POKEMON_COUNT_SCORED_SIDE_CONDITIONS),
+    'WEAK_TO_OPPONENT_TYPE': WEAK_TO_OPPONENT_TYPE,
+    'FASTER_POKEMON_IN_MATCHUP': FASTER_POKEMON_IN_MATCHUP,
+    'SUPER_EFFECTIVE_DAMAGING_MOVE': SUPER_EFFECTIVE_DAMAGING_MOVE,
+    'FASTER_POKEMON_WITH_SUPER_EFFECTIVE_DAMAGING_MOVE': FASTER_POKEMON_WITH_SUPER_EFFECTIVE_DAMAGING_MOVE,
+}
+WEIGHT_NAMES = tuple(weights)
+
+TEAM_SIZE = 6
+
+# the boosts that are scored, in the order that `evaluate_pokemon` adds them
+SCORED_BOOSTS = (constants.ATTACK, constants.DEFENSE, constants.SPECIAL_ATTACK, constants.SPECIAL_DEFENSE, constants.SPEED)
+
+
+def get_weights():
+    """A copy of the weights that the evaluation uses, keyed by their name"""
+    return {name: dict(value) if isinstance(value, dict) else value for name, value in weights.items()}
+
+
+def set_weights(new_weights):
+    """Replaces the weights named in `new_weights` and compiles them. Weights that are not named keep their value"""
+    unknown_names = set(new_weights) - set(WEIGHT_NAMES)
+    if unknown_names:
+        raise ValueError("{} are not weights".format(sorted(unknown_names)))
+
+    for name, value in new_weights.items():
+        weights[name] = dict(value) if isinstance(value, dict) else value
+    compile_weights()
+
+
+def compile_weights():
+    """Flattens `weights` into the scalars, tuples and arrays that the evaluation reads, and derives the bounds of `evaluate`
+       Must be called after a weight is changed. `set_weights` calls it"""
+    global HP_SCORE, ALIVE_HP_FRACTIONS, ALIVE_SCORES, BOOST_SCORES
+    global ALIVE_HP_FRACTION_ARRAY, ALIVE_SCORE_ARRAY, BOOST_SCORE_ARRAY
+    global STATUSES, STATUS_CODES, STATUS_SCORES, STATUS_SCORE_ARRAY, VOLATILE_STATUS_SCORES
+    global SCORED_SIDE_CONDITIONS, SIDE_CONDITION_COLUMNS, STATIC_SIDE_CONDITION_SCORES, SIDE_CONDITION_SCORES_PER_RESERVE
+    global STATIC_SIDE_CONDITION_SCORE_ARRAY, SIDE_CONDITION_SCORE_PER_RESERVE_ARRAY
+    global FASTER_POKEMON_SCORE, WEAK_TO_OPPONENT_TYPE_SCORE, SUPER_EFFECTIVE_MOVE_SCORE, FASTER_SUPER_EFFECTIVE_MOVE_SCORE
+    global MAX_POKEMON_SCORE, MIN_POKEMON_SCORE, MAX_SIDE_CONDITION_SCORE, MAX_MATCHUP_SCORE
+    global MAX_EVALUATION, MIN_EVALUATION
+
+    pokemon_alive = weights['POKEMON_ALIVE']
+    pokemon_hp = weights['POKEMON_HP']
+    pokemon_boosts = weights['POKEMON_BOOSTS']
+    pokemon_boost_diminishing_returns = weights['POKEMON_BOOST_DIMINISHING_RETURNS']
+    pokemon_statuses = weights['POKEMON_STATUSES']
+    pokemon_volatile_statuses = weights['POKEMON_VOLATILE_STATUSES']
+    static_scored_side_conditions = weights['STATIC_SCORED_SIDE_CONDITIONS']
+    pokemon_count_scored_side_conditions = weights['POKEMON_COUNT_SCORED_SIDE_CONDITIONS']
+    weak_to_opponent_type = weights['WEAK_TO_OPPONENT_TYPE']
+    faster_pokemon_in_matchup = weights['FASTER_POKEMON_IN_MATCHUP']
+    super_effective_damaging_move = weights['SUPER_EFFECTIVE_DAMAGING_MOVE']
+    faster_pokemon_with_super_effective_damaging_move = weights['FASTER_POKEMON_WITH_SUPER_EFFECTIVE_DAMAGING_MOVE']
+
+    HP_SCORE = pokemon_hp
+
+    # a pokemon's score for being alive is the score of the first of these hp-fractions that its hp-fraction is at most
+    ALIVE_HP_FRACTIONS = tuple(sorted(pokemon_alive))
+    ALIVE_SCORES = tuple(pokemon_alive[hp_fraction] for hp_fraction in ALIVE_HP_FRACTIONS)
+
+    # the score of each boost from -6 to 6 (indexed by the boost + 6) of each of SCORED_BOOSTS
+    BOOST_SCORES = tuple(
+        tuple(pokemon_boost_diminishing_returns[boost] * pokemon_boosts[stat] for boost in range(-6, 7))
+        for stat in SCORED_BOOSTS
+    )
+
+    # the same tables as arrays, for `batch_evaluate`. A fainted pokemon's alive score is the 0 after the others
+    ALIVE_HP_FRACTION_ARRAY = np.array(ALIVE_HP_FRACTIONS)
+    ALIVE_SCORE_ARRAY = np.array(ALIVE_SCORES + (0,))
+    BOOST_SCORE_ARRAY = np.array(BOOST_SCORES)
+
+    # the score of each status, indexed by its code
+    STATUSES = tuple(pokemon_statuses)
+    STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+    STATUS_SCORES = tuple(pokemon_statuses[status] for status in STATUSES)
+    STATUS_SCORE_ARRAY = np.array(STATUS_SCORES)
+
+    VOLATILE_STATUS_SCORES = dict(pokemon_volatile_statuses)
+
+    # the score of each count of a side-condition, indexed by its column. A side-condition that is in both of the
+    # weights is only scored statically
+    SCORED_SIDE_CONDITIONS = tuple(static_scored_side_conditions) + tuple(
+        c for c in pokemon_count_scored_side_conditions if c not in static_scored_side_conditions
+    )
+    SIDE_CONDITION_COLUMNS = {side_condition: column for column, side_condition in enumerate(SCORED_SIDE_CONDITIONS)}
+    STATIC_SIDE_CONDITION_SCORES = tuple(static_scored_side_conditions.get(c, 0) for c in SCORED_SIDE_CONDITIONS)
+    SIDE_CONDITION_SCORES_PER_RESERVE = tuple(
+        0 if c in static_scored_side_conditions else pokemon_count_scored_side_conditions[c] for c in SCORED_SIDE_CONDITIONS
+    )
+    STATIC_SIDE_CONDITION_SCORE_ARRAY = np.array(STATIC_SIDE_CONDITION_SCORES)
+    SIDE_CONDITION_SCORE_PER_RESERVE_ARRAY = np.array(SIDE_CONDITION_SCORES_PER_RESERVE)
+
+    FASTER_POKEMON_SCORE = faster_pokemon_in_matchup
+    WEAK_TO_OPPONENT_TYPE_SCORE = weak_to_opponent_type
+    SUPER_EFFECTIVE_MOVE_SCORE = super_effective_damaging_move
+    FASTER_SUPER_EFFECTIVE_MOVE_SCORE = faster_pokemon_with_super_effective_damaging_move
+
+    # bounds on the value that `evaluate` can return
+    # a pruned search uses these to stop searching the outcomes of a move once the remaining outcomes cannot matter
+    MAX_POKEMON_SCORE = (
+        max(pokemon_alive.values()) +
+        max(pokemon_hp, 0) +
+        sum(max(boost_scores) for boost_scores in BOOST_SCORES) +
+        max(pokemon_statuses.values()) +
+        sum(v for v in pokemon_volatile_statuses.values() if v > 0)
+    )
+    MIN_POKEMON_SCORE = min(
+        0,
+        min(pokemon_alive.values()) +
+        min(pokemon_hp, 0) +
+        sum(min(boost_scores) for boost_scores in BOOST_SCORES) +
+        min(pokemon_statuses.values()) +
+        sum(v for v in pokemon_volatile_statuses.values() if v < 0)
+    )
+    MAX_SIDE_CONDITION_SCORE = (
+        sum(abs(v) for v in static_scored_side_conditions.values()) +
+        (TEAM_SIZE - 1) * (
+            abs(pokemon_count_scored_side_conditions.get(constants.STEALTH_ROCK, 0)) +
+            3 * abs(pokemon_count_scored_side_conditions.get(constants.SPIKES, 0)) +
+            2 * abs(pokemon_count_scored_side_conditions.get(constants.TOXIC_SPIKES, 0))
+        )
+    )
+    MAX_MATCHUP_SCORE = (
+        abs(faster_pokemon_in_matchup) +
+        2 * abs(weak_to_opponent_type) +
+        4 * (abs(super_effective_damaging_move) + abs(faster_pokemon_with_super_effective_damaging_move))
+    )
+
+    MAX_EVALUATION = TEAM_SIZE * (MAX_POKEMON_SCORE - MIN_POKEMON_SCORE) + 2 * MAX_SIDE_CONDITION_SCORE + MAX_MATCHUP_SCORE
+    MIN_EVALUATION = -MAX_EVALUATION
+
+
+compile_weights()
@@ -0,0 +1,81 @@
+from collections import OrderedDict
+
+
+class LRUCache:
+    """A bounded mapping that evicts the least-recently-used item once it holds `max_size` items
+       Hits, misses, and evictions are counted so that the effectiveness of the cache can be logged
+
+       If `max_weight` is given, items are also evicted while the total `weigh` of the items is more than it.
+       Subclasses override `weigh` to bound the cache by an estimate of its memory instead of its length"""
+
+    def __init__(self, max_size, max_weight=None):
+        if max_size <= 0:
+            raise ValueError("max_size must be a positive integer, got {}".format(max_size))
+        if max_weight is not None and max_weight <= 0:
+            raise ValueError("max_weight must be a positive integer, got {}".format(max_weight))
+        self.max_size = max_size
+        self.max_weight = max_weight
+        self.data = OrderedDict()
+        self.weight = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def weigh(self, value):
+        return 1
+
+    def get(self, key, default=None):
+        try:
+            value = self.data[key]
+            self.data.move_to_end(key)
+        except KeyError:
+            self.misses += 1
+            return default
+
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        if key in self.data:
+            self.weight -= self.weigh(self.data[key])
+            self.data.move_to_end(key)
+        self.data[key] = value
+        self.weight += self.weigh(value)
+        while len(self.data) > self.max_size or (self.max_weight is not None and self.weight > self.max_weight and len(self.data) > 1):
+            _, evicted_value = self.data.popitem(last=False)
+            self.weight -= self.weigh(evicted_value)
+            self.evictions += 1
+
+    def clear(self):
+        self.data.clear()
+        self.weight = 0
+        self.reset_counters()
+
+    def reset_counters(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        if not lookups:
+            return 0
+        return self.hits / lookups
+
+    def __len__(self):
+        return len(self.data)
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def __repr__(self):
+        return "{}(size={}/{}, hits={}, misses={}, evictions={}, hit_rate={:.3f})".format(
+            self.__class__.__name__,
+            len(self.data),
+            self.max_size,
+            self.hits,
+            self.misses,
+            self.evictions,
+            self.hit_rate
+        )
@@ -1,7 +1,6 @@
 import json
 import random
-import asyncio
-import concurrent.futures
+import functools
 
 import constants
 import config
@@ -9,9 +8,18 @@ from config import logger
 from config import reset_logger
 from showdown.decide.decide import decide_random_from_average_and_safest
 from showdown.search.select_best_move import get_move_combination_scores
+from showdown.search.select_best_move import get_move_combination_scores_iterative
+from showdown.search.parallel_search import get_move_combination_scores_parallel
+from showdown.search.mcts import get_move_combination_scores_mcts
+from showdown.search.find_state_instructions import pruned_branch_counter
+from showdown.search.find_state_instructions import damage_calculator
+from showdown.evaluate_state.evaluate_pokemon import evaluation_cache
 from showdown.state.battle import Battle
 from showdown.state.battle_modifiers import update_battle
 from showdown.search.state_mutator import StateMutator
+from showdown.search.transposition_table import TranspositionTable
+
+from showdown.search_service import SearchService
 
 from websocket_communication import PSWebsocketClient
 
@@ -113,12 +121,72 @@ async def _start_standard_battle(ps_websocket_client: PSWebsocketClient):
     return battle
 
 
-def _find_best_move(battle: Battle):
+def _get_search_time_budget(battle: Battle):
+    """The number of seconds the search may take, or None if the search should be to a fixed depth"""
+    time_budget = config.search_time_budget
+    if battle.time_remaining is not None:
+        timer_budget = battle.time_remaining * config.timer_budget_fraction
+        if time_budget is None or timer_budget < time_budget:
+            time_budget = timer_budget
+
+    return time_budget
+
+
+def _search_with_expectiminimax(battle: Battle, mutator: StateMutator, process_pool=None):
+    move_ordering = None
+    if config.search_pruning and config.move_ordering:
+        move_ordering = battle.move_ordering
+        move_ordering.age()
+
+    if process_pool is None:
+        transposition_table = TranspositionTable(config.transposition_table_size)
+        search_function = functools.partial(get_move_combination_scores, transposition_table=transposition_table, pruning=config.search_pruning, move_ordering=move_ordering, instruction_cache=battle.instruction_cache)
+    else:
+        transposition_table = None
+        search_function = functools.partial(get_move_combination_scores_parallel, executor=process_pool, pruning=config.search_pruning, move_ordering=move_ordering)
+
+    time_budget = _get_search_time_budget(battle)
+    if time_budget is None:
+        move_scores = search_function(mutator, config.search_depth)
+    else:
+        move_scores, _ = get_move_combination_scores_iterative(mutator, time_budget, config.max_search_depth, search_function=search_function)
+
+    if transposition_table is not None:
+        logger.debug("Transposition table: {}".format(transposition_table))
+
+    return move_scores
+
+
+def _search_with_mcts(battle: Battle, mutator: StateMutator):
+    return get_move_combination_scores_mcts(
+        mutator,
+        iterations=config.mcts_iterations,
+        time_budget=_get_search_time_budget(battle),
+        max_depth=config.mcts_max_depth,
+        exploration=config.mcts_exploration,
+        instruction_cache=battle.instruction_cache
+    )
+
+
+def _find_best_move(battle: Battle, process_pool=None):
     state = battle.to_object()
     logger.debug("Attempting to find best move from: {}".format(state))
-    mutator = StateMutator(state)
-    move_scores = get_move_combination_scores(mutator)
+    battle.matchup_table.update(state)
+    logger.debug("Matchup table: {}".format(battle.matchup_table))
+    mutator = StateMutator(state, check_hash=config.debug_state_hash, matchup_table=battle.matchup_table)
+
+    pruned_branch_counter.reset()
+    if config.search_engine == constants.MCTS:
+        move_scores = _search_with_mcts(battle, mutator)
+    else:
+        move_scores = _search_with_expectiminimax(battle, mutator, process_pool)
     logger.debug("Score lookups produced: {}".format(move_scores))
+    if config.branch_probability_floor or config.max_branches is not None:
+        logger.debug("Unlikely branches pruned: {}".format(pruned_branch_counter))
+    if battle.instruction_cache is not None:
+        logger.debug("Instruction cache: {}".format(battle.instruction_cache))
+    logger.debug("Damage calculation cache: {}".format(damage_calculator.cache))
+    logger.debug("Evaluation cache: {}".format(evaluation_cache))
 
     decision = decide_random_from_average_and_safest(move_scores)
     logger.debug("Decision: {}".format(decision))
@@ -144,14 +212,11 @@ def _find_best_move(battle: Battle):
     return [message, str(battle.rqid)]
 
 
-async def pokemon_battle(ps_websocket_client: PSWebsocketClient, random_battle):
+async def pokemon_battle(ps_websocket_client: PSWebsocketClient, random_battle, search_service: SearchService):
+    search_service.start_battle()
     if random_battle:
         battle = await _start_random_battle(ps_websocket_client)
-        loop = asyncio.get_event_loop()
-        with concurrent.futures.ThreadPoolExecutor() as pool:
-            formatted_message = await loop.run_in_executor(
-                pool, _find_best_move, battle
-            )
+        formatted_message = await search_service.run(_find_best_move, battle, search_service.process_pool)
         await ps_websocket_client.send_message(battle.battle_tag, formatted_message)
     else:
         battle = await _start_standard_battle(ps_websocket_client)
@@ -162,14 +227,13 @@ async def pokemon_battle(ps_websocket_client: PSWebsocketClient, random_battle):
         if constants.WIN_STRING in msg:
             winner = msg.split(constants.WIN_STRING)[-1].split('\n')[0].strip()
             logger.debug("Winner: {}".format(winner))
+            if battle.instruction_cache is not None:
+                logger.info("Instruction cache hit rate for this battle: {:.3f}".format(battle.instruction_cache.hit_rate))
+            logger.info("Evaluation cache hit rate for this battle: {:.3f}".format(evaluation_cache.hit_rate))
             await ps_websocket_client.leave_battle(battle.battle_tag, save_replay=config.save_replay)
             return winner
         action_required = await update_battle(battle, msg)
         if action_required and not battle.wait:
-            loop = asyncio.get_event_loop()
-            with concurrent.futures.ThreadPoolExecutor() as pool:
-                formatted_message = await loop.run_in_executor(
-                    pool, _find_best_move, battle
-                )
+            formatted_message = await search_service.run(_find_best_move, battle, search_service.process_pool)
             if formatted_message is not None:
                 await ps_websocket_client.send_message(battle.battle_tag, formatted_message)
@@ -0,0 +1,145 @@
+import constants
+from showdown.search.objects.compact_state import BOOSTS
+from showdown.search.objects.compact_state import STATUS_CODES
+from showdown.search.objects.compact_state import ACTIVE_INDEX
+from showdown.search.objects.compact_state import HP
+from showdown.search.objects.compact_state import FIRST_BOOST
+from showdown.search.objects.compact_state import STATUS
+from showdown.search.objects.compact_state import VOLATILE_STATUSES
+from showdown.search.objects.compact_state import DISABLED_MOVES
+
+
+BOOST_OFFSETS = {stat: FIRST_BOOST + i for i, (_, stat) in enumerate(BOOSTS)}
+
+
+class CompactStateMutator:
+    """Applies and reverses the same instructions as the StateMutator, but to a CompactState"""
+
+    def __init__(self, state):
+        self.state = state
+        self.apply_instructions = {
+            constants.MUTATOR_SWITCH: self.switch,
+            constants.MUTATOR_APPLY_VOLATILE_STATUS: self.apply_volatile_status,
+            constants.MUTATOR_REMOVE_VOLATILE_STATUS: self.remove_volatile_status,
+            constants.MUTATOR_DAMAGE: self.damage,
+            constants.MUTATOR_HEAL: self.heal,
+            constants.MUTATOR_BOOST: self.boost,
+            constants.MUTATOR_UNBOOST: self.unboost,
+            constants.MUTATOR_APPLY_STATUS: self.apply_status,
+            constants.MUTATOR_REMOVE_STATUS: self.remove_status,
+            constants.MUTATOR_SIDE_START: self.side_start,
+            constants.MUTATOR_SIDE_END: self.side_end,
+            constants.MUTATOR_DISABLE_MOVE: self.disable_move,
+            constants.MUTATOR_ENABLE_MOVE: self.enable_move,
+        }
+        self.reverse_instructions = {
+            constants.MUTATOR_SWITCH: self.reverse_switch,
+            constants.MUTATOR_APPLY_VOLATILE_STATUS: self.remove_volatile_status,
+            constants.MUTATOR_REMOVE_VOLATILE_STATUS: self.apply_volatile_status,
+            constants.MUTATOR_DAMAGE: self.heal,
+            constants.MUTATOR_HEAL: self.damage,
+            constants.MUTATOR_BOOST: self.unboost,
+            constants.MUTATOR_UNBOOST: self.boost,
+            constants.MUTATOR_APPLY_STATUS: self.remove_status,
+            constants.MUTATOR_REMOVE_STATUS: self.apply_status,
+            constants.MUTATOR_SIDE_START: self.reverse_side_start,
+            constants.MUTATOR_SIDE_END: self.reverse_side_end,
+            constants.MUTATOR_DISABLE_MOVE: self.enable_move,
+            constants.MUTATOR_ENABLE_MOVE: self.disable_move,
+        }
+
+    @property
+    def state_hash(self):
+        return hash(self.state)
+
+    def apply(self, instructions):
+        for instruction in instructions:
+            method = self.apply_instructions[instruction[0]]
+            method(*instruction[1:])
+
+    def reverse(self, instructions):
+        for instruction in reversed(instructions):
+            method = self.reverse_instructions[instruction[0]]
+            method(*instruction[1:])
+
+    def _set_move_disabled(self, side_string, move_name, disabled):
+        side = self.state.get_side(side_string)
+        slot = side[ACTIVE_INDEX]
+        moves = self.state.header.moves[self.state.get_side_index(side_string)][slot]
+        try:
+            bit = 1 << next(i for i, move in enumerate(moves) if move[constants.ID] == move_name)
+        except StopIteration:
+            raise ValueError("{} not in pokemon's moves: {}".format(move_name, moves))
+
+        offset = self.state.active_offset(side_string) + DISABLED_MOVES
+        if disabled:
+            side[offset] |= bit
+        else:
+            side[offset] &= ~bit
+
+    def disable_move(self, side, move_name):
+        self._set_move_disabled(side, move_name, True)
+
+    def enable_move(self, side, move_name):
+        self._set_move_disabled(side, move_name, False)
+
+    def switch(self, side, _, switch_pokemon_name):
+        # the second parameter to this function is the current active pokemon
+        # this value must be here for reversing purposes
+        self.state.get_side(side)[ACTIVE_INDEX] = self.state.header.slot(self.state.get_side_index(side), switch_pokemon_name)
+
+    def reverse_switch(self, side, previous_active, current_active):
+        self.switch(side, current_active, previous_active)
+
+    def apply_volatile_status(self, side, volatile_status):
+        self.state.get_side(side)[self.state.active_offset(side) + VOLATILE_STATUSES] |= self.state.header.volatile_status_bit(volatile_status)
+
+    def remove_volatile_status(self, side, volatile_status):
+        offset = self.state.active_offset(side) + VOLATILE_STATUSES
+        bit = self.state.header.volatile_status_bit(volatile_status)
+        values = self.state.get_side(side)
+        if not values[offset] & bit:
+            raise KeyError(volatile_status)
+        values[offset] &= ~bit
+
+    def damage(self, side, amount):
+        self.state.get_side(side)[self.state.active_offset(side) + HP] -= amount
+
+    def heal(self, side, amount):
+        self.damage(side, -1*amount)
+
+    def boost(self, side, stat, amount):
+        try:
+            boost_offset = BOOST_OFFSETS[stat]
+        except KeyError:
+            raise ValueError("Invalid stat: {}".format(stat))
+        self.state.get_side(side)[self.state.active_offset(side) + boost_offset] += amount
+
+    def unboost(self, side, stat, amount):
+        self.boost(side, stat, -1*amount)
+
+    def apply_status(self, side, status):
+        try:
+            status_code = STATUS_CODES[status]
+        except KeyError:
+            raise ValueError("Invalid status: {}".format(status))
+        self.state.get_side(side)[self.state.active_offset(side) + STATUS] = status_code
+
+    def remove_status(self, side, _):
+        # the second parameter of this function is the status being removed
+        # this value must be here for reverse purposes
+        self.apply_status(side, None)
+
+    def side_start(self, side, effect, amount):
+        self.state.set_side_condition(side, effect, self.state.get_side_condition(side, effect) + amount)
+
+    def reverse_side_start(self, side, effect, amount):
+        self.state.set_side_condition(side, effect, self.state.get_side_condition(side, effect) - amount)
+
+    def side_end(self, side, effect, _):
+        # the third parameter of this function is the amount being removed
+        # this value must be here for reverse purposes
+        self.state.set_side_condition(side, effect, 0)
+
+    def reverse_side_end(self, side, effect, amount):
+        self.side_start(side, effect, amount)
@@ -5,7 +5,14 @@ from showdown.search.instruction_generator import InstructionGenerator
 from showdown.calculate_damage import DamageCalculator
 from showdown.helpers import boost_multiplier_lookup
 from showdown.search.transpose_instruction import TransposeInstruction
-
+from showdown.search.move_plan import get_move_plan
+
+from showdown.lru_cache import LRUCache
+from showdown.search.special_effects.abilities import modify_attack_against as abilities_modify_attack_against
+from showdown.search.special_effects.abilities import modify_attack_being_used as abilities_modify_attack_being_used
+from showdown.search.special_effects.items import modify_attack_against as items_modify_attack_against
+from showdown.search.special_effects.items import modify_attack_being_used as items_modify_attack_being_used
+from showdown.search.special_effects.moves import move_special_effect
 from showdown.search.special_effects.abilities.modify_attack_against import ability_modify_attack_against
 from showdown.search.special_effects.abilities.modify_attack_being_used import ability_modify_attack_being_used
 from showdown.search.special_effects.items.modify_attack_against import item_modify_attack_against
@@ -14,9 +21,37 @@ from showdown.search.special_effects.moves.move_special_effect import modify_att
 
 from copy import copy
 
-damage_calculator = DamageCalculator()
+damage_calculator = DamageCalculator(cache=LRUCache(config.damage_cache_size))
 state_generator = InstructionGenerator()
 
+MODIFIED_MOVE_CACHE_SIZE = 10000
+modified_move_cache = LRUCache(MODIFIED_MOVE_CACHE_SIZE)
+
+
+def reset_damage_cache():
+    """Empties the damage calculator's cache, resets its counters, and sizes it to `config.damage_cache_size`
+       Runs at the start of each battle, after `config` has been read from the environment"""
+    damage_calculator.cache.clear()
+    damage_calculator.cache.max_size = config.damage_cache_size
+
+
+class PrunedBranchCounter:
+    """Counts the branches dropped by `prune_unlikely_instructions`, and the probability that they had"""
+
+    def __init__(self):
+        self.branches = 0
+        self.mass = 0
+
+    def reset(self):
+        self.branches = 0
+        self.mass = 0
+
+    def __repr__(self):
+        return "{}(branches={}, mass={:.4f})".format(self.__class__.__name__, self.branches, self.mass)
+
+
+pruned_branch_counter = PrunedBranchCounter()
+
 
 def lookup_move(move_name):
     if move_name.startswith(constants.SWITCH_STRING + " "):
@@ -132,13 +167,107 @@ def update_damage_calc_from_abilities_and_items(attacking_pokemon, defending_pok
     return attacking_move
 
 
+BOOSTS = ('attack_boost', 'defense_boost', 'special_attack_boost', 'special_defense_boost', 'speed_boost')
+BOOSTED_STATS = ('attack', 'defense', 'special_attack', 'special_defense', 'speed') + BOOSTS
+
+# the attributes of the (attacking, defending) pokemon that a modifier reads, keyed by the name of the
+# ability, item, or move that the modifier belongs to. Modifiers that are not here read neither pokemon,
+# apart from their ability and item which decide which modifiers run
+# `type_pair` stands in for `types` since each combination of types has its own type_pair
+ATTACKING_ABILITY_READS = {
+    'adaptability': (('type_pair',), ()),
+    'scrappy': ((), ('type_pair',)),
+    'toxicboost': (('status',), ()),
+    'guts': (('status',), ()),
+    'tintedlens': ((), ('type_pair',)),
+}
+DEFENDING_ABILITY_READS = {
+    'multiscale': ((), ('hp', 'maxhp')),
+    'shadowshield': ((), ('hp', 'maxhp')),
+    'solidrock': ((), ('type_pair',)),
+    'prismarmor': ((), ('type_pair',)),
+    'wonderguard': ((), ('type_pair',)),
+}
+ATTACKING_ITEM_READS = {
+    'expertbelt': ((), ('type_pair',)),
+}
+MOVE_READS = {
+    'eruption': (('hp', 'maxhp'), ()),
+    'waterspout': (('hp', 'maxhp'), ()),
+    'freezedry': ((), ('type_pair',)),
+    'hex': ((), ('status',)),
+    'foulplay': (('attack',), ('attack',)),
+    'storedpower': (BOOSTS, ()),
+    'psyshock': ((), BOOSTED_STATS),
+    'psystrike': ((), BOOSTED_STATS),
+    'secretsword': ((), BOOSTED_STATS),
+    'facade': (('status',), ()),
+    'gyroball': (('speed', 'speed_boost'), ('speed', 'speed_boost')),
+}
+
+
+def _modifier_key(attacking_pokemon, defending_pokemon, attacking_move):
+    # only the attributes that the modifiers which run read are part of the key,
+    # so that the same modified move is used when, for example, only the hp of a pokemon changed
+    key = [attacking_pokemon.ability, attacking_pokemon.item, defending_pokemon.ability, defending_pokemon.item]
+    for reads in (
+        ATTACKING_ABILITY_READS.get(attacking_pokemon.ability),
+        DEFENDING_ABILITY_READS.get(defending_pokemon.ability),
+        ATTACKING_ITEM_READS.get(attacking_pokemon.item),
+        MOVE_READS.get(attacking_move[constants.ID])
+    ):
+        if reads is not None:
+            attacking_attributes, defending_attributes = reads
+            key.extend(getattr(attacking_pokemon, attribute) for attribute in attacking_attributes)
+            key.extend(getattr(defending_pokemon, attribute) for attribute in defending_attributes)
+    return tuple(key)
+
+
+def _has_modifier(attacking_pokemon, defending_pokemon, attacking_move):
+    return attacking_pokemon.ability in abilities_modify_attack_being_used.ability_lookup or \
+        defending_pokemon.ability in abilities_modify_attack_against.ability_lookup or \
+        attacking_pokemon.item in items_modify_attack_being_used.item_lookup or \
+        defending_pokemon.item in items_modify_attack_against.item_lookup or \
+        attacking_move[constants.ID] in move_special_effect.move_lookup
+
+
+def get_modified_move_and_plan(attacking_pokemon, defending_pokemon, attacking_move, defending_move, first_move):
+    """The result of `update_damage_calc_from_abilities_and_items` and the plan of the move it returns
+
+       When nothing modifies the move, the move and its plan from the move data are returned without copying.
+       Otherwise the modified move is remembered for the move, the other move's category, and the
+       attributes of both pokemon that the modifiers which run read (see `_modifier_key`),
+       so it is only copied the first time.
+       The returned move is shared and must not be modified"""
+    if not _has_modifier(attacking_pokemon, defending_pokemon, attacking_move):
+        return attacking_move, get_move_plan(attacking_move, first_move)
+
+    if attacking_move is not all_move_json.get(attacking_move[constants.ID]):
+        attacking_move = update_damage_calc_from_abilities_and_items(attacking_pokemon, defending_pokemon, attacking_move, defending_move, first_move)
+        return attacking_move, get_move_plan(attacking_move, first_move)
+
+    key = (
+        attacking_move[constants.ID],
+        defending_move.get(constants.CATEGORY),
+        first_move,
+        _modifier_key(attacking_pokemon, defending_pokemon, attacking_move)
+    )
+    modified_move_and_plan = modified_move_cache.get(key)
+    if modified_move_and_plan is None:
+        modified_move = update_damage_calc_from_abilities_and_items(attacking_pokemon, defending_pokemon, attacking_move, defending_move, first_move)
+        modified_move_and_plan = (modified_move, get_move_plan(modified_move, first_move))
+        modified_move_cache.put(key, modified_move_and_plan)
+
+    return modified_move_and_plan
+
+
 def get_state_instructions_from_move(mutator, attacking_move, defending_move, attacker, defender, first_move, instructions):
     instructions.frozen = False
 
     if constants.SWITCH_STRING in attacking_move:
         return state_generator.get_instructions_from_switch(mutator, attacker, attacking_move[constants.SWITCH_STRING], instructions)
 
-    mutator.apply(instructions.instructions)
+    mutator.advance_to(instructions.instructions)
     attacking_side = InstructionGenerator.get_side_from_state(mutator.state, attacker)
     defending_side = InstructionGenerator.get_side_from_state(mutator.state, defender)
     attacking_pokemon = attacking_side.active
@@ -153,95 +282,22 @@ def get_state_instructions_from_move(mutator, attacking_move, defending_move, at
     }
 
     if attacking_pokemon.hp == 0:
-        mutator.reverse(instructions.instructions)
         all_instructions = state_generator.get_instructions_from_flinched(mutator, attacker, instructions)
         return all_instructions
 
-    attacking_move = update_damage_calc_from_abilities_and_items(
+    attacking_move, plan = get_modified_move_and_plan(
         attacking_pokemon,
         defending_pokemon,
         attacking_move,
         defending_move,
         first_move
     )
+    boosts_target = attacker if plan.boosts_attacker else defender
 
     damage_amounts = None
-    move_status_effect = None
-    flinch_accuracy = None
-    boosts = None
-    boosts_target = None
-    boosts_chance = None
-    side_condition = None
-    hazard_clearing_move = None
-    volatile_status = attacking_move.get(constants.VOLATILE_STATUS)
-
-    move_accuracy = min(100, attacking_move[constants.ACCURACY])
-    move_status_accuracy = move_accuracy
-    move_target = attacking_move[constants.TARGET]
-
-    if attacking_move[constants.ID] in constants.HAZARD_CLEARING_MOVES:
-        hazard_clearing_move = attacking_move
-
-    # move is a damaging move
-    if attacking_move[constants.CATEGORY] in constants.DAMAGING_CATEGORIES:
+    if plan.damaging:
         damage_amounts = damage_calculator.calculate_damage(attacking_pokemon, defending_pokemon, attacking_move, conditions=conditions, calc_type=config.damage_calc_type)
 
-        attacking_move_secondary = attacking_move[constants.SECONDARY]
-        attacking_move_self = attacking_move.get(constants.SELF)
-        if attacking_move_secondary:
-            # flinching (iron head)
-            if attacking_move_secondary.get(constants.VOLATILE_STATUS) == constants.FLINCH and first_move:
-                flinch_accuracy = attacking_move_secondary.get(constants.CHANCE)
-
-            # secondary status effects (thunderbolt paralyzing)
-            elif attacking_move_secondary.get(constants.STATUS) is not None:
-                move_status_effect = attacking_move_secondary[constants.STATUS]
-                move_status_accuracy = attacking_move_secondary[constants.CHANCE]
-
-            # boosts from moves that boost in secondary (charge beam)
-            elif attacking_move_secondary.get(constants.SELF) is not None:
-                if constants.BOOSTS in attacking_move_secondary[constants.SELF]:
-                    boosts = attacking_move_secondary[constants.SELF][constants.BOOSTS]
-                    boosts_target = attacker
-                    boosts_chance = attacking_move_secondary[constants.CHANCE]
-
-            # boosts from secondary, but it is a guaranteed boost (dracometeor)
-            elif attacking_move.get(constants.SELF) is not None:
-                if constants.BOOSTS in attacking_move[constants.SELF]:
-                    boosts = attacking_move[constants.SELF][constants.BOOSTS]
-                    boosts_target = attacker
-                    boosts_chance = 100
-
-            # boosts from secondary, but to the defender (crunch)
-            elif attacking_move_secondary and attacking_move_secondary.get(constants.BOOSTS) is not None:
-                boosts = attacking_move_secondary[constants.BOOSTS]
-                boosts_target = defender
-                boosts_chance = attacking_move_secondary[constants.CHANCE]
-
-        elif attacking_move_self:
-            if constants.BOOSTS in attacking_move_self:
-                boosts = attacking_move_self[constants.BOOSTS]
-                boosts_target = attacker
-                boosts_chance = 100
-
-        elif constants.BOOSTS in attacking_move:
-            boosts = attacking_move[constants.BOOSTS]
-            boosts_target = attacker
-            boosts_chance = 100
-
-    # move is a status move
-    else:
-        move_status_effect = attacking_move.get(constants.STATUS)
-        side_condition = attacking_move.get(constants.SIDE_CONDITIONS)
-
-        # boosts from moves that only boost (dragon dance)
-        if attacking_move.get(constants.BOOSTS) is not None:
-            boosts = attacking_move[constants.BOOSTS]
-            boosts_target = attacker if attacking_move[constants.TARGET] == constants.SELF else defender
-            boosts_chance = attacking_move[constants.ACCURACY]
-
-    mutator.reverse(instructions.instructions)
-
     all_instructions = state_generator.get_instructions_from_flinched(mutator, attacker, instructions)
 
     temp_instructions = []
@@ -256,49 +312,49 @@ def get_state_instructions_from_move(mutator, attacking_move, defending_move, at
             for dmg in damage_amounts:
                 these_instructions = copy(instruction_set)
                 these_instructions.update_percentage(1 / amount_of_damage_rolls)
-                temp_instructions += state_generator.get_states_from_damage(mutator, defender, dmg, move_accuracy, attacking_move.get(constants.DRAIN), attacking_move.get(constants.RECOIL), attacking_move.get(constants.CRASH), these_instructions)
+                temp_instructions += state_generator.get_states_from_damage(mutator, defender, dmg, plan.accuracy, plan.drain, plan.recoil, plan.crash, these_instructions)
         all_instructions = temp_instructions
 
-    if side_condition is not None:
+    if plan.side_condition is not None:
         temp_instructions = []
         for instruction_set in all_instructions:
-            temp_instructions += state_generator.get_instructions_from_side_conditions(mutator, attacker, move_target, side_condition, instruction_set)
+            temp_instructions += state_generator.get_instructions_from_side_conditions(mutator, attacker, plan.target, plan.side_condition, instruction_set)
         all_instructions = temp_instructions
 
-    if hazard_clearing_move is not None:
+    if plan.hazard_clearing:
         temp_instructions = []
         for instruction_set in all_instructions:
             temp_instructions += state_generator.get_instructions_from_hazard_clearing_moves(mutator, attacker, attacking_move, instruction_set)
         all_instructions = temp_instructions
 
-    if volatile_status is not None:
+    if plan.volatile_status is not None:
         temp_instructions = []
         for instruction_set in all_instructions:
-            temp_instructions += state_generator.get_state_from_volatile_status(mutator, volatile_status, attacker, move_target, instruction_set)
+            temp_instructions += state_generator.get_state_from_volatile_status(mutator, plan.volatile_status, attacker, plan.target, instruction_set)
         all_instructions = temp_instructions
 
-    if move_status_effect is not None:
+    if plan.status is not None:
         temp_instructions = []
         for instruction_set in all_instructions:
-            temp_instructions += state_generator.get_states_from_status_effects(mutator, defender, move_status_effect, move_status_accuracy, instruction_set)
+            temp_instructions += state_generator.get_states_from_status_effects(mutator, defender, plan.status, plan.status_accuracy, instruction_set)
         all_instructions = temp_instructions
 
-    if boosts is not None:
+    if plan.boosts is not None:
         temp_instructions = []
         for instruction_set in all_instructions:
-            temp_instructions += state_generator.get_states_from_boosts(mutator, boosts_target, boosts, boosts_chance, instruction_set)
+            temp_instructions += state_generator.get_states_from_boosts(mutator, boosts_target, plan.boosts, plan.boosts_chance, instruction_set)
         all_instructions = temp_instructions
 
-    if attacking_move.get(constants.HEAL) is not None:
+    if plan.heal:
         temp_instructions = []
         for instruction_set in all_instructions:
             temp_instructions += state_generator.get_state_from_attacker_recovery(mutator, attacker, attacking_move, instruction_set)
         all_instructions = temp_instructions
 
-    if flinch_accuracy is not None:
+    if plan.flinch_accuracy is not None:
         temp_instructions = []
         for instruction_set in all_instructions:
-            temp_instructions += state_generator.get_states_from_flinching_moves(defender, flinch_accuracy, first_move, instruction_set)
+            temp_instructions += state_generator.get_states_from_flinching_moves(defender, plan.flinch_accuracy, first_move, instruction_set)
         all_instructions = temp_instructions
 
     # technically this block should occur after both moves happen (i.e. at the end of the turn)
@@ -307,15 +363,103 @@ def get_state_instructions_from_move(mutator, attacking_move, defending_move, at
         temp_instructions += state_generator.get_state_from_status_damage(mutator, attacker, instruction_set)
     all_instructions = temp_instructions
 
-    temp_instructions = []
+    if plan.drag:
+        temp_instructions = []
+        for instruction_set in all_instructions:
+            temp_instructions += state_generator.get_state_from_drag(mutator, attacking_move, attacker, plan.target, instruction_set)
+        all_instructions = temp_instructions
+
+    return all_instructions
+
+
+# instructions that have no effect on the state when their amount is 0
+AMOUNT_INSTRUCTIONS = {
+    constants.MUTATOR_DAMAGE,
+    constants.MUTATOR_HEAL,
+    constants.MUTATOR_BOOST,
+    constants.MUTATOR_UNBOOST,
+    constants.MUTATOR_SIDE_START
+}
+
+
+def _has_no_effect(instruction):
+    return instruction[0] in AMOUNT_INSTRUCTIONS and instruction[-1] == 0
+
+
+def merge_equivalent_instructions(all_instructions):
+    """Combines the instructions that have the same effect on the state into one, adding up their percentages.
+       i.e. a status that fails because the target already has a status leaves the same state as the status missing
+
+       Instructions that have no effect (such as 0 damage) are removed first so that they do not stop a merge.
+       Instructions are only merged if they are equally `frozen`, since that changes how they are expanded later"""
+    merged_instructions = dict()
     for instruction_set in all_instructions:
-        temp_instructions += state_generator.get_state_from_drag(mutator, attacking_move, attacker, move_target, instruction_set)
-    all_possible_instructions = temp_instructions
+        instructions = [i for i in instruction_set.instructions if not _has_no_effect(i)]
+        key = (tuple(instructions), instruction_set.frozen)
+        try:
+            merged_instructions[key].percentage += instruction_set.percentage
+        except KeyError:
+            merged_instructions[key] = TransposeInstruction(instruction_set.percentage, instructions, instruction_set.frozen)
+
+    return list(merged_instructions.values())
+
+
+def prune_unlikely_instructions(all_instructions, probability_floor, max_branches):
+    """Drops the instructions whose percentage is below `probability_floor`, then all but the
+       `max_branches` most likely instructions. The percentages of the instructions that are kept
+       are scaled up so that they add up to the same total as before
+
+       The most likely instruction is always kept"""
+    if len(all_instructions) < 2:
+        return all_instructions
+
+    kept_instructions = [i for i in all_instructions if i.percentage >= probability_floor]
+    if max_branches is not None and len(kept_instructions) > max_branches:
+        most_likely = sorted(range(len(kept_instructions)), key=lambda index: kept_instructions[index].percentage, reverse=True)
+        kept_instructions = [kept_instructions[index] for index in sorted(most_likely[:max_branches])]
+    if not kept_instructions:
+        kept_instructions = [max(all_instructions, key=lambda i: i.percentage)]
+
+    if len(kept_instructions) == len(all_instructions):
+        return all_instructions
+
+    total_percentage = sum(i.percentage for i in all_instructions)
+    kept_percentage = sum(i.percentage for i in kept_instructions)
 
-    return all_possible_instructions
+    pruned_branch_counter.branches += len(all_instructions) - len(kept_instructions)
+    pruned_branch_counter.mass += total_percentage - kept_percentage
 
+    for instruction in kept_instructions:
+        instruction.update_percentage(total_percentage / kept_percentage)
 
-def get_all_state_instructions(mutator, user_move, opponent_move):
+    return kept_instructions
+
+
+def _prune_if_configured(all_instructions):
+    if config.branch_probability_floor or config.max_branches is not None:
+        return prune_unlikely_instructions(all_instructions, config.branch_probability_floor, config.max_branches)
+    return all_instructions
+
+
+def get_all_state_instructions(mutator, user_move, opponent_move, instruction_cache=None):
+    """
+    :param instruction_cache: an optional InstructionCache. The instructions for a state and pair of moves
+                              are only generated once, the cached instructions are returned after that
+    :return: a list of TransposeInstructions, one for each outcome of the moves being used
+    """
+    if instruction_cache is None:
+        return _generate_all_state_instructions(mutator, user_move, opponent_move)
+
+    key = (mutator.state_hash, user_move, opponent_move)
+    all_instructions = instruction_cache.get(key)
+    if all_instructions is None:
+        all_instructions = _generate_all_state_instructions(mutator, user_move, opponent_move)
+        instruction_cache.put(key, all_instructions)
+
+    return all_instructions
+
+
+def _generate_all_state_instructions(mutator, user_move, opponent_move):
     user_move = lookup_move(user_move)
     opponent_move = lookup_move(opponent_move)
 
@@ -324,13 +468,19 @@ def get_all_state_instructions(mutator, user_move, opponent_move):
     instructions = TransposeInstruction(1.0, [], False)
 
     all_instructions = []
-    if bot_moves_first:
-        instructions = get_state_instructions_from_move(mutator, user_move, opponent_move, constants.SELF, constants.OPPONENT, True, instructions)
-        for instruction in instructions:
-            all_instructions += get_state_instructions_from_move(mutator, opponent_move, user_move, constants.OPPONENT, constants.SELF, False, instruction)
-    else:
-        instructions = get_state_instructions_from_move(mutator, opponent_move, user_move, constants.OPPONENT, constants.SELF, True, instructions)
-        for instruction in instructions:
-            all_instructions += get_state_instructions_from_move(mutator, user_move, opponent_move, constants.SELF, constants.OPPONENT, False, instruction)
+    # the instruction generator leaves the state at the last instructions it looked at
+    # so each step only applies what was added since the previous one
+    try:
+        # unlikely outcomes of the first move are pruned before the second move multiplies them
+        if bot_moves_first:
+            instructions = get_state_instructions_from_move(mutator, user_move, opponent_move, constants.SELF, constants.OPPONENT, True, instructions)
+            for instruction in _prune_if_configured(instructions):
+                all_instructions += get_state_instructions_from_move(mutator, opponent_move, user_move, constants.OPPONENT, constants.SELF, False, instruction)
+        else:
+            instructions = get_state_instructions_from_move(mutator, opponent_move, user_move, constants.OPPONENT, constants.SELF, True, instructions)
+            for instruction in _prune_if_configured(instructions):
+                all_instructions += get_state_instructions_from_move(mutator, user_move, opponent_move, constants.SELF, constants.OPPONENT, False, instruction)
+    finally:
+        mutator.rollback()
 
-    return all_instructions
+    return _prune_if_configured(merge_equivalent_instructions(all_instructions))
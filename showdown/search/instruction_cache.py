@@ -0,0 +1,14 @@
+from showdown.lru_cache import LRUCache
+
+
+class InstructionCache(LRUCache):
+    """Caches the TransposeInstructions generated by `get_all_state_instructions`, keyed by the
+       hash of the state and the pair of moves
+
+       The hash covers every part of the state that the instructions are generated from,
+       so the cache stays valid for the whole battle
+
+       `max_weight` is the maximum number of instructions that are kept, which bounds its memory"""
+
+    def weigh(self, value):
+        return sum(len(transpose_instruction.instructions) + 1 for transpose_instruction in value)
@@ -1,8 +1,11 @@
 import constants
 from copy import copy
 from config import logger
-from showdown.calculate_damage import damage_multipication_array
 from showdown.calculate_damage import pokemon_type_indicies
+from showdown.calculate_damage import type_effectiveness_table
+
+
+ROCK_TYPE_INDEX = pokemon_type_indicies['rock']
 
 
 class InstructionGenerator:
@@ -38,9 +41,8 @@ class InstructionGenerator:
             return [instruction]
 
         side = self.get_side_from_state(mutator.state, affected_side)
-        mutator.apply(instruction.instructions)
+        mutator.advance_to(instruction.instructions)
         if volatile_status in side.active.volatile_status:
-            mutator.reverse(instruction.instructions)
             return [instruction]
 
         if self._can_be_statused(side.active, volatile_status) and volatile_status not in side.active.volatile_status:
@@ -49,18 +51,15 @@ class InstructionGenerator:
                 affected_side,
                 volatile_status
             )
-            mutator.reverse(instruction.instructions)
             instruction.add_instruction(apply_status_instruction)
             if volatile_status == constants.SUBSTITUTE:
                 instruction.add_instruction(
                     (
                         constants.MUTATOR_DAMAGE,
                         affected_side,
-                        side.active.maxhp * 0.25
+                        int(side.active.maxhp * 0.25)
                     )
                 )
-        else:
-            mutator.reverse(instruction.instructions)
 
         return [instruction]
 
@@ -69,7 +68,7 @@ class InstructionGenerator:
             raise ValueError("attacker parameter must be one of: {}".format(', '.join(self.possible_affected_strings)))
 
         side = self.get_side_from_state(mutator.state, attacker)
-        mutator.apply(instructions.instructions)
+        mutator.advance_to(instructions.instructions)
         instruction_additions = self.remove_volatile_status_and_boosts_instructions(side, attacker)
 
         for move in filter(lambda x: x[constants.DISABLED] is True and x[constants.CURRENT_PP], side.active.moves):
@@ -93,16 +92,13 @@ class InstructionGenerator:
         switch_pkmn = side.reserve[switch_pokemon_name]
         # account for stealth rock damage
         if side.side_conditions[constants.STEALTH_ROCK] == 1:
-            multiplier = 1
-            rock_type_index = pokemon_type_indicies['rock']
-            for pkmn_type in switch_pkmn.types:
-                multiplier *= damage_multipication_array[rock_type_index][pokemon_type_indicies[pkmn_type]]
+            multiplier = type_effectiveness_table[ROCK_TYPE_INDEX][switch_pkmn.type_pair]
 
             instruction_additions.append(
                 (
                     constants.MUTATOR_DAMAGE,
                     attacker,
-                    min(1 / 8 * multiplier * switch_pkmn.maxhp, switch_pkmn.hp)
+                    int(min(1 / 8 * multiplier * switch_pkmn.maxhp, switch_pkmn.hp))
                 )
             )
 
@@ -113,7 +109,7 @@ class InstructionGenerator:
                 (
                     constants.MUTATOR_DAMAGE,
                     attacker,
-                    min(1 / 8 * spike_count * switch_pkmn.maxhp, switch_pkmn.hp)
+                    int(min(1 / 8 * spike_count * switch_pkmn.maxhp, switch_pkmn.hp))
                 )
             )
 
@@ -157,7 +153,6 @@ class InstructionGenerator:
                     )
                 )
 
-        mutator.reverse(instructions.instructions)
         for i in instruction_additions:
             instructions.add_instruction(i)
 
@@ -168,7 +163,7 @@ class InstructionGenerator:
         if attacker not in self.possible_affected_strings:
             raise ValueError("attacker parameter must be one of: {}".format(', '.join(self.possible_affected_strings)))
 
-        mutator.apply(instruction.instructions)
+        mutator.advance_to(instruction.instructions)
 
         side = self.get_side_from_state(mutator.state, attacker)
         if constants.FLINCH in side.active.volatile_status:
@@ -177,20 +172,17 @@ class InstructionGenerator:
                                 attacker,
                                 constants.FLINCH
                             )
-            mutator.reverse(instruction.instructions)
             instruction.add_instruction(remove_flinch_instruction)
             instruction.frozen = True
-            return [instruction]
-        else:
-            mutator.reverse(instruction.instructions)
-            return [instruction]
+
+        return [instruction]
 
     def get_instructions_from_statuses_that_freeze_the_state(self, mutator, attacker, defender, move, instruction):
         instructions = [instruction]
         attacker_side = self.get_side_from_state(mutator.state, attacker)
         defender_side = self.get_side_from_state(mutator.state, defender)
 
-        mutator.apply(instruction.instructions)
+        mutator.advance_to(instruction.instructions)
 
         if constants.PARALYZED == attacker_side.active.status:
             fully_paralyzed_instruction = copy(instruction)
@@ -216,8 +208,6 @@ class InstructionGenerator:
         if constants.POWDER in move[constants.FLAGS] and 'grass' in defender_side.active.types:
             instruction.frozen = True
 
-        mutator.reverse(instruction.instructions)
-
         return instructions
 
     def get_states_from_damage(self, mutator, defender, damage, accuracy, drain, recoil, crash, instruction):
@@ -242,6 +232,7 @@ class InstructionGenerator:
         # the state must be frozen because any secondary effects must not take place
         if damage == 0:
             if crash:
+                mutator.advance_to(instruction.instructions)
                 crash_percent = crash[0] / crash[1]
                 crash_instruction = (
                     constants.MUTATOR_DAMAGE,
@@ -260,14 +251,14 @@ class InstructionGenerator:
             accuracy = 100
         percent_hit = accuracy / 100
 
-        mutator.apply(instruction.instructions)
+        mutator.advance_to(instruction.instructions)
 
         instruction_additions = []
         move_missed_instruction = copy(instruction)
         if percent_hit > 0:
             if constants.SUBSTITUTE in damage_side.active.volatile_status:
                 if damage >= damage_side.active.maxhp * 0.25:
-                    actual_damage = damage_side.active.maxhp * 0.25
+                    actual_damage = int(damage_side.active.maxhp * 0.25)
                     instruction_additions.append(
                         (
                             constants.MUTATOR_REMOVE_VOLATILE_STATUS,
@@ -324,7 +315,6 @@ class InstructionGenerator:
 
             instructions.append(move_missed_instruction)
 
-        mutator.reverse(instruction.instructions)
         for i in instruction_additions:
             instruction.add_instruction(i)
 
@@ -346,7 +336,7 @@ class InstructionGenerator:
 
         instruction_additions = []
         side = self.get_side_from_state(mutator.state, side_string)
-        mutator.apply(instruction.instructions)
+        mutator.advance_to(instruction.instructions)
         if condition == constants.SPIKES:
             max_layers = 3
         elif condition == constants.TOXIC_SPIKES:
@@ -363,7 +353,6 @@ class InstructionGenerator:
                     1
                 )
             )
-        mutator.reverse(instruction.instructions)
         for i in instruction_additions:
             instruction.add_instruction(i)
 
@@ -379,7 +368,7 @@ class InstructionGenerator:
         defender_string = self.possible_affected_strings[attacker_string]
 
         instruction_additions = []
-        mutator.apply(instruction.instructions)
+        mutator.advance_to(instruction.instructions)
 
         attacker_side = self.get_side_from_state(mutator.state, attacker_string)
         defender_side = self.get_side_from_state(mutator.state, defender_string)
@@ -422,7 +411,6 @@ class InstructionGenerator:
         else:
             raise ValueError("{} is not a hazard clearing move".format(move[constants.ID]))
 
-        mutator.reverse(instruction.instructions)
         for i in instruction_additions:
             instruction.add_instruction(i)
 
@@ -441,16 +429,14 @@ class InstructionGenerator:
             accuracy = 100
         percent_hit = accuracy / 100
 
-        mutator.apply(instruction.instructions)
+        mutator.advance_to(instruction.instructions)
         instruction_additions = []
         side = self.get_side_from_state(mutator.state, defender)
 
         if self._sleep_clause_activated(side, status):
-            mutator.reverse(instruction.instructions)
             return [instruction]
 
         if self._immune_to_status(side.active, status):
-            mutator.reverse(instruction.instructions)
             return [instruction]
 
         move_missed_instruction = copy(instruction)
@@ -470,7 +456,6 @@ class InstructionGenerator:
             move_missed_instruction.update_percentage(1-percent_hit)
             instructions.append(move_missed_instruction)
 
-        mutator.reverse(instruction.instructions)
         for i in instruction_additions:
             instruction.add_instruction(i)
 
@@ -492,7 +477,7 @@ class InstructionGenerator:
             accuracy = 100
         percent_hit = accuracy / 100
 
-        mutator.apply(instruction.instructions)
+        mutator.advance_to(instruction.instructions)
         instruction_additions = []
 
         move_missed_instruction = copy(instruction)
@@ -529,7 +514,6 @@ class InstructionGenerator:
             move_missed_instruction.update_percentage(1-percent_hit)
             instructions.append(move_missed_instruction)
 
-        mutator.reverse(instruction.instructions)
         for i in instruction_additions:
             instruction.add_instruction(i)
 
@@ -574,17 +558,16 @@ class InstructionGenerator:
         else:
             side_string = attacker_string
 
+        mutator.advance_to(instruction.instructions)
         pkmn = self.get_side_from_state(mutator.state, side_string).active
         try:
-            health_recovered = float(move[constants.HEAL][0] / move[constants.HEAL][1]) * pkmn.maxhp
+            health_recovered = int(move[constants.HEAL][0] / move[constants.HEAL][1] * pkmn.maxhp)
         except KeyError:
             health_recovered = 0
 
         if health_recovered == 0:
             return [instruction]
 
-        mutator.apply(instruction.instructions)
-
         final_health = pkmn.hp + health_recovered
         if final_health > pkmn.maxhp:
             health_recovered -= (final_health - pkmn.maxhp)
@@ -597,8 +580,6 @@ class InstructionGenerator:
             health_recovered
         )
 
-        mutator.reverse(instruction.instructions)
-
         instruction.add_instruction(heal_instruction)
 
         return [instruction]
@@ -607,7 +588,7 @@ class InstructionGenerator:
         if attacker not in self.possible_affected_strings:
             raise ValueError("attacker parameter must be one of: {}".format(', '.join(self.possible_affected_strings)))
 
-        mutator.apply(instruction.instructions)
+        mutator.advance_to(instruction.instructions)
         defender = self.possible_affected_strings[attacker]
         side = self.get_side_from_state(mutator.state, attacker)
         defending_side = self.get_side_from_state(mutator.state, defender)
@@ -668,7 +649,6 @@ class InstructionGenerator:
                 )
             )
 
-        mutator.reverse(instruction.instructions)
         for i in instructions_to_add:
             instruction.add_instruction(i)
 
@@ -687,10 +667,8 @@ class InstructionGenerator:
         else:
             raise ValueError("Invalid value for move_target: {}".format(move_target))
 
-        mutator.apply(instruction.instructions)
+        mutator.advance_to(instruction.instructions)
         new_instructions = self.remove_volatile_status_and_boosts_instructions(affected_side, affected_side_string)
-        mutator.reverse(instruction.instructions)
-
         for i in new_instructions:
             instruction.add_instruction(i)
 
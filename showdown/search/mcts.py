@@ -0,0 +1,190 @@
+import math
+import time
+import random
+
+import constants
+from config import logger
+from showdown.helpers import battle_is_over
+from showdown.search.select_best_move import get_all_options
+from showdown.search.select_best_move import get_move_pair_score
+from .find_state_instructions import get_all_state_instructions
+
+
+class MCTSNode:
+    """A state in the Monte-Carlo search tree
+
+       Both sides choose their move at the same time, so each side keeps its own visit-count and
+       total score for each of its options (decoupled UCT). Scores are always from the bot's perspective"""
+
+    __slots__ = (
+        'terminal_score',
+        'user_options',
+        'opponent_options',
+        'visits',
+        'user_visits',
+        'user_totals',
+        'opponent_visits',
+        'opponent_totals',
+        'outcomes',
+        'children'
+    )
+
+    def __init__(self, mutator):
+        self.terminal_score = None
+        self.visits = 0
+        self.outcomes = dict()
+        self.children = dict()
+
+        if battle_is_over(mutator.state):
+            self.terminal_score = mutator.evaluate()
+            return
+
+        self.user_options, self.opponent_options = get_all_options(mutator)
+
+        # the same special case as in `get_move_combination_scores`
+        if self.opponent_options == [constants.DO_NOTHING_MOVE] and mutator.state.opponent.active.hp == 0:
+            self.terminal_score = mutator.evaluate()
+            return
+
+        self.user_visits = [0] * len(self.user_options)
+        self.user_totals = [0] * len(self.user_options)
+        self.opponent_visits = [0] * len(self.opponent_options)
+        self.opponent_totals = [0] * len(self.opponent_options)
+
+
+def _select_option(visits, totals, parent_visits, exploration, sign):
+    """UCB1: an option that has not been visited is always selected first
+       `sign` is 1 for the side maximizing the score and -1 for the side minimizing it"""
+    for i, option_visits in enumerate(visits):
+        if not option_visits:
+            return i
+
+    best_index = 0
+    best_value = float('-inf')
+    log_parent_visits = math.log(parent_visits)
+    for i, option_visits in enumerate(visits):
+        value = sign * totals[i] / option_visits + exploration * math.sqrt(log_parent_visits / option_visits)
+        if value > best_value:
+            best_index = i
+            best_value = value
+    return best_index
+
+
+def _select_joint_option(node, exploration, root_pairs):
+    if root_pairs is not None:
+        # every pair at the root is visited once so that there is a score for each of them
+        for i, user_move in enumerate(node.user_options):
+            for j, opponent_move in enumerate(node.opponent_options):
+                if (user_move, opponent_move) not in root_pairs:
+                    return i, j
+
+    i = _select_option(node.user_visits, node.user_totals, node.visits, exploration, 1)
+    j = _select_option(node.opponent_visits, node.opponent_totals, node.visits, exploration, -1)
+    return i, j
+
+
+def _run_iteration(mutator, node, depth, exploration, random_generator, root_pairs=None, instruction_cache=None):
+    """Walks down the tree from `node` by selecting a move for each side and sampling an outcome of those moves
+       The instructions of each outcome are applied to the state on the way down and reversed on the way back up
+
+    :return: the score of the state at the end of the walk
+    """
+    if node.terminal_score is not None:
+        node.visits += 1
+        return node.terminal_score
+
+    i, j = _select_joint_option(node, exploration, root_pairs)
+    user_move = node.user_options[i]
+    opponent_move = node.opponent_options[j]
+
+    try:
+        outcomes = node.outcomes[(i, j)]
+    except KeyError:
+        outcomes = get_all_state_instructions(mutator, user_move, opponent_move, instruction_cache=instruction_cache)
+        node.outcomes[(i, j)] = outcomes
+
+    k = random_generator.choices(range(len(outcomes)), weights=[o.percentage for o in outcomes])[0]
+    instructions = outcomes[k].compiled_instructions
+
+    mutator.apply_compiled(instructions)
+    try:
+        if depth <= 1:
+            score = mutator.evaluate()
+        else:
+            try:
+                child = node.children[(i, j, k)]
+            except KeyError:
+                child = MCTSNode(mutator)
+                node.children[(i, j, k)] = child
+            score = _run_iteration(mutator, child, depth - 1, exploration, random_generator, instruction_cache=instruction_cache)
+    finally:
+        mutator.reverse_compiled(instructions)
+
+    node.visits += 1
+    node.user_visits[i] += 1
+    node.user_totals[i] += score
+    node.opponent_visits[j] += 1
+    node.opponent_totals[j] += score
+
+    if root_pairs is not None:
+        visits, total = root_pairs.get((user_move, opponent_move), (0, 0))
+        root_pairs[(user_move, opponent_move)] = (visits + 1, total + score)
+
+    return score
+
+
+def get_move_combination_scores_mcts(mutator, iterations=None, time_budget=None, max_depth=4, exploration=100, random_generator=None, instruction_cache=None):
+    """Searches the battle with decoupled-UCT Monte-Carlo tree search instead of a fixed-depth search
+
+       Each iteration walks `max_depth` turns down the tree, sampling the outcome of each pair of moves
+       by its probability, and scores the state it ends in with `evaluate`.
+       The search stops after `iterations` iterations or `time_budget` seconds, whichever comes first
+
+    :param exploration: the UCB1 exploration constant, in the same units as `evaluate`
+    :param instruction_cache: an optional InstructionCache used to re-use the instructions generated for a state
+    :return: a dictionary of the average score of each move combination at the root of the search
+    """
+    if iterations is None and time_budget is None:
+        raise ValueError("Either iterations or time_budget must be given")
+
+    if random_generator is None:
+        random_generator = random.Random()
+
+    start_time = time.time()
+    deadline = start_time + time_budget if time_budget is not None else None
+
+    # `get_all_options` modifies these values, so they are restored after searching
+    force_switch = mutator.state.force_switch
+    trapped = mutator.state.self.trapped
+
+    root = MCTSNode(mutator)
+    if root.terminal_score is not None:
+        mutator.state.force_switch = force_switch
+        mutator.state.self.trapped = trapped
+        if battle_is_over(mutator.state):
+            return {(constants.DO_NOTHING_MOVE, constants.DO_NOTHING_MOVE): root.terminal_score}
+        return {(user_option, constants.DO_NOTHING_MOVE): root.terminal_score for user_option in root.user_options}
+
+    root_pairs = dict()
+    iteration = 0
+    while iterations is None or iteration < iterations:
+        if deadline is not None and time.time() > deadline:
+            break
+        _run_iteration(mutator, root, max_depth, exploration, random_generator, root_pairs=root_pairs, instruction_cache=instruction_cache)
+        iteration += 1
+
+    # a pair that was never visited because the budget ran out is scored by looking one turn ahead
+    state_scores = dict()
+    for user_move in root.user_options:
+        for opponent_move in root.opponent_options:
+            try:
+                visits, total = root_pairs[(user_move, opponent_move)]
+                state_scores[(user_move, opponent_move)] = total / visits
+            except KeyError:
+                state_scores[(user_move, opponent_move)] = get_move_pair_score(mutator, user_move, opponent_move, 0, instruction_cache=instruction_cache)
+
+    mutator.state.force_switch = force_switch
+    mutator.state.self.trapped = trapped
+
+    logger.debug("MCTS ran {} iterations in {:.2f} seconds".format(iteration, time.time() - start_time))
+    return state_scores
@@ -0,0 +1,91 @@
+from collections import defaultdict
+
+import constants
+from data import all_move_json
+from showdown.calculate_damage import is_super_effective
+from showdown.search.find_state_instructions import damage_calculator
+
+
+KILLER_MOVE_SCORE = 10000
+DAMAGE_SCORE = 100
+SUPER_EFFECTIVE_SCORE = 10
+KILLER_MOVES_PER_DEPTH = 2
+
+
+class MoveOrdering:
+    """Orders the options at a node of a pruned search so that the strongest options are searched first,
+       which lets the search prune more of the options that come after them
+
+       An option is ranked by:
+        - whether it caused a cutoff at the same depth before (killer moves)
+        - how often it has caused cutoffs before (the history table)
+        - the most damage it can do, as a fraction of the defender's HP
+        - whether it is super effective against the defender
+
+       The killer moves and history table are kept for the whole battle, so the search on each
+       turn starts from what was learned on the previous turns"""
+
+    def __init__(self):
+        self.killer_moves = defaultdict(list)
+        self.history = defaultdict(int)
+
+    def record_cutoff(self, side_string, option, depth):
+        """`option` caused a cutoff in the search, with `depth` levels of the search remaining below it"""
+        killer_moves = self.killer_moves[(side_string, depth)]
+        if option not in killer_moves:
+            killer_moves.insert(0, option)
+            del killer_moves[KILLER_MOVES_PER_DEPTH:]
+
+        # cutoffs close to the root prune more of the search, so they are weighted higher
+        self.history[(side_string, option)] += (depth + 1) ** 2
+
+    def age(self):
+        """Halves the history table so that cutoffs on recent turns count for more than older ones"""
+        for key in list(self.history):
+            self.history[key] //= 2
+            if not self.history[key]:
+                del self.history[key]
+
+    def score_option(self, state, side_string, option, depth):
+        score = self.history.get((side_string, option), 0)
+        if option in self.killer_moves.get((side_string, depth), ()):
+            score += KILLER_MOVE_SCORE
+
+        if option.startswith(constants.SWITCH_STRING + " "):
+            return score
+
+        try:
+            move = all_move_json[option]
+        except KeyError:
+            return score
+
+        if side_string == constants.SELF:
+            attacker = state.self.active
+            defender = state.opponent.active
+        else:
+            attacker = state.opponent.active
+            defender = state.self.active
+
+        if move[constants.CATEGORY] not in constants.DAMAGING_CATEGORIES or defender.hp <= 0:
+            return score
+
+        damage = damage_calculator.calculate_damage(
+            attacker,
+            defender,
+            move,
+            conditions={constants.WEATHER: state.weather},
+            calc_type='max'
+        )
+        if damage:
+            score += DAMAGE_SCORE * min(1, max(damage) / defender.hp)
+
+        if is_super_effective(move[constants.TYPE], defender.type_pair):
+            score += SUPER_EFFECTIVE_SCORE
+
+        return score
+
+    def order_options(self, state, side_string, options, depth):
+        """Returns `options` sorted from the strongest to the weakest. Options with the same score keep their order"""
+        if len(options) < 2:
+            return options
+        return sorted(options, key=lambda option: self.score_option(state, side_string, option, depth), reverse=True)
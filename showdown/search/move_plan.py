@@ -0,0 +1,144 @@
+from collections import namedtuple
+
+import constants
+from data import all_move_json
+
+
+MovePlan = namedtuple(
+    'MovePlan',
+    [
+        'damaging',
+        'accuracy',
+        'target',
+        'status',
+        'status_accuracy',
+        'flinch_accuracy',
+        'boosts',
+        'boosts_attacker',
+        'boosts_chance',
+        'side_condition',
+        'hazard_clearing',
+        'volatile_status',
+        'heal',
+        'drain',
+        'recoil',
+        'crash',
+        'drag',
+    ]
+)
+
+
+def build_move_plan(attacking_move, first_move):
+    """Finds which stages of `get_state_instructions_from_move` apply to `attacking_move`"""
+    status = None
+    flinch_accuracy = None
+    boosts = None
+    boosts_attacker = False
+    boosts_chance = None
+    side_condition = None
+
+    accuracy = min(100, attacking_move[constants.ACCURACY])
+    status_accuracy = accuracy
+    damaging = attacking_move[constants.CATEGORY] in constants.DAMAGING_CATEGORIES
+
+    # move is a damaging move
+    if damaging:
+        attacking_move_secondary = attacking_move[constants.SECONDARY]
+        attacking_move_self = attacking_move.get(constants.SELF)
+        if attacking_move_secondary:
+            # flinching (iron head)
+            if attacking_move_secondary.get(constants.VOLATILE_STATUS) == constants.FLINCH and first_move:
+                flinch_accuracy = attacking_move_secondary.get(constants.CHANCE)
+
+            # secondary status effects (thunderbolt paralyzing)
+            elif attacking_move_secondary.get(constants.STATUS) is not None:
+                status = attacking_move_secondary[constants.STATUS]
+                status_accuracy = attacking_move_secondary[constants.CHANCE]
+
+            # boosts from moves that boost in secondary (charge beam)
+            elif attacking_move_secondary.get(constants.SELF) is not None:
+                if constants.BOOSTS in attacking_move_secondary[constants.SELF]:
+                    boosts = attacking_move_secondary[constants.SELF][constants.BOOSTS]
+                    boosts_attacker = True
+                    boosts_chance = attacking_move_secondary[constants.CHANCE]
+
+            # boosts from secondary, but it is a guaranteed boost (dracometeor)
+            elif attacking_move.get(constants.SELF) is not None:
+                if constants.BOOSTS in attacking_move[constants.SELF]:
+                    boosts = attacking_move[constants.SELF][constants.BOOSTS]
+                    boosts_attacker = True
+                    boosts_chance = 100
+
+            # boosts from secondary, but to the defender (crunch)
+            elif attacking_move_secondary and attacking_move_secondary.get(constants.BOOSTS) is not None:
+                boosts = attacking_move_secondary[constants.BOOSTS]
+                boosts_chance = attacking_move_secondary[constants.CHANCE]
+
+        elif attacking_move_self:
+            if constants.BOOSTS in attacking_move_self:
+                boosts = attacking_move_self[constants.BOOSTS]
+                boosts_attacker = True
+                boosts_chance = 100
+
+        elif constants.BOOSTS in attacking_move:
+            boosts = attacking_move[constants.BOOSTS]
+            boosts_attacker = True
+            boosts_chance = 100
+
+    # move is a status move
+    else:
+        status = attacking_move.get(constants.STATUS)
+        side_condition = attacking_move.get(constants.SIDE_CONDITIONS)
+
+        # boosts from moves that only boost (dragon dance)
+        if attacking_move.get(constants.BOOSTS) is not None:
+            boosts = attacking_move[constants.BOOSTS]
+            boosts_attacker = attacking_move[constants.TARGET] == constants.SELF
+            boosts_chance = attacking_move[constants.ACCURACY]
+
+    return MovePlan(
+        damaging=damaging,
+        accuracy=accuracy,
+        target=attacking_move[constants.TARGET],
+        status=status,
+        status_accuracy=status_accuracy,
+        flinch_accuracy=flinch_accuracy,
+        boosts=boosts,
+        boosts_attacker=boosts_attacker,
+        boosts_chance=boosts_chance,
+        side_condition=side_condition,
+        hazard_clearing=attacking_move[constants.ID] in constants.HAZARD_CLEARING_MOVES,
+        volatile_status=attacking_move.get(constants.VOLATILE_STATUS),
+        heal=attacking_move.get(constants.HEAL) is not None,
+        drain=attacking_move.get(constants.DRAIN),
+        recoil=attacking_move.get(constants.RECOIL),
+        crash=attacking_move.get(constants.CRASH),
+        drag=constants.DRAG in attacking_move[constants.FLAGS]
+    )
+
+
+move_plans = dict()
+
+
+def build_move_plans():
+    """Builds the plan of every move in `all_move_json`
+       Must be called again if the moves are modified, i.e. by `apply_mods`"""
+    move_plans.clear()
+    for move_name, move in all_move_json.items():
+        for first_move in (True, False):
+            move_plans[(move_name, first_move)] = build_move_plan(move, first_move)
+
+
+def get_move_plan(attacking_move, first_move):
+    """A move that was changed by an ability, item, or the other move is a copy of the move in `all_move_json`,
+       so its plan is built again. Otherwise the plan that was built when the data was loaded is used"""
+    move_name = attacking_move[constants.ID]
+    if attacking_move is all_move_json.get(move_name):
+        try:
+            return move_plans[(move_name, first_move)]
+        except KeyError:
+            pass
+    return build_move_plan(attacking_move, first_move)
+
+
+build_move_plans()
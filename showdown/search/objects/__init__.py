@@ -1,3 +1,4 @@
 from .state import State
 from .side import Side
 from .pokemon import Pokemon
+from .compact_state import CompactState
@@ -0,0 +1,390 @@
+from array import array
+from collections import defaultdict
+
+import constants
+from .state import State
+from .side import Side
+from .pokemon import Pokemon
+
+
+STATUSES = (None, constants.BURN, constants.FROZEN, constants.PARALYZED, constants.POISON, constants.TOXIC, constants.SLEEP)
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+
+BOOSTS = (
+    ('attack_boost', constants.ATTACK),
+    ('defense_boost', constants.DEFENSE),
+    ('special_attack_boost', constants.SPECIAL_ATTACK),
+    ('special_defense_boost', constants.SPECIAL_DEFENSE),
+    ('speed_boost', constants.SPEED),
+    ('accuracy_boost', constants.ACCURACY),
+    ('evasion_boost', constants.EVASION),
+)
+
+# the layout of each pokemon in a side's array
+HP = 0
+FIRST_BOOST = 1
+STATUS = FIRST_BOOST + len(BOOSTS)
+VOLATILE_STATUSES = STATUS + 1
+DISABLED_MOVES = VOLATILE_STATUSES + 1
+POKEMON_FIELDS = DISABLED_MOVES + 1
+
+# the layout of each side's array: the index of the active pokemon, each pokemon, then each side-condition
+ACTIVE_INDEX = 0
+FIRST_POKEMON = 1
+
+# the volatile-status bitmask is stored in a signed 64-bit integer
+MAX_VOLATILE_STATUSES = 63
+
+# a pickled side is stored in the first of these array typecodes that holds all of its values
+PICKLED_TYPECODES = ('b', 'h', 'i', 'q')
+
+STATIC_ATTRIBUTES = (
+    'id',
+    'level',
+    'maxhp',
+    'ability',
+    'item',
+    'base_stats',
+    'attack',
+    'defense',
+    'special_attack',
+    'special_defense',
+    'speed',
+    'types',
+    'can_mega_evo'
+)
+
+
+class CompactStateHeader:
+    """The parts of a CompactState that never change during a search: the attributes of each pokemon
+       that no instruction modifies, and the names that the volatile-status bits and side-condition counters stand for
+
+       The registries only ever grow, so one header is shared by every copy of a state"""
+
+    __slots__ = ('pokemon', 'names', 'moves', 'volatile_statuses', 'side_conditions', '_key')
+
+    def __init__(self):
+        # `pokemon`, `names`, and `moves` are indexed by side and then by slot
+        self.pokemon = []
+        self.names = []
+        self.moves = []
+        self.volatile_statuses = []
+        self.side_conditions = []
+        self._key = None
+
+    def key(self):
+        """A hashable value holding everything in the header
+           It is kept until a registry grows, so states that share a header compare their header keys by identity"""
+        if self._key is None:
+            self._key = (
+                _freeze(self.pokemon),
+                tuple(self.names),
+                _freeze(self.moves),
+                tuple(self.volatile_statuses),
+                tuple(self.side_conditions)
+            )
+        return self._key
+
+    def __getstate__(self):
+        return self.pokemon, self.names, self.moves, self.volatile_statuses, self.side_conditions
+
+    def __setstate__(self, state):
+        self.pokemon, self.names, self.moves, self.volatile_statuses, self.side_conditions = state
+        self._key = None
+
+    def slot(self, side_index, pokemon_name):
+        try:
+            return self.names[side_index].index(pokemon_name)
+        except ValueError:
+            raise ValueError("{} is not on this side: {}".format(pokemon_name, self.names[side_index]))
+
+    def volatile_status_bit(self, volatile_status):
+        try:
+            return 1 << self.volatile_statuses.index(volatile_status)
+        except ValueError:
+            if len(self.volatile_statuses) >= MAX_VOLATILE_STATUSES:
+                raise ValueError("Cannot register more than {} volatile statuses".format(MAX_VOLATILE_STATUSES))
+            self.volatile_statuses.append(volatile_status)
+            self._key = None
+            return 1 << (len(self.volatile_statuses) - 1)
+
+    def side_condition_index(self, side_condition):
+        try:
+            return self.side_conditions.index(side_condition)
+        except ValueError:
+            self.side_conditions.append(side_condition)
+            self._key = None
+            return len(self.side_conditions) - 1
+
+    def first_side_condition(self, side_index):
+        return pokemon_offset(len(self.pokemon[side_index]))
+
+
+class CompactState:
+    """A State stored as one flat integer array per side plus a header that copies share
+
+       Each side's array holds the slot of the active pokemon, then the hp, boosts, status code,
+       volatile-status bitmask, and disabled-move bitmask of each pokemon, then a counter for each side-condition.
+       This makes a state cheap to copy, hash, and pickle. It is how the parallel search sends a state to its workers"""
+
+    __slots__ = ('header', 'self', 'opponent', 'self_trapped', 'opponent_trapped', 'weather', 'field', 'force_switch', 'wait')
+
+    def __init__(self, header, user, opponent, self_trapped, opponent_trapped, weather, field, force_switch, wait):
+        self.header = header
+        self.self = user
+        self.opponent = opponent
+        self.self_trapped = self_trapped
+        self.opponent_trapped = opponent_trapped
+        self.weather = weather
+        self.field = field
+        self.force_switch = force_switch
+        self.wait = wait
+
+    @classmethod
+    def from_state(cls, state):
+        header = CompactStateHeader()
+        return CompactState(
+            header,
+            _encode_side(header, state.self),
+            _encode_side(header, state.opponent),
+            state.self.trapped,
+            state.opponent.trapped,
+            state.weather,
+            state.field,
+            state.force_switch,
+            state.wait
+        )
+
+    @classmethod
+    def from_dict(cls, state_dict):
+        return cls.from_state(State.from_dict(state_dict))
+
+    def to_state(self):
+        return State(
+            _decode_side(self.header, 0, self.self, self.self_trapped),
+            _decode_side(self.header, 1, self.opponent, self.opponent_trapped),
+            self.weather,
+            self.field,
+            self.force_switch,
+            self.wait
+        )
+
+    def get_side_index(self, side_string):
+        if side_string == constants.SELF:
+            return 0
+        elif side_string == constants.OPPONENT:
+            return 1
+        else:
+            raise ValueError("Invalid value for `side`")
+
+    def get_side(self, side_string):
+        return self.self if self.get_side_index(side_string) == 0 else self.opponent
+
+    def get_side_condition(self, side_string, side_condition):
+        side_index = self.get_side_index(side_string)
+        values = self.get_side(side_string)
+        index = self.header.first_side_condition(side_index) + self.header.side_condition_index(side_condition)
+        return values[index] if index < len(values) else 0
+
+    def set_side_condition(self, side_string, side_condition, count):
+        side_index = self.get_side_index(side_string)
+        values = self.get_side(side_string)
+        index = self.header.first_side_condition(side_index) + self.header.side_condition_index(side_condition)
+        if index >= len(values):
+            values.extend([0] * (index + 1 - len(values)))
+        values[index] = count
+
+    def active_offset(self, side_string):
+        return pokemon_offset(self.get_side(side_string)[ACTIVE_INDEX])
+
+    def key(self):
+        """A hashable value that is equal for two states if and only if the states are equal
+           States with different headers are only equal if their headers registered the same volatile statuses
+           and side-conditions in the same order"""
+        return (
+            self.header.key(),
+            _pokemon_bytes(self.header, 0, self.self),
+            _pokemon_bytes(self.header, 1, self.opponent),
+            _side_condition_counts(self.header, 0, self.self),
+            _side_condition_counts(self.header, 1, self.opponent),
+            self.self_trapped,
+            self.opponent_trapped,
+            self.weather,
+            self.field,
+            self.force_switch,
+            self.wait
+        )
+
+    def copy(self):
+        return CompactState(
+            self.header,
+            array(self.self.typecode, self.self),
+            array(self.opponent.typecode, self.opponent),
+            self.self_trapped,
+            self.opponent_trapped,
+            self.weather,
+            self.field,
+            self.force_switch,
+            self.wait
+        )
+
+    def __eq__(self, other):
+        return isinstance(other, CompactState) and self.key() == other.key()
+
+    def __reduce__(self):
+        # the sides are pickled as the bytes of the smallest integers that hold their values
+        typecode = _smallest_typecode(self.self, self.opponent)
+        return _unpickle_compact_state, (
+            self.header,
+            typecode,
+            array(typecode, self.self).tobytes(),
+            array(typecode, self.opponent).tobytes(),
+            self.self_trapped,
+            self.opponent_trapped,
+            self.weather,
+            self.field,
+            self.force_switch,
+            self.wait
+        )
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def __repr__(self):
+        return repr(self.to_state())
+
+
+def pokemon_offset(slot):
+    return FIRST_POKEMON + slot * POKEMON_FIELDS
+
+
+def _unpickle_compact_state(header, typecode, user, opponent, *attributes):
+    sides = []
+    for side_bytes in (user, opponent):
+        values = array(typecode)
+        values.frombytes(side_bytes)
+        sides.append(array('q', values))
+    return CompactState(header, *sides, *attributes)
+
+
+def _smallest_typecode(*arrays):
+    lowest = min(min(values) for values in arrays)
+    highest = max(max(values) for values in arrays)
+    for typecode in PICKLED_TYPECODES:
+        limit = 1 << (8 * array(typecode).itemsize - 1)
+        if -limit <= lowest and highest < limit:
+            return typecode
+    return 'q'
+
+
+def _freeze(value):
+    """`value` with each list, tuple, and dict in it replaced by a tuple so that it can be hashed"""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _encode_side(header, side):
+    all_pokemon = [side.active] + list(side.reserve.values())
+    header.pokemon.append(tuple(tuple(getattr(pkmn, attribute) for attribute in STATIC_ATTRIBUTES) for pkmn in all_pokemon))
+    header.names.append((side.active.id,) + tuple(side.reserve))
+    header.moves.append(tuple(
+        tuple(dict(move) for move in pkmn.moves)
+        for pkmn in all_pokemon
+    ))
+
+    values = array('q', [0])
+    for pkmn in all_pokemon:
+        try:
+            status_code = STATUS_CODES[pkmn.status]
+        except KeyError:
+            raise ValueError("Invalid status: {}".format(pkmn.status))
+
+        volatile_statuses = 0
+        for volatile_status in pkmn.volatile_status:
+            volatile_statuses |= header.volatile_status_bit(volatile_status)
+
+        disabled_moves = 0
+        for i, move in enumerate(pkmn.moves):
+            if move.get(constants.DISABLED):
+                disabled_moves |= 1 << i
+
+        # damage can be fractional, and applying then reversing it leaves an hp like 100.0
+        if pkmn.hp != int(pkmn.hp):
+            raise ValueError("{} has a fractional hp: {}".format(pkmn.id, pkmn.hp))
+        values.append(int(pkmn.hp))
+        values.extend(getattr(pkmn, attribute) for attribute, _ in BOOSTS)
+        values.append(status_code)
+        values.append(volatile_statuses)
+        values.append(disabled_moves)
+
+    first_side_condition = len(values)
+    for side_condition, count in side.side_conditions.items():
+        if count:
+            index = first_side_condition + header.side_condition_index(side_condition)
+            values.extend([0] * (index + 1 - len(values)))
+            values[index] = count
+
+    return values
+
+
+def _decode_side(header, side_index, values, trapped):
+    all_pokemon = []
+    for slot, static_values in enumerate(header.pokemon[side_index]):
+        offset = pokemon_offset(slot)
+        static = dict(zip(STATIC_ATTRIBUTES, static_values))
+
+        moves = [dict(move) for move in header.moves[side_index][slot]]
+        for i, move in enumerate(moves):
+            disabled = bool(values[offset + DISABLED_MOVES] & (1 << i))
+            if disabled or constants.DISABLED in move:
+                move[constants.DISABLED] = disabled
+
+        volatile_statuses = values[offset + VOLATILE_STATUSES]
+        all_pokemon.append(
+            Pokemon(
+                static['id'],
+                static['level'],
+                values[offset + HP],
+                static['maxhp'],
+                static['ability'],
+                static['item'],
+                static['base_stats'],
+                static['attack'],
+                static['defense'],
+                static['special_attack'],
+                static['special_defense'],
+                static['speed'],
+                *values[offset + FIRST_BOOST:offset + STATUS],
+                STATUSES[values[offset + STATUS]],
+                {name for i, name in enumerate(header.volatile_statuses) if volatile_statuses & (1 << i)},
+                moves,
+                list(static['types']),
+                static['can_mega_evo']
+            )
+        )
+
+    active_slot = values[ACTIVE_INDEX]
+    reserve = {
+        header.names[side_index][slot]: pkmn
+        for slot, pkmn in enumerate(all_pokemon) if slot != active_slot
+    }
+
+    side_conditions = defaultdict(int)
+    for index, count in _side_condition_counts(header, side_index, values):
+        side_conditions[header.side_conditions[index]] = count
+
+    return Side(all_pokemon[active_slot], reserve, side_conditions, trapped)
+
+
+def _pokemon_bytes(header, side_index, values):
+    return values[:header.first_side_condition(side_index)].tobytes()
+
+
+def _side_condition_counts(header, side_index, values):
+    first_side_condition = header.first_side_condition(side_index)
+    return tuple(
+        (index, count) for index, count in enumerate(values[first_side_condition:]) if count
+    )
@@ -1,5 +1,7 @@
 import constants
 from showdown.helpers import boost_multiplier_lookup
+from showdown.calculate_damage import type_pair_index
+from .volatile_status import VolatileStatusSet
 
 
 class Pokemon(object):
@@ -24,9 +26,11 @@ class Pokemon(object):
         'accuracy_boost',
         'evasion_boost',
         'status',
-        'volatile_status',
-        'moves',
-        'types',
+        '_volatile_status',
+        '_moves',
+        '_move_indexes',
+        '_types',
+        'type_pair',
         'can_mega_evo'
     )
 
@@ -80,6 +84,49 @@ class Pokemon(object):
         self.types = types
         self.can_mega_evo = can_mega_evo
 
+    @property
+    def volatile_status(self):
+        return self._volatile_status
+
+    @volatile_status.setter
+    def volatile_status(self, volatile_status):
+        if not isinstance(volatile_status, VolatileStatusSet):
+            volatile_status = VolatileStatusSet(volatile_status)
+        self._volatile_status = volatile_status
+
+    @property
+    def moves(self):
+        return self._moves
+
+    @moves.setter
+    def moves(self, moves):
+        self._moves = moves
+        self._move_indexes = {}
+
+    def get_move(self, move_id):
+        """The move of this pokemon whose id is `move_id`, or None if it does not have that move
+           The move is found by its index in `moves`, which is only re-built when `moves` has changed"""
+        try:
+            move = self._moves[self._move_indexes[move_id]]
+            if move[constants.ID] == move_id:
+                return move
+        except (KeyError, IndexError):
+            pass
+
+        self._move_indexes = {move[constants.ID]: i for i, move in enumerate(self._moves)}
+        index = self._move_indexes.get(move_id)
+        return None if index is None else self._moves[index]
+
+    @property
+    def types(self):
+        return self._types
+
+    @types.setter
+    def types(self, types):
+        # `type_pair` indexes the precomputed type-effectiveness table
+        self._types = types
+        self.type_pair = type_pair_index(types)
+
     @classmethod
     def from_state_pokemon_dict(cls, d):
         return Pokemon(
@@ -132,7 +179,7 @@ class Pokemon(object):
             0,
             0,
             d[constants.STATUS],
-            set(d[constants.VOLATILE_STATUS]),
+            d[constants.VOLATILE_STATUS],
             d[constants.MOVES],
             d[constants.TYPES],
             d[constants.CAN_MEGA_EVO]
@@ -0,0 +1,79 @@
+# volatile statuses are interned to a bit the first time they are seen by this process
+_bits = dict()
+_names = list()
+
+
+def volatile_status_bit(volatile_status):
+    try:
+        return _bits[volatile_status]
+    except KeyError:
+        bit = 1 << len(_names)
+        _bits[volatile_status] = bit
+        _names.append(volatile_status)
+        return bit
+
+
+class VolatileStatusSet:
+    """A set of volatile statuses stored as an integer bitmask
+
+       It supports the set operations that the search uses (`in`, `add`, `remove`, iteration) and compares
+       equal to a set of the same names. `mask` is a cheap, order-independent key for caches.
+       Bits are only meaningful within one process, so the names are pickled instead of the mask"""
+
+    __slots__ = ('mask',)
+
+    def __init__(self, volatile_statuses=()):
+        self.mask = 0
+        for volatile_status in volatile_statuses:
+            self.mask |= volatile_status_bit(volatile_status)
+
+    def add(self, volatile_status):
+        self.mask |= volatile_status_bit(volatile_status)
+
+    def remove(self, volatile_status):
+        bit = volatile_status_bit(volatile_status)
+        if not self.mask & bit:
+            raise KeyError(volatile_status)
+        self.mask ^= bit
+
+    def discard(self, volatile_status):
+        self.mask &= ~volatile_status_bit(volatile_status)
+
+    def copy(self):
+        new = VolatileStatusSet()
+        new.mask = self.mask
+        return new
+
+    def __contains__(self, volatile_status):
+        bit = _bits.get(volatile_status)
+        return bit is not None and bool(self.mask & bit)
+
+    def __iter__(self):
+        mask = self.mask
+        index = 0
+        while mask:
+            if mask & 1:
+                yield _names[index]
+            mask >>= 1
+            index += 1
+
+    def __len__(self):
+        return bin(self.mask).count('1')
+
+    def __bool__(self):
+        return self.mask != 0
+
+    def __eq__(self, other):
+        if isinstance(other, VolatileStatusSet):
+            return self.mask == other.mask
+        if isinstance(other, (set, frozenset)):
+            return set(self) == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __reduce__(self):
+        return VolatileStatusSet, (tuple(self),)
+
+    def __repr__(self):
+        return repr(set(self)) if self.mask else 'set()'
@@ -0,0 +1,129 @@
+import uuid
+import pickle
+
+import constants
+import config
+from showdown.helpers import battle_is_over
+from showdown.search.select_best_move import get_all_options
+from showdown.search.select_best_move import get_move_pair_score
+from showdown.search.select_best_move import get_pruned_move_pair_score
+from showdown.search.state_mutator import StateMutator
+from showdown.search.objects import CompactState
+from showdown.search.transposition_table import TranspositionTable
+from showdown.search.instruction_cache import InstructionCache
+from showdown.search.find_state_instructions import reset_damage_cache
+from showdown.evaluate_state.evaluate_pokemon import reset_evaluation_cache
+
+
+# the state that a worker process is searching
+# it is only de-serialized once per decision, no matter how many move-pairs the worker is given
+# the instruction cache is kept for the battle since it is valid for any state
+# `battle_number` is shared with the process that runs the battles (see SearchService.start_battle),
+# and the caches that are kept for a battle are reset the first time the worker searches a new one
+_worker_search = {
+    'decision_id': None,
+    'mutator': None,
+    'transposition_table': None,
+    'instruction_cache': None,
+    'battle_number': None,
+    'battle': None
+}
+
+
+def set_worker_battle_number(battle_number):
+    """Runs when a worker process starts. `battle_number` is a multiprocessing.Value"""
+    _worker_search['battle_number'] = battle_number
+
+
+def start_worker_battle():
+    """Resets the caches that are kept for a battle if the battle has changed since the worker last searched"""
+    battle_number = _worker_search['battle_number']
+    if battle_number is None or _worker_search['battle'] == battle_number.value:
+        return
+
+    reset_evaluation_cache()
+    reset_damage_cache()
+    _worker_search['instruction_cache'] = None
+    _worker_search['battle'] = battle_number.value
+
+
+def _get_worker_instruction_cache():
+    if _worker_search['instruction_cache'] is None and config.instruction_cache_size > 0:
+        _worker_search['instruction_cache'] = InstructionCache(config.instruction_cache_size, config.instruction_cache_max_instructions)
+    return _worker_search['instruction_cache']
+
+
+def search_move_pair(decision_id, serialized_state, user_move, opponent_move, depth, deadline=None, pruning=False, move_ordering=None):
+    """Runs in a worker process: scores one (user_move, opponent_move) pair from the root of the search"""
+    start_worker_battle()
+    if _worker_search['decision_id'] != decision_id:
+        state = pickle.loads(serialized_state)
+        if isinstance(state, CompactState):
+            state = state.to_state()
+        _worker_search['mutator'] = StateMutator(state, check_hash=config.debug_state_hash)
+        _worker_search['transposition_table'] = TranspositionTable(config.transposition_table_size)
+        _worker_search['decision_id'] = decision_id
+
+    if pruning:
+        return get_pruned_move_pair_score(
+            _worker_search['mutator'],
+            user_move,
+            opponent_move,
+            depth,
+            transposition_table=_worker_search['transposition_table'],
+            deadline=deadline,
+            move_ordering=move_ordering,
+            instruction_cache=_get_worker_instruction_cache()
+        )
+
+    return get_move_pair_score(
+        _worker_search['mutator'],
+        user_move,
+        opponent_move,
+        depth,
+        transposition_table=_worker_search['transposition_table'],
+        deadline=deadline,
+        instruction_cache=_get_worker_instruction_cache()
+    )
+
+
+def get_move_combination_scores_parallel(mutator, depth, executor, deadline=None, pruning=False, move_ordering=None):
+    """The same as `get_move_combination_scores`, except each (user_move, opponent_move) pair at the root
+       of the search is scored by `executor`, which should be a ProcessPoolExecutor
+
+       Each worker is given a copy of `move_ordering`, so the cutoffs found by the workers are not recorded in it
+
+    :return: a dictionary representing the potential move combinations and their associated scores
+    """
+    depth -= 1
+    if battle_is_over(mutator.state):
+        return {(constants.DO_NOTHING_MOVE, constants.DO_NOTHING_MOVE): mutator.evaluate()}
+
+    user_options, opponent_options = get_all_options(mutator)
+
+    if opponent_options == [constants.DO_NOTHING_MOVE] and mutator.state.opponent.active.hp == 0:
+        return {(user_option, constants.DO_NOTHING_MOVE): mutator.evaluate() for user_option in user_options}
+
+    # the state is serialized after `get_all_options` because that function may modify it
+    # it is sent with every move-pair, so it is sent as a CompactState, which pickles to about half the size
+    # unless it cannot be stored in one, such as when a pokemon has a fractional hp
+    decision_id = uuid.uuid4().hex
+    try:
+        state = CompactState.from_state(mutator.state)
+    except ValueError:
+        state = mutator.state
+    serialized_state = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+
+    futures = dict()
+    for user_move in user_options:
+        for opponent_move in opponent_options:
+            futures[(user_move, opponent_move)] = executor.submit(
+                search_move_pair, decision_id, serialized_state, user_move, opponent_move, depth, deadline, pruning, move_ordering
+            )
+
+    try:
+        return {move_pair: future.result() for move_pair, future in futures.items()}
+    except Exception:
+        for future in futures.values():
+            future.cancel()
+        raise
@@ -1,11 +1,16 @@
+import time
+
 import constants
 from config import logger
 from data import all_move_sets
 from .find_state_instructions import get_all_state_instructions
 from showdown.helpers import battle_is_over
-from showdown.evaluate_state import evaluate
+from showdown.evaluate_state import scoring
+from showdown.evaluate_state.batch_evaluate import evaluate_leaves
 from showdown.decide.decide import pick_safest
 from showdown.search.state_mutator import StateMutator
+from showdown.search.transposition_table import get_state_key
+from showdown.search.exceptions import SearchTimeout
 
 
 def get_move_set(pkmn_name):
@@ -80,17 +85,234 @@ def get_all_options(mutator: StateMutator):
     return user_options, opponent_options
 
 
-def get_move_combination_scores(mutator, depth=2, previous_moves=tuple(), previous_instructions=()):
+# the leaves of a node with fewer leaves than this are evaluated one at a time, because evaluating a batch has a fixed cost
+MIN_BATCHED_LEAVES = 8
+
+
+def evaluate_outcomes(mutator, state_instructions):
+    """The score of the state that each of `state_instructions` leads to
+       They are evaluated together by `evaluate_leaves` if there are enough of them"""
+    if len(state_instructions) >= MIN_BATCHED_LEAVES:
+        return evaluate_leaves(
+            mutator.state,
+            [instructions.compiled_instructions for instructions in state_instructions],
+            matchup_table=mutator.evaluator.matchup_table
+        ).tolist()
+
+    scores = []
+    for instructions in state_instructions:
+        mutator.apply_compiled(instructions.compiled_instructions)
+        scores.append(mutator.evaluate())
+        mutator.reverse_compiled(instructions.compiled_instructions)
+    return scores
+
+
+def get_leaf_move_pair_scores(mutator, user_options, opponent_options, instruction_cache=None):
+    """The scores of `get_move_pair_score` with a depth of 0 for every pair of options
+       The states that all of the pairs lead to are evaluated together by `evaluate_leaves`"""
+    move_pairs = []
+    state_instructions = []
+    for user_move in user_options:
+        for opponent_move in opponent_options:
+            move_pairs.append((user_move, opponent_move))
+            state_instructions.append(get_all_state_instructions(mutator, user_move, opponent_move, instruction_cache=instruction_cache))
+
+    leaf_scores = evaluate_outcomes(mutator, [instructions for pair_instructions in state_instructions for instructions in pair_instructions])
+
+    state_scores = dict()
+    leaf_scores = iter(leaf_scores)
+    for move_pair, pair_instructions in zip(move_pairs, state_instructions):
+        score = 0
+        for instructions in pair_instructions:
+            score += next(leaf_scores) * instructions.percentage
+        state_scores[move_pair] = score
+
+    return state_scores
+
+
+def get_move_pair_score(mutator, user_move, opponent_move, depth, previous_moves=tuple(), previous_instructions=(), transposition_table=None, deadline=None, instruction_cache=None):
+    """
+    :return: the expected score of `user_move` and `opponent_move` being used in the mutator's state,
+             searching `depth` more levels after the moves are used
+    """
+    score = 0
+    state_instructions = get_all_state_instructions(mutator, user_move, opponent_move, instruction_cache=instruction_cache)
+    if depth == 0:
+        for instructions in state_instructions:
+            mutator.apply_compiled(instructions.compiled_instructions)
+            t_score = mutator.evaluate()
+            score += (t_score * instructions.percentage)
+            mutator.reverse_compiled(instructions.compiled_instructions)
+
+    else:
+        for instructions in state_instructions:
+            this_percentage = instructions.percentage
+            mutator.apply_compiled(instructions.compiled_instructions)
+
+            # the instructions must be reversed even if the search times out part-way through
+            try:
+                safest = pick_safest(get_move_combination_scores(
+                    mutator, depth, previous_moves=previous_moves + (user_move, opponent_move),
+                    previous_instructions=previous_instructions + tuple(instructions.instructions),
+                    transposition_table=transposition_table,
+                    deadline=deadline,
+                    instruction_cache=instruction_cache)
+                )
+            finally:
+                mutator.reverse_compiled(instructions.compiled_instructions)
+
+            score += safest[1] * this_percentage
+
+    return score
+
+
+def get_pruned_move_pair_score(mutator, user_move, opponent_move, depth, alpha=float('-inf'), beta=float('inf'), transposition_table=None, deadline=None, move_ordering=None, instruction_cache=None):
+    """The same as `get_move_pair_score`, but the outcomes of the moves are only searched
+       until it is known that the score is <= `alpha` or >= `beta`, in which case that bound is returned
+
+       The bounds of each outcome are found from the outcomes searched so far, the probability of the
+       remaining outcomes, and the bounds of `evaluate`.
+       When `depth` is 0 and there are enough outcomes to batch, they are all evaluated together by `evaluate_leaves`
+       instead of being pruned, and the exact score is returned
+    """
+    state_instructions = get_all_state_instructions(mutator, user_move, opponent_move, instruction_cache=instruction_cache)
+    if depth == 0 and len(state_instructions) >= MIN_BATCHED_LEAVES:
+        outcome_scores = evaluate_outcomes(mutator, state_instructions)
+        return sum(outcome_score * instructions.percentage for outcome_score, instructions in zip(outcome_scores, state_instructions))
+
+    score = 0
+    remaining_percentage = 1
+    for instructions in state_instructions:
+        this_percentage = instructions.percentage
+        remaining_percentage -= this_percentage
+        if not this_percentage:
+            continue
+
+        # the score of this outcome that would make the score of the move-pair <= alpha, or >= beta
+        outcome_alpha = (alpha - score - remaining_percentage * scoring.MAX_EVALUATION) / this_percentage
+        outcome_beta = (beta - score - remaining_percentage * scoring.MIN_EVALUATION) / this_percentage
+        if outcome_alpha >= scoring.MAX_EVALUATION:
+            return alpha
+        if outcome_beta <= scoring.MIN_EVALUATION:
+            return beta
+
+        mutator.apply_compiled(instructions.compiled_instructions)
+        try:
+            if depth == 0:
+                outcome_score = mutator.evaluate()
+            else:
+                outcome_score = get_safest_score(
+                    mutator, depth, outcome_alpha, outcome_beta,
+                    transposition_table=transposition_table,
+                    deadline=deadline,
+                    move_ordering=move_ordering,
+                    instruction_cache=instruction_cache
+                )
+        finally:
+            mutator.reverse_compiled(instructions.compiled_instructions)
+
+        if outcome_score <= outcome_alpha:
+            return alpha
+        if outcome_score >= outcome_beta:
+            return beta
+
+        score += outcome_score * this_percentage
+
+    return score
+
+
+def get_safest_score(mutator, depth, alpha=float('-inf'), beta=float('inf'), transposition_table=None, deadline=None, move_ordering=None, instruction_cache=None):
+    """The score of `pick_safest(get_move_combination_scores(mutator, depth))`, found with alpha-beta pruning:
+       the search of a user move stops once the opponent has a reply that makes it no better than a user move
+       already searched, and the search stops once the score is known to be >= `beta`
+
+    :param move_ordering: an optional MoveOrdering used to search the strongest options first.
+                          Cutoffs found by the search are recorded in it
+    :return: the score if it is between `alpha` and `beta`. Otherwise, a score that is <= `alpha` or >= `beta`
+             and is a bound on the real score
+    """
+    if deadline is not None and time.time() > deadline:
+        raise SearchTimeout()
+
+    depth -= 1
+    if battle_is_over(mutator.state):
+        return mutator.evaluate()
+
+    # the key must be taken before `get_all_options` because that function may modify the state
+    if transposition_table is not None:
+        state_key = get_state_key(mutator)
+        safest_score = transposition_table.get_safest_score(state_key, depth)
+        if safest_score is not None:
+            return safest_score
+
+    user_options, opponent_options = get_all_options(mutator)
+
+    # the same special case as in `get_move_combination_scores`
+    if opponent_options == [constants.DO_NOTHING_MOVE] and mutator.state.opponent.active.hp == 0:
+        return mutator.evaluate()
+
+    if move_ordering is not None:
+        user_options = move_ordering.order_options(mutator.state, constants.SELF, user_options, depth)
+        opponent_options = move_ordering.order_options(mutator.state, constants.OPPONENT, opponent_options, depth)
+
+    safest_score = float('-inf')
+    for user_move in user_options:
+        lower_bound = max(alpha, safest_score)
+        worst_score = float('inf')
+        for opponent_move in opponent_options:
+            score = get_pruned_move_pair_score(
+                mutator, user_move, opponent_move, depth, lower_bound, worst_score,
+                transposition_table=transposition_table,
+                deadline=deadline,
+                move_ordering=move_ordering,
+                instruction_cache=instruction_cache
+            )
+            worst_score = min(worst_score, score)
+            if worst_score <= lower_bound:
+                if move_ordering is not None:
+                    move_ordering.record_cutoff(constants.OPPONENT, opponent_move, depth)
+                break
+
+        safest_score = max(safest_score, worst_score)
+        if safest_score >= beta:
+            if move_ordering is not None:
+                move_ordering.record_cutoff(constants.SELF, user_move, depth)
+            break
+
+    # scores outside of the bounds are not exact, so they cannot be re-used
+    if transposition_table is not None and alpha < safest_score < beta:
+        transposition_table.store_safest_score(state_key, depth, safest_score)
+
+    return safest_score
+
+
+def get_move_combination_scores(mutator, depth=2, previous_moves=tuple(), previous_instructions=(), transposition_table=None, deadline=None, pruning=False, move_ordering=None, instruction_cache=None):
     """
     :param mutator: a StateMutator object representing the state of the battle
     :param depth: the remaining depth before the state is evaluated
     :param previous_moves: any previous moves that happened prior to this call
     :param previous_instructions: any previous instructions that were applied to the state before this call
+    :param transposition_table: an optional TranspositionTable used to re-use the scores of previously searched states
+    :param deadline: an optional time.time() value. SearchTimeout is raised if the search is still running after it
+    :param pruning: if True, the states after the first turn are searched with `get_safest_score`.
+                    The scores are the same, but fewer states are searched
+    :param move_ordering: an optional MoveOrdering used by the pruned search
+    :param instruction_cache: an optional InstructionCache used to re-use the instructions generated for a state
     :return: a dictionary representing the potential move combinations and their associated scores
     """
+    if deadline is not None and time.time() > deadline:
+        raise SearchTimeout()
+
     depth -= 1
     if battle_is_over(mutator.state):
-        return {(constants.DO_NOTHING_MOVE, constants.DO_NOTHING_MOVE): evaluate(mutator.state)}
+        return {(constants.DO_NOTHING_MOVE, constants.DO_NOTHING_MOVE): mutator.evaluate()}
+
+    # the key must be taken before `get_all_options` because that function may modify the state
+    if transposition_table is not None:
+        state_key = get_state_key(mutator)
+        state_scores = transposition_table.get_scores(state_key, depth)
+        if state_scores is not None:
+            return state_scores
 
     user_options, opponent_options = get_all_options(mutator)
 
@@ -98,31 +320,82 @@ def get_move_combination_scores(mutator, depth=2, previous_moves=tuple(), previo
     # this is a special case in a random battle where the opponent's pokemon has fainted, but the opponent still
     # has reserves left that are unseen
     if opponent_options == [constants.DO_NOTHING_MOVE] and mutator.state.opponent.active.hp == 0:
-        return {(user_option, constants.DO_NOTHING_MOVE): evaluate(mutator.state) for user_option in user_options}
+        return {(user_option, constants.DO_NOTHING_MOVE): mutator.evaluate() for user_option in user_options}
 
-    state_scores = dict()
-    for i, user_move in enumerate(user_options):
-        for j, opponent_move in enumerate(opponent_options):
-            score = 0
-            state_instructions = get_all_state_instructions(mutator, user_move, opponent_move)
-            if depth == 0:
-                for instructions in state_instructions:
-                    mutator.apply(instructions.instructions)
-                    t_score = evaluate(mutator.state)
-                    score += (t_score * instructions.percentage)
-                    mutator.reverse(instructions.instructions)
-
-            else:
-                for instructions in state_instructions:
-                    this_percentage = instructions.percentage
-                    mutator.apply(instructions.instructions)
-                    safest = pick_safest(get_move_combination_scores(
-                        mutator, depth, previous_moves=previous_moves + (user_move, opponent_move),
-                        previous_instructions=previous_instructions + tuple(instructions.instructions))
+    # every move-pair of the last turn is searched, so the outcomes of all of them are evaluated together
+    # a pruned search that reaches the last turn below this node batches the outcomes of each move-pair instead
+    if depth == 0:
+        state_scores = get_leaf_move_pair_scores(mutator, user_options, opponent_options, instruction_cache=instruction_cache)
+    else:
+        state_scores = dict()
+        for user_move in user_options:
+            for opponent_move in opponent_options:
+                if pruning:
+                    state_scores[(user_move, opponent_move)] = get_pruned_move_pair_score(
+                        mutator, user_move, opponent_move, depth,
+                        transposition_table=transposition_table,
+                        deadline=deadline,
+                        move_ordering=move_ordering,
+                        instruction_cache=instruction_cache
+                    )
+                else:
+                    state_scores[(user_move, opponent_move)] = get_move_pair_score(
+                        mutator, user_move, opponent_move, depth,
+                        previous_moves=previous_moves,
+                        previous_instructions=previous_instructions,
+                        transposition_table=transposition_table,
+                        deadline=deadline,
+                        instruction_cache=instruction_cache
                     )
-                    score += safest[1] * this_percentage
-                    mutator.reverse(instructions.instructions)
 
-            state_scores[(user_move, opponent_move)] = score
+    if transposition_table is not None:
+        transposition_table.store_scores(state_key, depth, state_scores)
 
     return state_scores
+
+
+def get_move_combination_scores_iterative(mutator, time_budget, max_depth, search_function=get_move_combination_scores, **kwargs):
+    """Searches to a depth of 1, 2, 3, ... `max_depth` until `time_budget` seconds have passed
+
+       The first depth is always searched to completion so that there is always a result
+       A depth is not started if the previous depth took longer than the time that is remaining,
+       because each depth takes longer than the one before it
+
+    :param search_function: the function used to search each depth. It is given `kwargs` and a `deadline`
+    :return: the score-lookup of the deepest search that completed, and that depth
+    """
+    start_time = time.time()
+    deadline = start_time + time_budget
+
+    # `get_all_options` modifies these values, so they are reset before every depth
+    force_switch = mutator.state.force_switch
+    trapped = mutator.state.self.trapped
+
+    state_scores = None
+    completed_depth = 0
+    for depth in range(1, max_depth + 1):
+        mutator.state.force_switch = force_switch
+        mutator.state.self.trapped = trapped
+
+        depth_start_time = time.time()
+        try:
+            state_scores = search_function(
+                mutator,
+                depth,
+                deadline=deadline if state_scores is not None else None,
+                **kwargs
+            )
+        except SearchTimeout:
+            logger.debug("Search timed out at depth {}".format(depth))
+            break
+
+        completed_depth = depth
+        now = time.time()
+        if now - depth_start_time > deadline - now:
+            break
+
+    mutator.state.force_switch = force_switch
+    mutator.state.self.trapped = trapped
+
+    logger.debug("Searched to a depth of {} in {:.2f} seconds".format(completed_depth, time.time() - start_time))
+    return state_scores, completed_depth
@@ -108,7 +108,7 @@ def thickfat(attacking_move, attacking_pokemon, defending_pokemon):
 
 
 def solidrock(attacking_move, attacking_pokemon, defending_pokemon):
-    if is_super_effective(attacking_move[constants.TYPE], defending_pokemon.types):
+    if is_super_effective(attacking_move[constants.TYPE], defending_pokemon.type_pair):
         attacking_move = attacking_move.copy()
         attacking_move[constants.BASE_POWER] *= (3/4)
     return attacking_move
@@ -202,7 +202,7 @@ def roughskin(attacking_move, attacking_pokemon, defending_pokemon):
 
 
 def wonderguard(attacking_move, attacking_pokemon, defending_pokemon):
-    if not is_super_effective(attacking_move[constants.TYPE], defending_pokemon.types):
+    if not is_super_effective(attacking_move[constants.TYPE], defending_pokemon.type_pair):
         attacking_move = attacking_move.copy()
         attacking_move[constants.BASE_POWER] = 0
     return attacking_move
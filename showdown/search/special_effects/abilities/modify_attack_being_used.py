@@ -213,7 +213,7 @@ def parentalbond(attacking_move, attacking_pokeon, defending_pokemon, first_move
 
 
 def tintedlens(attacking_move, attacking_pokemon, defending_pokemon, first_move):
-    if is_not_very_effective(attacking_move[constants.TYPE], defending_pokemon.types):
+    if is_not_very_effective(attacking_move[constants.TYPE], defending_pokemon.type_pair):
         attacking_move = attacking_move.copy()
         attacking_move[constants.BASE_POWER] *= 2
     return attacking_move
@@ -0,0 +1,107 @@
+import constants
+
+HASH_MASK = (1 << 64) - 1
+
+ACTIVE = "active_pokemon"
+STATIC = "static"
+DISABLED_MOVE = "disabled_move"
+VOLATILE_STATUS = "volatile_status"
+SIDE_CONDITION = "side_condition"
+
+BOOST_ATTRIBUTES = {
+    constants.ATTACK: 'attack_boost',
+    constants.DEFENSE: 'defense_boost',
+    constants.SPECIAL_ATTACK: 'special_attack_boost',
+    constants.SPECIAL_DEFENSE: 'special_defense_boost',
+    constants.SPEED: 'speed_boost',
+    constants.ACCURACY: 'accuracy_boost',
+    constants.EVASION: 'evasion_boost',
+}
+
+
+def zobrist_key(*feature):
+    """Maps a feature of the state, such as ('self', 'pikachu', 'hp', 100), to a pseudo-random 64-bit value
+
+       The hash of a state is the XOR of the keys of all of it's features, so changing one feature
+       only requires XOR-ing out the old key and XOR-ing in the new one.
+       Keys are derived with the splitmix64 finalizer instead of being stored in a table because
+       feature values like HP are not known ahead of time"""
+    x = (hash(feature) + 0x9E3779B97F4A7C15) & HASH_MASK
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & HASH_MASK
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & HASH_MASK
+    return x ^ (x >> 31)
+
+
+class ZobristKeys(dict):
+    """A table of the keys of the features that start with `prefix`, filled in the first time each one is looked up
+       ZobristKeys('self', 'pikachu', depth=2)['hp'][100] == zobrist_key('self', 'pikachu', 'hp', 100)
+
+       A key that has been looked up before costs a dict lookup instead of hashing the feature again,
+       which is what keeps the StateMutator's instructions cheap"""
+
+    __slots__ = ('prefix', 'depth')
+
+    def __init__(self, *prefix, depth=1):
+        super().__init__()
+        self.prefix = prefix
+        self.depth = depth
+
+    def __missing__(self, value):
+        if self.depth > 1:
+            key = ZobristKeys(*self.prefix, value, depth=self.depth - 1)
+        else:
+            key = zobrist_key(*self.prefix, value)
+        self[value] = key
+        return key
+
+
+def _hash_pokemon(side_string, pkmn):
+    # attributes that no instruction can modify are folded into one key
+    h = zobrist_key(
+        side_string,
+        pkmn.id,
+        STATIC,
+        pkmn.level,
+        pkmn.maxhp,
+        pkmn.ability,
+        pkmn.item,
+        pkmn.attack,
+        pkmn.defense,
+        pkmn.special_attack,
+        pkmn.special_defense,
+        pkmn.speed,
+        tuple(pkmn.types),
+        tuple((m[constants.ID], m.get(constants.CURRENT_PP)) for m in pkmn.moves)
+    )
+    h ^= zobrist_key(side_string, pkmn.id, constants.HITPOINTS, pkmn.hp)
+    h ^= zobrist_key(side_string, pkmn.id, constants.STATUS, pkmn.status)
+    for stat, attribute in BOOST_ATTRIBUTES.items():
+        h ^= zobrist_key(side_string, pkmn.id, stat, getattr(pkmn, attribute))
+    for volatile_status in pkmn.volatile_status:
+        h ^= zobrist_key(side_string, pkmn.id, VOLATILE_STATUS, volatile_status)
+    for move in pkmn.moves:
+        if move.get(constants.DISABLED):
+            h ^= zobrist_key(side_string, pkmn.id, DISABLED_MOVE, move[constants.ID])
+    return h
+
+
+def _hash_side(side_string, side):
+    h = zobrist_key(side_string, ACTIVE, side.active.id)
+    h ^= _hash_pokemon(side_string, side.active)
+    for pkmn in side.reserve.values():
+        h ^= _hash_pokemon(side_string, pkmn)
+    for condition, count in side.side_conditions.items():
+        if count:
+            h ^= zobrist_key(side_string, SIDE_CONDITION, condition, count)
+    return h
+
+
+def compute_state_hash(state):
+    """Computes the hash of `state` from scratch by visiting every feature
+       The StateMutator keeps this value up to date incrementally as instructions are applied
+
+       `force_switch`, `wait`, and `trapped` are not part of the hash since instructions never modify them"""
+    return _hash_side(constants.SELF, state.self) ^ \
+        _hash_side(constants.OPPONENT, state.opponent) ^ \
+        zobrist_key(constants.WEATHER, state.weather) ^ \
+        zobrist_key(constants.FIELD, state.field)
@@ -1,148 +1,322 @@
 import constants
+from showdown.search.state_hash import ZobristKeys
+from showdown.search.state_hash import compute_state_hash
+from showdown.search.state_hash import BOOST_ATTRIBUTES
+from showdown.search.state_hash import DISABLED_MOVE
+from showdown.search.state_hash import VOLATILE_STATUS
+from showdown.search.state_hash import SIDE_CONDITION
+from showdown.search.state_hash import ACTIVE
+from showdown.evaluate_state import evaluate
+from showdown.evaluate_state.incremental_evaluate import IncrementalEvaluator
+
+
+# instructions are compiled to a tuple of (opcode, side index, *arguments)
+# so that applying them is a list index instead of string comparisons and dict lookups
+OPCODES = {
+    name: opcode for opcode, name in enumerate([
+        constants.MUTATOR_SWITCH,
+        constants.MUTATOR_APPLY_VOLATILE_STATUS,
+        constants.MUTATOR_REMOVE_VOLATILE_STATUS,
+        constants.MUTATOR_DAMAGE,
+        constants.MUTATOR_HEAL,
+        constants.MUTATOR_BOOST,
+        constants.MUTATOR_UNBOOST,
+        constants.MUTATOR_APPLY_STATUS,
+        constants.MUTATOR_REMOVE_STATUS,
+        constants.MUTATOR_SIDE_START,
+        constants.MUTATOR_SIDE_END,
+        constants.MUTATOR_DISABLE_MOVE,
+        constants.MUTATOR_ENABLE_MOVE,
+    ])
+}
+
+SIDES = (constants.SELF, constants.OPPONENT)
+SIDE_INDEXES = {side: index for index, side in enumerate(SIDES)}
+
+# boost instructions are compiled with an index into this tuple in place of the stat
+BOOSTS = tuple(BOOST_ATTRIBUTES.items())
+BOOST_INDEXES = {stat: index for index, (stat, _) in enumerate(BOOSTS)}
+BOOST_OPCODES = {OPCODES[constants.MUTATOR_BOOST], OPCODES[constants.MUTATOR_UNBOOST]}
+
+# the zobrist keys that instructions XOR into the hash, indexed by side index. Shared by every mutator
+# POKEMON_KEYS[side_index][pokemon id][field][value], ACTIVE_KEYS[side_index][pokemon id],
+# and SIDE_CONDITION_KEYS[side_index][side-condition][count]
+POKEMON_KEYS = tuple(ZobristKeys(side, depth=3) for side in SIDES)
+ACTIVE_KEYS = tuple(ZobristKeys(side, ACTIVE) for side in SIDES)
+SIDE_CONDITION_KEYS = tuple(ZobristKeys(side, SIDE_CONDITION, depth=2) for side in SIDES)
+
+
+# each instruction tuple is compiled once: the instruction generator applies the same tuples over and over
+# the memo is emptied when it reaches `MAX_COMPILED_INSTRUCTIONS` so that a long-running bot does not keep every tuple
+MAX_COMPILED_INSTRUCTIONS = 100000
+_compiled_instructions = dict()
+
+
+def compile_instruction(instruction):
+    # an amount of 25 and of 25.0 are equal keys, but must not change the type of the value they are applied to
+    compiled_instruction = _compiled_instructions.get(instruction)
+    if compiled_instruction is not None and type(compiled_instruction[-1]) is type(instruction[-1]):
+        return compiled_instruction
+
+    compiled_instruction = _compile_instruction(instruction)
+    if len(_compiled_instructions) >= MAX_COMPILED_INSTRUCTIONS:
+        _compiled_instructions.clear()
+    _compiled_instructions[instruction] = compiled_instruction
+    return compiled_instruction
+
+
+def _compile_instruction(instruction):
+    try:
+        opcode = OPCODES[instruction[0]]
+    except KeyError:
+        raise ValueError("Invalid instruction: {}".format(instruction))
+
+    try:
+        side_index = SIDE_INDEXES[instruction[1]]
+    except KeyError:
+        raise ValueError("Invalid value for `side`")
+
+    if opcode in BOOST_OPCODES:
+        try:
+            boost_index = BOOST_INDEXES[instruction[2]]
+        except KeyError:
+            raise ValueError("Invalid stat: {}".format(instruction[2]))
+        return (opcode, side_index, boost_index, *instruction[3:])
+
+    return (opcode, side_index, *instruction[2:])
+
+
+def compile_instructions(instructions):
+    return tuple(compile_instruction(instruction) for instruction in instructions)
 
 
 class StateMutator:
 
-    def __init__(self, state):
+    def __init__(self, state, check_hash=False, matchup_table=None):
+        """`state_hash` is updated by every instruction that is applied or reversed
+           When `check_hash` is True it is compared against a full re-computation after every instruction,
+           and each score from `evaluate` is compared against a full evaluation
+
+           `matchup_table` is an optional MatchupTable, updated from `state`, that `evaluate` looks matchups up in"""
+        self.check_hash = check_hash
+        self.evaluator = IncrementalEvaluator(matchup_table)
+        self._changed_pokemon = self.evaluator.changed_pokemon
+        self._changed_side_conditions = self.evaluator.changed_side_conditions
         self.state = state
-        self.apply_instructions = {
-            constants.MUTATOR_SWITCH: self.switch,
-            constants.MUTATOR_APPLY_VOLATILE_STATUS: self.apply_volatile_status,
-            constants.MUTATOR_REMOVE_VOLATILE_STATUS: self.remove_volatile_status,
-            constants.MUTATOR_DAMAGE: self.damage,
-            constants.MUTATOR_HEAL: self.heal,
-            constants.MUTATOR_BOOST: self.boost,
-            constants.MUTATOR_UNBOOST: self.unboost,
-            constants.MUTATOR_APPLY_STATUS: self.apply_status,
-            constants.MUTATOR_REMOVE_STATUS: self.remove_status,
-            constants.MUTATOR_SIDE_START: self.side_start,
-            constants.MUTATOR_SIDE_END: self.side_end,
-            constants.MUTATOR_DISABLE_MOVE: self.disable_move,
-            constants.MUTATOR_ENABLE_MOVE: self.enable_move,
-        }
-        self.reverse_instructions = {
-            constants.MUTATOR_SWITCH: self.reverse_switch,
-            constants.MUTATOR_APPLY_VOLATILE_STATUS: self.remove_volatile_status,
-            constants.MUTATOR_REMOVE_VOLATILE_STATUS: self.apply_volatile_status,
-            constants.MUTATOR_DAMAGE: self.heal,
-            constants.MUTATOR_HEAL: self.damage,
-            constants.MUTATOR_BOOST: self.unboost,
-            constants.MUTATOR_UNBOOST: self.boost,
-            constants.MUTATOR_APPLY_STATUS: self.remove_status,
-            constants.MUTATOR_REMOVE_STATUS: self.apply_status,
-            constants.MUTATOR_SIDE_START: self.reverse_side_start,
-            constants.MUTATOR_SIDE_END: self.reverse_side_end,
-            constants.MUTATOR_DISABLE_MOVE: self.enable_move,
-            constants.MUTATOR_ENABLE_MOVE: self.disable_move,
-        }
+
+        # the instructions applied since the checkpoint by `advance_to`
+        self.cursor = ()
+
+        # both tables are indexed by opcode
+        self.apply_instructions = [None] * len(OPCODES)
+        self.reverse_instructions = [None] * len(OPCODES)
+        for name, apply_method, reverse_method in (
+            (constants.MUTATOR_SWITCH, self.switch, self.reverse_switch),
+            (constants.MUTATOR_APPLY_VOLATILE_STATUS, self.apply_volatile_status, self.remove_volatile_status),
+            (constants.MUTATOR_REMOVE_VOLATILE_STATUS, self.remove_volatile_status, self.apply_volatile_status),
+            (constants.MUTATOR_DAMAGE, self.damage, self.heal),
+            (constants.MUTATOR_HEAL, self.heal, self.damage),
+            (constants.MUTATOR_BOOST, self.boost, self.unboost),
+            (constants.MUTATOR_UNBOOST, self.unboost, self.boost),
+            (constants.MUTATOR_APPLY_STATUS, self.apply_status, self.remove_status),
+            (constants.MUTATOR_REMOVE_STATUS, self.remove_status, self.apply_status),
+            (constants.MUTATOR_SIDE_START, self.side_start, self.reverse_side_start),
+            (constants.MUTATOR_SIDE_END, self.side_end, self.reverse_side_end),
+            (constants.MUTATOR_DISABLE_MOVE, self.disable_move, self.enable_move),
+            (constants.MUTATOR_ENABLE_MOVE, self.enable_move, self.disable_move),
+        ):
+            self.apply_instructions[OPCODES[name]] = apply_method
+            self.reverse_instructions[OPCODES[name]] = reverse_method
+
+    @property
+    def state(self):
+        return self._state
+
+    @state.setter
+    def state(self, state):
+        self._state = state
+        self._hash_delta = 0
+        self.rehash()
+
+    def rehash(self):
+        """Discard the hash and the evaluation so they are re-computed from scratch when they are next needed
+           Must be called if the state is modified without using this object"""
+        self._sides = (self._state.self, self._state.opponent)
+        self._base_hash = None
+        self.evaluator.reset()
+
+    def evaluate(self):
+        """Returns `evaluate(self.state)`, re-scoring only what the instructions since the last evaluation changed"""
+        score = self.evaluator.evaluate(self._state)
+        if self.check_hash:
+            expected_score = evaluate(self._state)
+            if score != expected_score:
+                raise ValueError("State evaluation is {} but should be {}".format(score, expected_score))
+        return score
+
+    @property
+    def state_hash(self):
+        # instructions XOR their changes into `_hash_delta`, which makes them independent of the starting hash
+        # this means the full computation can be deferred until a hash is actually needed
+        if self._base_hash is None:
+            self._base_hash = compute_state_hash(self._state) ^ self._hash_delta
+        return self._base_hash ^ self._hash_delta
+
+    def _verify_hash(self, instruction):
+        expected_hash = compute_state_hash(self._state)
+        if self.state_hash != expected_hash:
+            raise ValueError("State hash is {} but should be {} after instruction: {}".format(self.state_hash, expected_hash, instruction))
 
     def apply(self, instructions):
-        for instruction in instructions:
-            method = self.apply_instructions[instruction[0]]
-            method(*instruction[1:])
+        self.apply_compiled(compile_instructions(instructions))
 
     def reverse(self, instructions):
-        for instruction in reversed(instructions):
-            method = self.reverse_instructions[instruction[0]]
-            method(*instruction[1:])
-
-    def _get_side(self, side):
-        if side == constants.SELF:
-            return self.state.self
-        elif side == constants.OPPONENT:
-            return self.state.opponent
+        self.reverse_compiled(compile_instructions(instructions))
+
+    def advance_to(self, instructions):
+        """Bring the state to the checkpoint with `instructions` applied
+
+           Only the instructions after the prefix shared with the previous call are reversed and applied,
+           so stepping through sequences that extend each other does not replay their common prefix.
+           The checkpoint is the state when the cursor was last empty; `apply` and `reverse` must not
+           be used until `rollback` returns the state to it"""
+        cursor = self.cursor
+        common = 0
+        limit = min(len(cursor), len(instructions))
+        while common < limit and cursor[common] == instructions[common]:
+            common += 1
+
+        if common < len(cursor):
+            self.reverse(cursor[common:])
+        if common < len(instructions):
+            self.apply(instructions[common:])
+        self.cursor = tuple(instructions)
+
+    def rollback(self):
+        """Return the state to the checkpoint"""
+        self.advance_to(())
+
+    def apply_compiled(self, compiled_instructions):
+        """Apply instructions produced by `compile_instructions`"""
+        apply_instructions = self.apply_instructions
+        if self.check_hash:
+            for instruction in compiled_instructions:
+                apply_instructions[instruction[0]](*instruction[1:])
+                self._verify_hash(instruction)
         else:
-            raise ValueError("Invalid value for `side`")
+            for instruction in compiled_instructions:
+                apply_instructions[instruction[0]](*instruction[1:])
 
-    def disable_move(self, side, move_name):
-        side = self._get_side(side)
-        try:
-            move = next(filter(lambda x: x[constants.ID] == move_name, side.active.moves))
-        except StopIteration:
-            raise ValueError("{} not in pokemon's moves: {}".format(move_name, side.active.moves))
+    def reverse_compiled(self, compiled_instructions):
+        reverse_instructions = self.reverse_instructions
+        if self.check_hash:
+            for instruction in reversed(compiled_instructions):
+                reverse_instructions[instruction[0]](*instruction[1:])
+                self._verify_hash(instruction)
+        else:
+            for instruction in reversed(compiled_instructions):
+                reverse_instructions[instruction[0]](*instruction[1:])
 
-        move[constants.DISABLED] = True
+    def _set_move_disabled(self, side_index, move_name, disabled):
+        pkmn = self._sides[side_index].active
+        move = pkmn.get_move(move_name)
+        if move is None:
+            raise ValueError("{} not in pokemon's moves: {}".format(move_name, pkmn.moves))
 
-    def enable_move(self, side, move_name):
-        side = self._get_side(side)
-        try:
-            move = next(filter(lambda x: x[constants.ID] == move_name, side.active.moves))
-        except StopIteration:
-            raise ValueError("{} not in pokemon's moves: {}".format(move_name, side.active.moves))
+        if move[constants.DISABLED] != disabled:
+            self._hash_delta ^= POKEMON_KEYS[side_index][pkmn.id][DISABLED_MOVE][move_name]
+        move[constants.DISABLED] = disabled
+
+    def disable_move(self, side_index, move_name):
+        self._set_move_disabled(side_index, move_name, True)
 
-        move[constants.DISABLED] = False
+    def enable_move(self, side_index, move_name):
+        self._set_move_disabled(side_index, move_name, False)
 
-    def switch(self, side, _, switch_pokemon_name):
+    def switch(self, side_index, _, switch_pokemon_name):
         # the second parameter to this function is the current active pokemon
         # this value must be here for reversing purposes
-        side = self._get_side(side)
+        side = self._sides[side_index]
+        active_keys = ACTIVE_KEYS[side_index]
 
+        self._hash_delta ^= active_keys[side.active.id]
         side.reserve[side.active.id] = side.active
         side.active = side.reserve.pop(switch_pokemon_name)
+        self._hash_delta ^= active_keys[side.active.id]
 
-    def reverse_switch(self, side, previous_active, current_active):
-        self.switch(side, current_active, previous_active)
-
-    def apply_volatile_status(self, side, volatile_status):
-        side = self._get_side(side)
-        side.active.volatile_status.add(volatile_status)
-
-    def remove_volatile_status(self, side, volatile_status):
-        side = self._get_side(side)
-        side.active.volatile_status.remove(volatile_status)
-
-    def damage(self, side, amount):
-        side = self._get_side(side)
-        side.active.hp -= amount
-
-    def heal(self, side, amount):
-        side = self._get_side(side)
-        side.active.hp += amount
-
-    def boost(self, side, stat, amount):
-        side = self._get_side(side)
-        if stat == constants.ATTACK:
-            side.active.attack_boost += amount
-        elif stat == constants.DEFENSE:
-            side.active.defense_boost += amount
-        elif stat == constants.SPECIAL_ATTACK:
-            side.active.special_attack_boost += amount
-        elif stat == constants.SPECIAL_DEFENSE:
-            side.active.special_defense_boost += amount
-        elif stat == constants.SPEED:
-            side.active.speed_boost += amount
-        elif stat == constants.ACCURACY:
-            side.active.accuracy_boost += amount
-        elif stat == constants.EVASION:
-            side.active.evasion_boost += amount
-        else:
-            raise ValueError("Invalid stat: {}".format(stat))
+    def reverse_switch(self, side_index, previous_active, current_active):
+        self.switch(side_index, current_active, previous_active)
+
+    def apply_volatile_status(self, side_index, volatile_status):
+        pkmn = self._sides[side_index].active
+        if volatile_status not in pkmn.volatile_status:
+            pkmn.volatile_status.add(volatile_status)
+            self._changed_pokemon.add(pkmn)
+            self._hash_delta ^= POKEMON_KEYS[side_index][pkmn.id][VOLATILE_STATUS][volatile_status]
+
+    def remove_volatile_status(self, side_index, volatile_status):
+        pkmn = self._sides[side_index].active
+        pkmn.volatile_status.remove(volatile_status)
+        self._changed_pokemon.add(pkmn)
+        self._hash_delta ^= POKEMON_KEYS[side_index][pkmn.id][VOLATILE_STATUS][volatile_status]
 
-    def unboost(self, side, stat, amount):
-        self.boost(side, stat, -1*amount)
+    def damage(self, side_index, amount):
+        pkmn = self._sides[side_index].active
+        hp_keys = POKEMON_KEYS[side_index][pkmn.id][constants.HITPOINTS]
+        old_hp = pkmn.hp
+        pkmn.hp = old_hp - amount
+        self._changed_pokemon.add(pkmn)
+        self._hash_delta ^= hp_keys[old_hp] ^ hp_keys[pkmn.hp]
 
-    def apply_status(self, side, status):
-        side = self._get_side(side)
-        side.active.status = status
+    def heal(self, side_index, amount):
+        self.damage(side_index, -1*amount)
 
-    def remove_status(self, side, _):
+    def boost(self, side_index, boost_index, amount):
+        pkmn = self._sides[side_index].active
+        stat, attribute = BOOSTS[boost_index]
+        boost_keys = POKEMON_KEYS[side_index][pkmn.id][stat]
+
+        old_boost = getattr(pkmn, attribute)
+        setattr(pkmn, attribute, old_boost + amount)
+        self._changed_pokemon.add(pkmn)
+        self._hash_delta ^= boost_keys[old_boost] ^ boost_keys[old_boost + amount]
+
+    def unboost(self, side_index, boost_index, amount):
+        self.boost(side_index, boost_index, -1*amount)
+
+    def apply_status(self, side_index, status):
+        pkmn = self._sides[side_index].active
+        status_keys = POKEMON_KEYS[side_index][pkmn.id][constants.STATUS]
+        self._hash_delta ^= status_keys[pkmn.status] ^ status_keys[status]
+        pkmn.status = status
+        self._changed_pokemon.add(pkmn)
+
+    def remove_status(self, side_index, _):
         # the second parameter of this function is the status being removed
         # this value must be here for reverse purposes
-        self.apply_status(side, None)
+        self.apply_status(side_index, None)
+
+    def _set_side_condition(self, side_index, effect, count):
+        side = self._sides[side_index]
+        side_condition_keys = SIDE_CONDITION_KEYS[side_index][effect]
+        old_count = side.side_conditions[effect]
+        if old_count:
+            self._hash_delta ^= side_condition_keys[old_count]
+        if count:
+            self._hash_delta ^= side_condition_keys[count]
+        side.side_conditions[effect] = count
+        self._changed_side_conditions.add(side_index)
 
-    def side_start(self, side, effect, amount):
-        side = self._get_side(side)
-        side.side_conditions[effect] += amount
+    def side_start(self, side_index, effect, amount):
+        self._set_side_condition(side_index, effect, self._sides[side_index].side_conditions[effect] + amount)
 
-    def reverse_side_start(self, side, effect, amount):
-        side = self._get_side(side)
-        side.side_conditions[effect] -= amount
+    def reverse_side_start(self, side_index, effect, amount):
+        self._set_side_condition(side_index, effect, self._sides[side_index].side_conditions[effect] - amount)
 
-    def side_end(self, side, effect, _):
+    def side_end(self, side_index, effect, _):
         # the third parameter of this function is the amount being removed
         # this value must be here for reverse purposes
-        side = self._get_side(side)
-        side.side_conditions[effect] = 0
+        self._set_side_condition(side_index, effect, 0)
 
-    def reverse_side_end(self, side, effect, amount):
-        self.side_start(side, effect, amount)
+    def reverse_side_end(self, side_index, effect, amount):
+        self.side_start(side_index, effect, amount)
@@ -1,19 +1,39 @@
 from copy import copy
 
+from showdown.search.state_mutator import compile_instructions
+
 
 class TransposeInstruction:
-    __slots__ = ('percentage', 'instructions', 'frozen')
+    __slots__ = ('percentage', '_instructions', 'frozen', '_compiled_instructions')
 
     def __init__(self, percentage, instructions, frozen):
         self.percentage = percentage
         self.instructions = instructions
         self.frozen = frozen
 
+    @property
+    def instructions(self):
+        return self._instructions
+
+    @instructions.setter
+    def instructions(self, instructions):
+        self._instructions = instructions
+        self._compiled_instructions = None
+
+    @property
+    def compiled_instructions(self):
+        """The instructions compiled for `StateMutator.apply_compiled`
+           They are compiled once, so outcomes that are re-used by a search are cheaper to apply"""
+        if self._compiled_instructions is None:
+            self._compiled_instructions = compile_instructions(self._instructions)
+        return self._compiled_instructions
+
     def update_percentage(self, modifier):
         self.percentage *= modifier
 
     def add_instruction(self, instruction):
-        self.instructions.append(instruction)
+        self._instructions.append(instruction)
+        self._compiled_instructions = None
 
     def __copy__(self):
         return TransposeInstruction(self.percentage, copy(self.instructions), self.frozen)
@@ -0,0 +1,38 @@
+from showdown.lru_cache import LRUCache
+
+
+SAFEST_SCORE = "safest_score"
+
+
+def get_state_key(mutator):
+    """The key of the mutator's state in a TranspositionTable
+
+       Two states that compare equal field-by-field have the same key regardless of
+       the order that volatile statuses, reserves, or side-conditions were added in"""
+    state = mutator.state
+    return (
+        mutator.state_hash,
+        state.force_switch,
+        state.wait,
+        state.self.trapped,
+        state.opponent.trapped
+    )
+
+
+class TranspositionTable(LRUCache):
+    """Caches the score-lookup produced by `get_move_combination_scores` for a state at a given remaining depth
+
+       A state reached through different instruction sequences (i.e. two damage rolls that both KO)
+       only has its subtree searched once"""
+
+    def get_scores(self, state_key, depth):
+        return self.get((state_key, depth))
+
+    def store_scores(self, state_key, depth, scores):
+        self.put((state_key, depth), scores)
+
+    def get_safest_score(self, state_key, depth):
+        return self.get((state_key, depth, SAFEST_SCORE))
+
+    def store_safest_score(self, state_key, depth, score):
+        self.put((state_key, depth, SAFEST_SCORE), score)
@@ -0,0 +1,135 @@
+import time
+import asyncio
+import concurrent.futures
+import multiprocessing
+
+import config
+from config import logger
+from data.mods.apply_mods import apply_mods
+from showdown.search.move_plan import build_move_plans
+from showdown.evaluate_state.evaluations import apply_evaluation
+from showdown.evaluate_state.evaluate_pokemon import reset_evaluation_cache
+from showdown.search.find_state_instructions import reset_damage_cache
+from showdown.search.parallel_search import set_worker_battle_number
+
+
+# the config values that the search reads inside of a worker process
+WORKER_CONFIG_ATTRIBUTES = (
+    'damage_calc_type',
+    'transposition_table_size',
+    'instruction_cache_size',
+    'instruction_cache_max_instructions',
+    'evaluation_cache_size',
+    'damage_cache_size',
+    'evaluation_file',
+    'evaluation',
+    'branch_probability_floor',
+    'max_branches',
+    'debug_state_hash'
+)
+
+
+def initialize_search_worker(pokemon_mode, config_values, battle_number):
+    """Runs once when a worker process starts so that it searches with the same data and settings as the bot
+       Applying the mods also imports the move and pokedex data, so the first search does not pay for it"""
+    for name, value in config_values.items():
+        setattr(config, name, value)
+    set_worker_battle_number(battle_number)
+    apply_mods(pokemon_mode)
+    build_move_plans()
+    apply_evaluation(pokemon_mode)
+
+
+def _warm_up_search_worker():
+    return True
+
+
+class SearchService:
+    """Owns the executors that searches run on for the whole life of the bot
+
+       `run` executes a search on the decision threads so that it does not block the event loop.
+       If `process_count` is positive, `process_pool` is a ProcessPoolExecutor that a search can split its work across.
+       Its workers are started and initialized as soon as the service is created
+
+       The evaluation and damage caches are module-level and are not locked, so they are only safe to use from
+       one thread at a time. That holds with any number of decision threads because the bot plays one battle at a time
+       and waits for each decision before searching the next one. Each worker process has caches of its own"""
+
+    def __init__(self, pokemon_mode, thread_count=1, process_count=0):
+        self.decision_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=thread_count,
+            thread_name_prefix="search"
+        )
+
+        self.process_pool = None
+        self.battle_number = None
+        if process_count > 0:
+            config_values = {name: getattr(config, name) for name in WORKER_CONFIG_ATTRIBUTES}
+            self.battle_number = multiprocessing.Value('q', 0)
+            self.process_pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=process_count,
+                initializer=initialize_search_worker,
+                initargs=(pokemon_mode, config_values, self.battle_number)
+            )
+            warm_up_futures = [self.process_pool.submit(_warm_up_search_worker) for _ in range(process_count)]
+            concurrent.futures.wait(warm_up_futures)
+
+        self.submitted = 0
+        self.started = 0
+        self.completed = 0
+        self.total_queue_time = 0
+        self.total_run_time = 0
+
+    @property
+    def queue_depth(self):
+        """The number of searches that are waiting for a decision thread"""
+        return self.submitted - self.started
+
+    @property
+    def in_progress(self):
+        return self.started - self.completed
+
+    def start_battle(self):
+        """Resets the caches that are kept for a battle in this process
+           Each worker process resets its own the first time it searches after this"""
+        reset_evaluation_cache()
+        reset_damage_cache()
+        if self.battle_number is not None:
+            with self.battle_number.get_lock():
+                self.battle_number.value += 1
+
+    async def run(self, function, *args):
+        """Runs `function(*args)` on a decision thread and returns its result"""
+        submit_time = time.time()
+        self.submitted += 1
+
+        def timed_function():
+            start_time = time.time()
+            self.started += 1
+            self.total_queue_time += start_time - submit_time
+            try:
+                return function(*args)
+            finally:
+                self.total_run_time += time.time() - start_time
+
+        loop = asyncio.get_event_loop()
+        try:
+            return await loop.run_in_executor(self.decision_executor, timed_function)
+        finally:
+            self.completed += 1
+            logger.debug("Search service: {}".format(self))
+
+    def shutdown(self):
+        self.decision_executor.shutdown()
+        if self.process_pool is not None:
+            self.process_pool.shutdown()
+
+    def __repr__(self):
+        return "{}(queue_depth={}, in_progress={}, completed={}, average_queue_time={:.3f}, average_run_time={:.3f})".format(
+            self.__class__.__name__,
+            self.queue_depth,
+            self.in_progress,
+            self.completed,
+            self.total_queue_time / self.completed if self.completed else 0,
+            self.total_run_time / self.completed if self.completed else 0
+        )
@@ -1,3 +1,4 @@
+import config
 import constants
 from copy import copy
 from data import get_spread
@@ -6,6 +7,9 @@ from showdown.state.pokemon import Pokemon
 from showdown.search.objects import State
 from showdown.search.objects import Side
 from showdown.search.objects import Pokemon as TransposePokemon
+from showdown.search.move_ordering import MoveOrdering
+from showdown.search.instruction_cache import InstructionCache
+from showdown.evaluate_state.matchup_table import MatchupTable
 
 
 class Battle:
@@ -23,6 +27,20 @@ class Battle:
         self.force_switch = False
         self.wait = False
 
+        # seconds left on the battle timer for this turn. None when the timer is not on
+        self.time_remaining = None
+
+        # killer moves and history kept between turns to order the options in a pruned search
+        self.move_ordering = MoveOrdering()
+
+        # instructions generated for the states searched on previous turns
+        self.instruction_cache = None
+        if config.instruction_cache_size > 0:
+            self.instruction_cache = InstructionCache(config.instruction_cache_size, config.instruction_cache_max_instructions)
+
+        # the matchup scores of each pair of the bot's pokemon and the opponent's pokemon
+        self.matchup_table = MatchupTable()
+
     def initialize_team_preview(self, user_json, opponent_pokemon):
         self.user.from_json(user_json, first_turn=True)
         self.user.reserve.insert(0, self.user.active)
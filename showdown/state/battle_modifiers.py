@@ -1,3 +1,4 @@
+import re
 import json
 import constants
 from config import logger
@@ -288,6 +289,20 @@ def form_change(battle, split_msg):
             battle.opponent.active.base_name = base_name
 
 
+def inactive(battle, split_msg):
+    """Keep track of the time left on the battle timer. The message looks like:
+       |inactive|Time left: 150 sec this turn | 280 sec total"""
+    match = re.match(constants.TIMER_TIME_LEFT_REGEX, split_msg[2].strip())
+    if match is not None:
+        battle.time_remaining = int(match.group(1))
+        logger.debug("Time remaining: {} seconds".format(battle.time_remaining))
+
+
+def inactiveoff(battle, _):
+    """The battle timer was turned off"""
+    battle.time_remaining = None
+
+
 async def update_battle(battle, msg):
     msg_lines = msg.split('\n')
 
@@ -328,7 +343,9 @@ async def update_battle(battle, msg):
             '-ability': set_opponent_ability_from_ability_tag,
             'detailschange': form_change,
             'replace': form_change,
-            '-formechange': form_change
+            '-formechange': form_change,
+            'inactive': inactive,
+            'inactiveoff': inactiveoff
         }
 
         function_to_call = battle_modifiers_lookup.get(action)
@@ -0,0 +1,86 @@
+import unittest
+import constants
+from showdown.calculate_damage import DamageCalculator
+from showdown.calculate_damage import calculate_damage_batch
+from showdown.calculate_damage.batch_damage_calculator import PokemonArrays
+from showdown.calculate_damage.batch_damage_calculator import MoveTable
+from showdown.search.objects import Pokemon
+from showdown.state.pokemon import Pokemon as StatePokemon
+
+
+class TestCalculateDamageBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.damage_calculator = DamageCalculator()
+
+        self.charizard = Pokemon.from_state_pokemon_dict(StatePokemon("charizard", 100).to_dict())
+        self.venusaur = Pokemon.from_state_pokemon_dict(StatePokemon("venusaur", 100).to_dict())
+        self.tyranitar = Pokemon.from_state_pokemon_dict(StatePokemon("tyranitar", 81).to_dict())
+        self.pikachu = Pokemon.from_state_pokemon_dict(StatePokemon("pikachu", 88).to_dict())
+
+        self.pokemon = [self.charizard, self.venusaur, self.tyranitar, self.pikachu]
+        self.moves = ['fireblast', 'earthquake', 'rockslide', 'surf', 'psychic', 'thunderbolt', 'return', 'toxic', 'seismictoss']
+
+    def assert_batch_matches_calculate_damage(self, conditions, calc_type):
+        rolls = calculate_damage_batch(self.pokemon, self.pokemon, self.moves, conditions, calc_type=calc_type)
+
+        self.assertEqual((len(self.pokemon), len(self.moves), len(self.pokemon)), rolls.shape[:3])
+        for i, attacker in enumerate(self.pokemon):
+            for j, move in enumerate(self.moves):
+                for k, defender in enumerate(self.pokemon):
+                    expected_rolls = self.damage_calculator.calculate_damage(attacker, defender, move, conditions, calc_type=calc_type)
+                    if expected_rolls is None:
+                        self.assertTrue((rolls[i, j, k] == 0).all())
+                    else:
+                        self.assertEqual(set(expected_rolls), set(rolls[i, j, k].tolist()))
+
+    def test_batch_matches_calculate_damage_without_conditions(self):
+        self.assert_batch_matches_calculate_damage(None, 'average')
+
+    def test_batch_matches_calculate_damage_for_every_calc_type(self):
+        for calc_type in ['average', 'max', 'min_max', 'min_max_average', 'all']:
+            self.assert_batch_matches_calculate_damage(None, calc_type)
+
+    def test_batch_matches_calculate_damage_with_boosts_and_burn(self):
+        self.charizard.special_attack_boost = 2
+        self.venusaur.defense_boost = -1
+        self.tyranitar.attack_boost = 6
+        self.tyranitar.status = constants.BURN
+        self.pikachu.special_defense_boost = -6
+
+        self.assert_batch_matches_calculate_damage(None, 'all')
+
+    def test_batch_matches_calculate_damage_with_weather_and_screens(self):
+        for conditions in [
+            {constants.WEATHER: constants.SAND},
+            {constants.WEATHER: constants.SUN, constants.REFLECT: 1},
+            {constants.WEATHER: constants.RAIN, constants.LIGHT_SCREEN: 1},
+            {constants.WEATHER: constants.DESOLATE_LAND, constants.AURORA_VEIL: 1},
+        ]:
+            self.assert_batch_matches_calculate_damage(conditions, 'min_max')
+
+    def test_all_calc_type_returns_sixteen_rolls(self):
+        rolls = calculate_damage_batch([self.charizard], [self.venusaur], ['fireblast'], calc_type='all')
+
+        self.assertEqual((1, 1, 1, 16), rolls.shape)
+        self.assertEqual(300, rolls[0, 0, 0, -1])
+
+    def test_non_damaging_move_deals_no_damage(self):
+        rolls = calculate_damage_batch([self.charizard], [self.venusaur], ['toxic'], calc_type='max')
+
+        self.assertEqual([[[[0]]]], rolls.tolist())
+
+    def test_precomputed_arrays_give_the_same_rolls(self):
+        expected_rolls = calculate_damage_batch(self.pokemon, self.pokemon, self.moves)
+
+        rolls = calculate_damage_batch(
+            PokemonArrays.from_pokemon(self.pokemon),
+            PokemonArrays.from_pokemon(self.pokemon),
+            MoveTable.from_moves(self.moves)
+        )
+
+        self.assertTrue((expected_rolls == rolls).all())
+
+    def test_invalid_calc_type_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            calculate_damage_batch([self.charizard], [self.venusaur], ['fireblast'], calc_type='median')
@@ -0,0 +1,164 @@
+import unittest
+from unittest import mock
+
+from collections import defaultdict
+import constants
+from showdown.evaluate_state import evaluate
+from showdown.evaluate_state.batch_evaluate import evaluate_leaves
+from showdown.search import select_best_move
+from showdown.search.select_best_move import get_all_options
+from showdown.search.select_best_move import get_move_combination_scores
+from showdown.search.find_state_instructions import get_all_state_instructions
+from showdown.search.objects import State
+from showdown.search.objects import Side
+from showdown.state.pokemon import Pokemon as StatePokemon
+from showdown.search.objects import Pokemon
+from showdown.search.state_mutator import StateMutator
+from showdown.search.state_mutator import compile_instructions
+
+
+class TestEvaluateLeaves(unittest.TestCase):
+    def setUp(self):
+        self.state = State(
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("pikachu", 100).to_dict()),
+                {
+                    "rattata": Pokemon.from_state_pokemon_dict(StatePokemon("rattata", 100).to_dict()),
+                    "charizard": Pokemon.from_state_pokemon_dict(StatePokemon("charizard", 100).to_dict()),
+                },
+                defaultdict(int),
+                False
+            ),
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("aromatisse", 81).to_dict()),
+                {
+                    "gyarados": Pokemon.from_state_pokemon_dict(StatePokemon("gyarados", 81).to_dict()),
+                },
+                defaultdict(int),
+                False
+            ),
+            None,
+            None,
+            False,
+            False
+        )
+        self.state.self.active.moves = [
+            {'id': 'thunderbolt', 'disabled': False, 'current_pp': 16},
+            {'id': 'voltswitch', 'disabled': False, 'current_pp': 16},
+            {'id': 'nastyplot', 'disabled': False, 'current_pp': 16},
+        ]
+        self.state.self.reserve['rattata'].moves = [{'id': 'tackle', 'disabled': False, 'current_pp': 16}]
+        self.state.self.reserve['charizard'].moves = [
+            {'id': 'fireblast', 'disabled': False, 'current_pp': 16},
+            {'id': 'willowisp', 'disabled': False, 'current_pp': 16},
+        ]
+        self.state.opponent.active.moves = [
+            {'id': 'moonblast', 'disabled': False, 'current_pp': 16},
+            {'id': 'stealthrock', 'disabled': False, 'current_pp': 16},
+            {'id': 'substitute', 'disabled': False, 'current_pp': 16},
+        ]
+        self.mutator = StateMutator(self.state)
+
+        # ensure that the opposing pokemon has no moves from the data lookup
+        get_move_set_patcher = mock.patch.object(select_best_move, 'get_move_set', return_value=set())
+        get_move_set_patcher.start()
+        self.addCleanup(get_move_set_patcher.stop)
+
+    def evaluate_each(self, compiled_instruction_lists):
+        scores = []
+        for compiled_instructions in compiled_instruction_lists:
+            self.mutator.apply_compiled(compiled_instructions)
+            scores.append(evaluate(self.state))
+            self.mutator.reverse_compiled(compiled_instructions)
+        return scores
+
+    def test_leaves_of_every_pair_of_moves_are_evaluated_like_evaluate(self):
+        user_options, opponent_options = get_all_options(self.mutator)
+        compiled_instruction_lists = [
+            instructions.compiled_instructions
+            for user_move in user_options
+            for opponent_move in opponent_options
+            for instructions in get_all_state_instructions(self.mutator, user_move, opponent_move)
+        ]
+
+        expected_scores = self.evaluate_each(compiled_instruction_lists)
+        self.assertEqual(expected_scores, evaluate_leaves(self.state, compiled_instruction_lists).tolist())
+
+    def test_each_kind_of_instruction_is_evaluated_like_evaluate(self):
+        compiled_instruction_lists = [
+            compile_instructions([
+                (constants.MUTATOR_DAMAGE, constants.OPPONENT, 50),
+                (constants.MUTATOR_HEAL, constants.OPPONENT, 20),
+            ]),
+            compile_instructions([
+                (constants.MUTATOR_BOOST, constants.SELF, constants.SPECIAL_ATTACK, 2),
+                (constants.MUTATOR_UNBOOST, constants.OPPONENT, constants.SPEED, 1),
+                (constants.MUTATOR_BOOST, constants.OPPONENT, constants.ACCURACY, 1),
+            ]),
+            compile_instructions([
+                (constants.MUTATOR_APPLY_STATUS, constants.OPPONENT, constants.BURN),
+                (constants.MUTATOR_APPLY_STATUS, constants.SELF, constants.PARALYZED),
+                (constants.MUTATOR_REMOVE_STATUS, constants.SELF, constants.PARALYZED),
+            ]),
+            compile_instructions([
+                (constants.MUTATOR_APPLY_VOLATILE_STATUS, constants.OPPONENT, constants.SUBSTITUTE),
+                (constants.MUTATOR_APPLY_VOLATILE_STATUS, constants.SELF, constants.CONFUSION),
+                (constants.MUTATOR_REMOVE_VOLATILE_STATUS, constants.SELF, constants.CONFUSION),
+            ]),
+            compile_instructions([
+                (constants.MUTATOR_SIDE_START, constants.SELF, constants.STEALTH_ROCK, 1),
+                (constants.MUTATOR_SIDE_START, constants.OPPONENT, constants.REFLECT, 1),
+                (constants.MUTATOR_SIDE_START, constants.OPPONENT, constants.SPIKES, 2),
+                (constants.MUTATOR_SIDE_END, constants.OPPONENT, constants.SPIKES, 2),
+            ]),
+            compile_instructions([
+                (constants.MUTATOR_SIDE_START, constants.SELF, constants.STEALTH_ROCK, 1),
+                (constants.MUTATOR_SWITCH, constants.SELF, 'pikachu', 'charizard'),
+                (constants.MUTATOR_DAMAGE, constants.SELF, self.state.self.reserve['charizard'].hp),
+                (constants.MUTATOR_SWITCH, constants.SELF, 'charizard', 'rattata'),
+                (constants.MUTATOR_SWITCH, constants.OPPONENT, 'aromatisse', 'gyarados'),
+            ]),
+            compile_instructions([
+                (constants.MUTATOR_DAMAGE, constants.OPPONENT, self.state.opponent.active.hp),
+            ]),
+            compile_instructions([]),
+        ]
+
+        expected_scores = self.evaluate_each(compiled_instruction_lists)
+        self.assertEqual(expected_scores, evaluate_leaves(self.state, compiled_instruction_lists).tolist())
+
+    def test_evaluating_leaves_does_not_modify_the_state(self):
+        expected_hash = self.mutator.state_hash
+        evaluate_leaves(self.state, [compile_instructions([(constants.MUTATOR_DAMAGE, constants.SELF, 50)])])
+
+        self.mutator.rehash()
+        self.assertEqual(expected_hash, self.mutator.state_hash)
+
+    def test_search_with_batched_leaves_produces_the_same_scores(self):
+        with mock.patch.object(select_best_move, 'MIN_BATCHED_LEAVES', float('inf')):
+            expected_scores = get_move_combination_scores(self.mutator, 2)
+
+        with mock.patch.object(select_best_move, 'MIN_BATCHED_LEAVES', 1):
+            scores = get_move_combination_scores(self.mutator, 2)
+
+        self.assertEqual(expected_scores, scores)
+
+    def test_pruned_search_evaluates_the_last_turn_in_batches(self):
+        with mock.patch.object(select_best_move, 'MIN_BATCHED_LEAVES', 1):
+            with mock.patch.object(select_best_move, 'evaluate_leaves', wraps=evaluate_leaves) as evaluate_leaves_mock:
+                get_move_combination_scores(self.mutator, 2, pruning=True)
+
+        self.assertTrue(evaluate_leaves_mock.called)
+
+    def test_pruned_search_with_batched_leaves_produces_the_same_scores(self):
+        with mock.patch.object(select_best_move, 'MIN_BATCHED_LEAVES', float('inf')):
+            expected_scores = get_move_combination_scores(self.mutator, 3, pruning=True)
+
+        with mock.patch.object(select_best_move, 'MIN_BATCHED_LEAVES', 1):
+            scores = get_move_combination_scores(self.mutator, 3, pruning=True)
+
+        self.assertEqual(expected_scores, scores)
+
+
+if __name__ == '__main__':
+    unittest.main()
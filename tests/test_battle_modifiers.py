@@ -19,6 +19,8 @@ from showdown.state.battle_modifiers import end_volatile_status
 from showdown.state.battle_modifiers import set_opponent_ability
 from showdown.state.battle_modifiers import set_opponent_ability_from_ability_tag
 from showdown.state.battle_modifiers import form_change
+from showdown.state.battle_modifiers import inactive
+from showdown.state.battle_modifiers import inactiveoff
 
 
 class TestRequestMessage(unittest.TestCase):
@@ -780,3 +782,26 @@ class TestFormChange(unittest.TestCase):
 
         pkmn = Pokemon("wishiwashischool", 100)
         self.assertNotIn(pkmn, self.battle.opponent.reserve)
+
+
+class TestInactive(unittest.TestCase):
+    def setUp(self):
+        self.battle = Battle(None)
+
+    def test_sets_time_remaining(self):
+        split_msg = ['', 'inactive', 'Time left: 150 sec this turn ', ' 280 sec total']
+        inactive(self.battle, split_msg)
+
+        self.assertEqual(150, self.battle.time_remaining)
+
+    def test_does_not_set_time_remaining_for_other_inactive_messages(self):
+        split_msg = ['', 'inactive', 'Battle timer is ON: inactive players will automatically lose when time\'s up.']
+        inactive(self.battle, split_msg)
+
+        self.assertIsNone(self.battle.time_remaining)
+
+    def test_inactiveoff_clears_time_remaining(self):
+        self.battle.time_remaining = 150
+        inactiveoff(self.battle, ['', 'inactiveoff', 'Battle timer is now OFF.'])
+
+        self.assertIsNone(self.battle.time_remaining)
@@ -0,0 +1,294 @@
+import pickle
+import unittest
+from collections import defaultdict
+
+import constants
+
+from showdown.state.battle import Battle
+from showdown.state.pokemon import Pokemon as StatePokemon
+from showdown.search.objects import State
+from showdown.search.objects import Side
+from showdown.search.objects import Pokemon
+from showdown.search.objects import CompactState
+from showdown.search.state_mutator import StateMutator
+from showdown.search.compact_state_mutator import CompactStateMutator
+from showdown.search.find_state_instructions import get_all_state_instructions
+from showdown.search.state_hash import compute_state_hash
+
+
+class TestCompactState(unittest.TestCase):
+    def setUp(self):
+        self.state = State(
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("pikachu", 100).to_dict()),
+                {
+                    "rattata": Pokemon.from_state_pokemon_dict(StatePokemon("rattata", 100).to_dict()),
+                    "charmander": Pokemon.from_state_pokemon_dict(StatePokemon("charmander", 100).to_dict()),
+                },
+                defaultdict(int),
+                False
+            ),
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("aromatisse", 81).to_dict()),
+                {
+                    "gyarados": Pokemon.from_state_pokemon_dict(StatePokemon("gyarados", 81).to_dict()),
+                },
+                defaultdict(int),
+                False
+            ),
+            None,
+            None,
+            False,
+            False
+        )
+        self.state.self.active.moves = [
+            {
+                'id': 'thunderbolt',
+                'disabled': False,
+                'current_pp': 16
+            },
+            {
+                'id': 'volttackle',
+                'disabled': True,
+                'current_pp': 16
+            }
+        ]
+        self.state.self.active.volatile_status = {'confusion'}
+        self.state.self.active.status = constants.PARALYZED
+        self.state.self.active.attack_boost = 2
+        self.state.opponent.active.speed_boost = -1
+        self.state.opponent.side_conditions[constants.STEALTH_ROCK] = 1
+        self.state.self.side_conditions[constants.SPIKES] = 2
+
+    def test_state_round_trips_through_compact_state(self):
+        round_tripped = CompactState.from_state(self.state).to_state()
+
+        self.assertEqual(compute_state_hash(self.state), compute_state_hash(round_tripped))
+        self.assertEqual(str(self.state), str(round_tripped))
+
+    def test_compact_state_can_be_created_from_a_state_dict(self):
+        state_dict = eval(str(self.state))
+        compact_state = CompactState.from_dict(state_dict)
+
+        self.assertEqual(compute_state_hash(self.state), compute_state_hash(compact_state.to_state()))
+
+    def test_compact_state_round_trips_the_output_of_battle_to_object(self):
+        battle = Battle(None)
+        battle.started = True
+        battle.user.active = StatePokemon("pikachu", 100)
+        battle.user.reserve = [StatePokemon("rattata", 100)]
+        battle.opponent.active = StatePokemon("aromatisse", 81)
+        battle.user.side_conditions[constants.REFLECT] = 1
+        state = battle.to_object()
+
+        round_tripped = CompactState.from_state(state).to_state()
+
+        self.assertEqual(compute_state_hash(state), compute_state_hash(round_tripped))
+
+    def test_unknown_status_raises_value_error(self):
+        self.state.self.active.status = 'not_a_status'
+        with self.assertRaises(ValueError):
+            CompactState.from_state(self.state)
+
+    def test_whole_float_hp_is_stored(self):
+        self.state.self.active.hp = 100.0
+
+        self.assertEqual(100, CompactState.from_state(self.state).to_state().self.active.hp)
+
+    def test_fractional_hp_raises_value_error(self):
+        self.state.self.active.hp = 75.875
+        with self.assertRaises(ValueError):
+            CompactState.from_state(self.state)
+
+    def test_copy_is_equal_and_independent(self):
+        compact_state = CompactState.from_state(self.state)
+        copied_state = compact_state.copy()
+
+        self.assertEqual(compact_state, copied_state)
+        self.assertEqual(hash(compact_state), hash(copied_state))
+
+        CompactStateMutator(copied_state).damage(constants.SELF, 10)
+        self.assertNotEqual(compact_state, copied_state)
+
+    def test_zero_side_conditions_do_not_change_equality(self):
+        compact_state = CompactState.from_state(self.state)
+        copied_state = compact_state.copy()
+        copied_state.set_side_condition(constants.OPPONENT, constants.REFLECT, 0)
+
+        self.assertEqual(compact_state, copied_state)
+
+    def test_pickled_compact_state_round_trips(self):
+        compact_state = CompactState.from_state(self.state)
+        unpickled = pickle.loads(pickle.dumps(compact_state))
+
+        self.assertEqual(compute_state_hash(self.state), compute_state_hash(unpickled.to_state()))
+
+    def test_states_of_different_pokemon_are_not_equal(self):
+        other_state = State(
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("mewtwo", 100).to_dict()),
+                {
+                    "rattata": Pokemon.from_state_pokemon_dict(StatePokemon("rattata", 100).to_dict()),
+                    "charmander": Pokemon.from_state_pokemon_dict(StatePokemon("charmander", 100).to_dict()),
+                },
+                defaultdict(int),
+                False
+            ),
+            self.state.opponent,
+            None,
+            None,
+            False,
+            False
+        )
+        for attribute in ('hp', 'status', 'attack_boost', 'volatile_status', 'moves'):
+            setattr(other_state.self.active, attribute, getattr(self.state.self.active, attribute))
+        other_state.self.side_conditions = self.state.self.side_conditions
+
+        compact_state = CompactState.from_state(self.state)
+        other_compact_state = CompactState.from_state(other_state)
+
+        self.assertEqual(compact_state.self, other_compact_state.self)
+        self.assertNotEqual(compact_state, other_compact_state)
+        self.assertNotEqual(hash(compact_state), hash(other_compact_state))
+
+    def test_states_with_different_headers_are_equal_if_they_are_the_same_state(self):
+        self.assertEqual(CompactState.from_state(self.state), CompactState.from_state(self.state))
+
+    def test_pickled_compact_state_is_smaller_than_the_pickled_state(self):
+        compact_state = CompactState.from_state(self.state)
+        pickled_size = len(pickle.dumps(compact_state, protocol=pickle.HIGHEST_PROTOCOL))
+
+        self.assertLess(pickled_size, len(pickle.dumps(self.state, protocol=pickle.HIGHEST_PROTOCOL)) * 0.6)
+
+    def test_unpickled_compact_state_can_be_mutated(self):
+        compact_state = pickle.loads(pickle.dumps(CompactState.from_state(self.state)))
+        CompactStateMutator(compact_state).damage(constants.SELF, 1000)
+
+        self.assertEqual(self.state.self.active.hp - 1000, compact_state.to_state().self.active.hp)
+
+    def test_side_arrays_are_smaller_than_the_pickled_state(self):
+        compact_state = CompactState.from_state(self.state)
+        array_size = len(pickle.dumps((compact_state.self, compact_state.opponent)))
+
+        self.assertLess(array_size, len(pickle.dumps(self.state)) / 2)
+
+
+class TestCompactStateMutator(unittest.TestCase):
+    def setUp(self):
+        self.state = State(
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("pikachu", 100).to_dict()),
+                {
+                    "rattata": Pokemon.from_state_pokemon_dict(StatePokemon("rattata", 100).to_dict()),
+                },
+                defaultdict(int),
+                False
+            ),
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("aromatisse", 81).to_dict()),
+                {
+                    "gyarados": Pokemon.from_state_pokemon_dict(StatePokemon("gyarados", 81).to_dict()),
+                },
+                defaultdict(int),
+                False
+            ),
+            None,
+            None,
+            False,
+            False
+        )
+        self.state.self.active.moves = [
+            {
+                'id': 'thunderbolt',
+                'disabled': False,
+                'current_pp': 16
+            }
+        ]
+        self.compact_state = CompactState.from_state(self.state)
+        self.mutator = CompactStateMutator(self.compact_state)
+        self.instructions = [
+            (constants.MUTATOR_SWITCH, constants.OPPONENT, "aromatisse", "gyarados"),
+            (constants.MUTATOR_DAMAGE, constants.OPPONENT, 25),
+            (constants.MUTATOR_HEAL, constants.SELF, 5),
+            (constants.MUTATOR_BOOST, constants.SELF, constants.SPEED, 2),
+            (constants.MUTATOR_UNBOOST, constants.OPPONENT, constants.ATTACK, 1),
+            (constants.MUTATOR_APPLY_VOLATILE_STATUS, constants.SELF, 'leechseed'),
+            (constants.MUTATOR_APPLY_STATUS, constants.OPPONENT, constants.BURN),
+            (constants.MUTATOR_SIDE_START, constants.OPPONENT, constants.STEALTH_ROCK, 1),
+            (constants.MUTATOR_SIDE_START, constants.SELF, constants.REFLECT, 1),
+            (constants.MUTATOR_SIDE_END, constants.SELF, constants.REFLECT, 1),
+            (constants.MUTATOR_DISABLE_MOVE, constants.SELF, 'thunderbolt'),
+            (constants.MUTATOR_SWITCH, constants.SELF, "pikachu", "rattata"),
+        ]
+
+    def test_applying_instructions_matches_the_state_mutator(self):
+        self.mutator.apply(self.instructions)
+        StateMutator(self.state).apply(self.instructions)
+
+        round_tripped = self.compact_state.to_state()
+        self.assertEqual(compute_state_hash(self.state), compute_state_hash(round_tripped))
+        self.assertEqual(str(self.state.self.active), str(round_tripped.self.active))
+        self.assertEqual(str(self.state.opponent.active), str(round_tripped.opponent.active))
+
+    def test_reversing_instructions_restores_the_state(self):
+        original_state = self.compact_state.copy()
+
+        self.mutator.apply(self.instructions)
+        self.assertNotEqual(original_state, self.compact_state)
+
+        self.mutator.reverse(self.instructions)
+        self.assertEqual(original_state, self.compact_state)
+        self.assertEqual(compute_state_hash(self.state), compute_state_hash(self.compact_state.to_state()))
+
+    def assert_generated_instructions_match_the_state_mutator(self, user_move, opponent_move):
+        generated_instructions = get_all_state_instructions(StateMutator(self.state), user_move, opponent_move)
+        original_state = self.compact_state.copy()
+        for instructions in generated_instructions:
+            state_mutator = StateMutator(self.state)
+            state_mutator.apply(instructions.instructions)
+            self.mutator.apply(instructions.instructions)
+            self.assertEqual(compute_state_hash(self.state), compute_state_hash(self.compact_state.to_state()))
+
+            state_mutator.reverse(instructions.instructions)
+            self.mutator.reverse(instructions.instructions)
+            self.assertEqual(original_state, self.compact_state)
+
+    def test_generated_recover_instructions_match_the_state_mutator(self):
+        self.state.self.active.moves = [{'id': 'recover', 'disabled': False, 'current_pp': 16}]
+        self.state.self.active.hp = 100
+        self.compact_state = CompactState.from_state(self.state)
+        self.mutator = CompactStateMutator(self.compact_state)
+
+        self.assert_generated_instructions_match_the_state_mutator('recover', 'splash')
+
+    def test_generated_substitute_instructions_match_the_state_mutator(self):
+        self.state.self.active.moves = [{'id': 'substitute', 'disabled': False, 'current_pp': 16}]
+        self.compact_state = CompactState.from_state(self.state)
+        self.mutator = CompactStateMutator(self.compact_state)
+
+        self.assert_generated_instructions_match_the_state_mutator('substitute', 'splash')
+
+    def test_generated_stealth_rock_damage_matches_the_state_mutator(self):
+        self.state.self.side_conditions[constants.STEALTH_ROCK] = 1
+        self.compact_state = CompactState.from_state(self.state)
+        self.mutator = CompactStateMutator(self.compact_state)
+
+        self.assert_generated_instructions_match_the_state_mutator('switch rattata', 'splash')
+
+    def test_state_hash_changes_when_an_instruction_is_applied(self):
+        original_hash = self.mutator.state_hash
+        self.mutator.apply([(constants.MUTATOR_DAMAGE, constants.SELF, 1)])
+
+        self.assertNotEqual(original_hash, self.mutator.state_hash)
+
+    def test_switching_to_a_pokemon_not_on_the_side_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            self.mutator.apply([(constants.MUTATOR_SWITCH, constants.SELF, "pikachu", "mew")])
+
+    def test_disabling_a_move_the_pokemon_does_not_have_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            self.mutator.apply([(constants.MUTATOR_DISABLE_MOVE, constants.SELF, "tackle")])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,15 @@
 import unittest
+import config
 import constants
 from showdown.calculate_damage import DamageCalculator
+from showdown.calculate_damage import damage_multipication_array
+from showdown.calculate_damage import pokemon_type_indicies
+from showdown.calculate_damage import get_type_effectiveness
+from showdown.calculate_damage import type_pair_index
+from showdown.calculate_damage import is_super_effective
+from showdown.lru_cache import LRUCache
+from showdown.search.find_state_instructions import damage_calculator
+from showdown.search.find_state_instructions import reset_damage_cache
 from showdown.search.objects import Pokemon
 from showdown.state.pokemon import Pokemon as StatePokemon
 
@@ -148,3 +157,120 @@ class TestCalculateDamage(unittest.TestCase):
 
         dmg = self.damage_calculator.calculate_damage(self.charizard, self.venusaur, move, calc_type='max')
         self.assertEqual([597], dmg)
+
+
+class TestCachedDamageCalculator(unittest.TestCase):
+
+    def setUp(self):
+
+        self.damage_calculator = DamageCalculator(cache=LRUCache(100))
+
+        self.charizard = Pokemon.from_state_pokemon_dict(StatePokemon("charizard", 100).to_dict())
+        self.venusaur = Pokemon.from_state_pokemon_dict(StatePokemon("venusaur", 100).to_dict())
+
+    def test_cached_calculation_matches_uncached_calculation(self):
+        conditions = {
+            'reflect': 1,
+            'weather': 'sunnyday'
+        }
+        for move in ['fireblast', 'earthquake', 'rockslide']:
+            for calc_type in ['average', 'max', 'min_max', 'all']:
+                expected_damage = DamageCalculator().calculate_damage(self.charizard, self.venusaur, move, conditions, calc_type=calc_type)
+                damage = self.damage_calculator.calculate_damage(self.charizard, self.venusaur, move, conditions, calc_type=calc_type)
+                self.assertEqual(expected_damage, damage)
+
+    def test_repeated_calculation_is_a_cache_hit(self):
+        first_damage = self.damage_calculator.calculate_damage(self.charizard, self.venusaur, 'fireblast', calc_type='max')
+        second_damage = self.damage_calculator.calculate_damage(self.charizard, self.venusaur, 'fireblast', calc_type='max')
+
+        self.assertEqual([300], second_damage)
+        self.assertEqual(first_damage, second_damage)
+        self.assertEqual(1, self.damage_calculator.cache.hits)
+        self.assertEqual(1, self.damage_calculator.cache.misses)
+
+    def test_returned_damage_can_be_modified_without_changing_the_cache(self):
+        self.damage_calculator.calculate_damage(self.charizard, self.venusaur, 'fireblast', calc_type='max').append(1)
+
+        dmg = self.damage_calculator.calculate_damage(self.charizard, self.venusaur, 'fireblast', calc_type='max')
+        self.assertEqual([300], dmg)
+
+    def test_boost_change_is_not_a_cache_hit(self):
+        self.damage_calculator.calculate_damage(self.charizard, self.venusaur, 'fireblast', calc_type='max')
+        self.charizard.special_attack_boost = 2
+
+        dmg = self.damage_calculator.calculate_damage(self.charizard, self.venusaur, 'fireblast', calc_type='max')
+        self.assertEqual([597], dmg)
+        self.assertEqual(0, self.damage_calculator.cache.hits)
+
+    def test_status_change_is_not_a_cache_hit(self):
+        self.damage_calculator.calculate_damage(self.venusaur, self.charizard, 'rockslide', calc_type='max')
+        self.venusaur.status = constants.BURN
+
+        dmg = self.damage_calculator.calculate_damage(self.venusaur, self.charizard, 'rockslide', calc_type='max')
+        self.assertEqual([134], dmg)
+
+    def test_pokemon_without_a_type_pair_is_calculated_from_its_types(self):
+        expected_damage = self.damage_calculator.calculate_damage(self.charizard, self.venusaur, 'fireblast', calc_type='max')
+        del self.charizard.type_pair
+        del self.venusaur.type_pair
+
+        dmg = self.damage_calculator.calculate_damage(self.charizard, self.venusaur, 'fireblast', calc_type='max')
+        self.assertEqual(expected_damage, dmg)
+        self.assertEqual(2, self.damage_calculator.cache.misses)
+
+
+class TestResetDamageCache(unittest.TestCase):
+
+    def setUp(self):
+        self.original_damage_cache_size = config.damage_cache_size
+        self.charizard = Pokemon.from_state_pokemon_dict(StatePokemon("charizard", 100).to_dict())
+        self.venusaur = Pokemon.from_state_pokemon_dict(StatePokemon("venusaur", 100).to_dict())
+
+    def tearDown(self):
+        config.damage_cache_size = self.original_damage_cache_size
+        reset_damage_cache()
+
+    def test_reset_empties_the_cache_and_sizes_it_to_the_config(self):
+        damage_calculator.calculate_damage(self.charizard, self.venusaur, 'fireblast', calc_type='max')
+        config.damage_cache_size = 5
+        reset_damage_cache()
+
+        self.assertEqual(0, len(damage_calculator.cache))
+        self.assertEqual(0, damage_calculator.cache.misses)
+        self.assertEqual(5, damage_calculator.cache.max_size)
+
+
+class TestTypeEffectivenessTable(unittest.TestCase):
+
+    def test_table_matches_the_damage_multiplication_array_for_every_type_pair(self):
+        for attacking_type, attacking_index in pokemon_type_indicies.items():
+            for first_type, first_index in pokemon_type_indicies.items():
+                for second_type, second_index in pokemon_type_indicies.items():
+                    expected_multiplier = 1
+                    expected_multiplier *= damage_multipication_array[attacking_index][first_index]
+                    expected_multiplier *= damage_multipication_array[attacking_index][second_index]
+
+                    type_pair = type_pair_index([first_type, second_type])
+                    self.assertEqual(expected_multiplier, get_type_effectiveness(attacking_type, type_pair))
+
+    def test_single_type_uses_its_own_type_pair(self):
+        self.assertEqual(2, get_type_effectiveness('fire', type_pair_index(['grass'])))
+        self.assertEqual(4, get_type_effectiveness('fire', type_pair_index(['grass', 'bug'])))
+
+    def test_more_than_two_types_are_added_to_the_table(self):
+        type_pair = type_pair_index(['grass', 'bug', 'steel'])
+
+        self.assertEqual(type_pair, type_pair_index(['grass', 'bug', 'steel']))
+        self.assertEqual(8, get_type_effectiveness('fire', type_pair))
+
+    def test_is_super_effective_accepts_a_list_of_types_or_a_type_pair(self):
+        self.assertTrue(is_super_effective('water', ['fire']))
+        self.assertTrue(is_super_effective('water', type_pair_index(['fire'])))
+        self.assertFalse(is_super_effective('water', type_pair_index(['water'])))
+
+    def test_pokemon_type_pair_changes_when_its_types_are_set(self):
+        venusaur = Pokemon.from_state_pokemon_dict(StatePokemon("venusaur", 100).to_dict())
+        self.assertEqual(type_pair_index(['grass', 'poison']), venusaur.type_pair)
+
+        venusaur.types = ['water']
+        self.assertEqual(type_pair_index(['water']), venusaur.type_pair)
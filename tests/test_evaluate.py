@@ -0,0 +1,236 @@
+import unittest
+
+from collections import defaultdict
+import config
+import constants
+from showdown.evaluate_state import evaluate
+from showdown.evaluate_state.evaluate_pokemon import evaluate_pokemon
+from showdown.evaluate_state.evaluate_pokemon import evaluation_cache
+from showdown.evaluate_state.evaluate_pokemon import reset_evaluation_cache
+from showdown.evaluate_state.evaluate_matchup import evaluate_matchup
+from showdown.evaluate_state.matchup_table import MatchupTable
+from showdown.search.objects import State
+from showdown.search.objects import Side
+from showdown.state.pokemon import Pokemon as StatePokemon
+from showdown.search.objects import Pokemon
+from showdown.search.state_mutator import StateMutator
+
+
+class TestEvaluationCache(unittest.TestCase):
+    def setUp(self):
+        self.state = State(
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("pikachu", 100).to_dict()),
+                {
+                    "rattata": Pokemon.from_state_pokemon_dict(StatePokemon("rattata", 100).to_dict()),
+                },
+                defaultdict(int),
+                False
+            ),
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("aromatisse", 81).to_dict()),
+                {
+                    "gyarados": Pokemon.from_state_pokemon_dict(StatePokemon("gyarados", 81).to_dict()),
+                },
+                defaultdict(int),
+                False
+            ),
+            None,
+            None,
+            False,
+            False
+        )
+        self.original_evaluation_cache_size = config.evaluation_cache_size
+        reset_evaluation_cache()
+
+    def tearDown(self):
+        config.evaluation_cache_size = self.original_evaluation_cache_size
+        reset_evaluation_cache()
+
+    def test_cached_score_is_the_same_as_the_first_score(self):
+        pkmn = self.state.self.active
+        first_score = evaluate_pokemon(pkmn)
+
+        self.assertEqual(first_score, evaluate_pokemon(pkmn))
+        self.assertEqual(1, evaluation_cache.hits)
+
+    def test_reserve_pokemon_boosts_change_the_evaluation(self):
+        first_score = evaluate(self.state)
+        self.state.self.reserve['rattata'].attack_boost = 2
+
+        self.assertGreater(evaluate(self.state), first_score)
+
+    def test_reserve_pokemon_volatile_status_changes_the_evaluation(self):
+        first_score = evaluate(self.state)
+        self.state.opponent.reserve['gyarados'].volatile_status = {'substitute'}
+
+        self.assertLess(evaluate(self.state), first_score)
+
+    def test_cache_does_not_grow_past_its_size(self):
+        config.evaluation_cache_size = 2
+        reset_evaluation_cache()
+
+        pkmn = self.state.self.active
+        for hp in range(1, 6):
+            pkmn.hp = hp
+            evaluate_pokemon(pkmn)
+
+        self.assertEqual(2, len(evaluation_cache))
+        self.assertEqual(3, evaluation_cache.evictions)
+
+    def test_reset_empties_the_cache_and_its_counters(self):
+        evaluate_pokemon(self.state.self.active)
+        evaluate_pokemon(self.state.self.active)
+        reset_evaluation_cache()
+
+        self.assertEqual(0, len(evaluation_cache))
+        self.assertEqual(0, evaluation_cache.hits)
+        self.assertEqual(0, evaluation_cache.misses)
+
+
+
+class TestIncrementalEvaluation(unittest.TestCase):
+    def setUp(self):
+        self.state = State(
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("pikachu", 100).to_dict()),
+                {
+                    "rattata": Pokemon.from_state_pokemon_dict(StatePokemon("rattata", 100).to_dict()),
+                    "charizard": Pokemon.from_state_pokemon_dict(StatePokemon("charizard", 100).to_dict()),
+                },
+                defaultdict(int),
+                False
+            ),
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("aromatisse", 81).to_dict()),
+                {
+                    "gyarados": Pokemon.from_state_pokemon_dict(StatePokemon("gyarados", 81).to_dict()),
+                },
+                defaultdict(int),
+                False
+            ),
+            None,
+            None,
+            False,
+            False
+        )
+        self.state.self.active.moves = [{'id': 'thunderbolt', 'disabled': False, 'current_pp': 16}]
+        self.state.self.reserve['charizard'].moves = [{'id': 'fireblast', 'disabled': False, 'current_pp': 16}]
+        self.state.opponent.active.moves = [{'id': 'moonblast', 'disabled': False, 'current_pp': 16}]
+        self.mutator = StateMutator(self.state)
+
+    def assert_evaluation_is_correct_after_each_instruction(self, instructions):
+        self.assertEqual(evaluate(self.state), self.mutator.evaluate())
+        for i in range(len(instructions)):
+            self.mutator.apply(instructions[i:i + 1])
+            self.assertEqual(evaluate(self.state), self.mutator.evaluate(), instructions[i])
+        for i in reversed(range(len(instructions))):
+            self.mutator.reverse(instructions[i:i + 1])
+            self.assertEqual(evaluate(self.state), self.mutator.evaluate(), instructions[i])
+
+    def test_damage_boosts_and_statuses_are_evaluated_incrementally(self):
+        self.assert_evaluation_is_correct_after_each_instruction([
+            (constants.MUTATOR_DAMAGE, constants.OPPONENT, 50),
+            (constants.MUTATOR_BOOST, constants.SELF, constants.SPECIAL_ATTACK, 2),
+            (constants.MUTATOR_APPLY_STATUS, constants.OPPONENT, constants.BURN),
+            (constants.MUTATOR_APPLY_VOLATILE_STATUS, constants.SELF, constants.SUBSTITUTE),
+            (constants.MUTATOR_HEAL, constants.OPPONENT, 20),
+        ])
+
+    def test_side_conditions_are_evaluated_incrementally(self):
+        self.assert_evaluation_is_correct_after_each_instruction([
+            (constants.MUTATOR_SIDE_START, constants.SELF, constants.STEALTH_ROCK, 1),
+            (constants.MUTATOR_SIDE_START, constants.OPPONENT, constants.SPIKES, 2),
+            (constants.MUTATOR_SIDE_START, constants.OPPONENT, constants.REFLECT, 1),
+            (constants.MUTATOR_SIDE_END, constants.SELF, constants.STEALTH_ROCK, 1),
+        ])
+
+    def test_switches_and_fainted_pokemon_are_evaluated_incrementally(self):
+        self.assert_evaluation_is_correct_after_each_instruction([
+            (constants.MUTATOR_SIDE_START, constants.SELF, constants.STEALTH_ROCK, 1),
+            (constants.MUTATOR_SWITCH, constants.SELF, 'pikachu', 'charizard'),
+            (constants.MUTATOR_DAMAGE, constants.SELF, self.state.self.reserve['charizard'].hp),
+            (constants.MUTATOR_SWITCH, constants.SELF, 'charizard', 'rattata'),
+            (constants.MUTATOR_SWITCH, constants.OPPONENT, 'aromatisse', 'gyarados'),
+            (constants.MUTATOR_DAMAGE, constants.OPPONENT, 10),
+        ])
+
+    def test_rehash_discards_the_evaluation_of_a_state_modified_without_the_mutator(self):
+        self.mutator.evaluate()
+        self.state.self.active.hp = 1
+        self.mutator.rehash()
+
+        self.assertEqual(evaluate(self.state), self.mutator.evaluate())
+
+    def test_check_hash_compares_the_evaluation_against_a_full_evaluation(self):
+        mutator = StateMutator(self.state, check_hash=True)
+        mutator.evaluate()
+        self.state.self.active.hp = 1
+
+        with self.assertRaises(ValueError):
+            mutator.evaluate()
+
+
+
+class TestMatchupTable(unittest.TestCase):
+    def setUp(self):
+        self.state = State(
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("pikachu", 100).to_dict()),
+                {
+                    "charizard": Pokemon.from_state_pokemon_dict(StatePokemon("charizard", 100).to_dict()),
+                },
+                defaultdict(int),
+                False
+            ),
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("gyarados", 81).to_dict()),
+                {
+                    "venusaur": Pokemon.from_state_pokemon_dict(StatePokemon("venusaur", 81).to_dict()),
+                },
+                defaultdict(int),
+                False
+            ),
+            None,
+            None,
+            False,
+            False
+        )
+        self.state.self.active.moves = [{'id': 'thunderbolt', 'disabled': False, 'current_pp': 16}]
+        self.state.self.reserve['charizard'].moves = [{'id': 'tackle', 'disabled': False, 'current_pp': 16}]
+        self.table = MatchupTable()
+        self.table.update(self.state)
+
+    def test_every_pair_is_scored_like_evaluate_matchup(self):
+        for user_pkmn in [self.state.self.active, self.state.self.reserve['charizard']]:
+            for opponent_pkmn in [self.state.opponent.active, self.state.opponent.reserve['venusaur']]:
+                self.assertEqual(evaluate_matchup(user_pkmn, opponent_pkmn), self.table.get(user_pkmn, opponent_pkmn))
+
+    def test_unchanged_pairs_are_not_scored_again(self):
+        self.table.update(self.state)
+
+        self.assertEqual(4, len(self.table))
+        self.assertEqual(0, self.table.updated)
+
+    def test_revealing_a_move_scores_the_pairs_of_that_pokemon_again(self):
+        charizard = self.state.self.reserve['charizard']
+        venusaur = self.state.opponent.reserve['venusaur']
+        first_score = self.table.get(charizard, venusaur)
+
+        charizard.moves.append({'id': 'fireblast', 'disabled': False, 'current_pp': 16})
+        self.table.update(self.state)
+
+        self.assertEqual(2, self.table.updated)
+        self.assertNotEqual(first_score, self.table.get(charizard, venusaur))
+        self.assertEqual(evaluate_matchup(charizard, venusaur), self.table.get(charizard, venusaur))
+
+    def test_mutator_evaluates_with_the_table(self):
+        mutator = StateMutator(self.state, matchup_table=self.table)
+        mutator.apply([(constants.MUTATOR_SWITCH, constants.SELF, 'pikachu', 'charizard')])
+
+        self.assertIs(self.table, mutator.evaluator.matchup_table)
+        self.assertEqual(evaluate(self.state), mutator.evaluate())
+
+
+if __name__ == '__main__':
+    unittest.main()
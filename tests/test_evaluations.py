@@ -0,0 +1,231 @@
+import json
+import os
+import tempfile
+import unittest
+
+from collections import defaultdict
+import config
+import constants
+from showdown.evaluate_state import evaluate
+from showdown.evaluate_state.evaluate import evaluate_side_conditions
+from showdown.evaluate_state.evaluate_pokemon import evaluate_pokemon
+from showdown.evaluate_state.evaluate_matchup import evaluate_matchup
+from showdown.evaluate_state import scoring
+from showdown.evaluate_state import evaluations
+from showdown.evaluate_state.evaluations import DEFAULT_EVALUATION
+from showdown.evaluate_state.evaluations import apply_evaluation
+from showdown.evaluate_state.evaluations import load_evaluations
+from showdown.evaluate_state.evaluations import register_evaluation
+from showdown.evaluate_state.evaluations import use_evaluation
+from showdown.evaluate_state.batch_evaluate import evaluate_leaves
+from showdown.search.select_best_move import get_all_options
+from showdown.search.find_state_instructions import get_all_state_instructions
+from showdown.search.objects import State
+from showdown.search.objects import Side
+from showdown.state.pokemon import Pokemon as StatePokemon
+from showdown.search.objects import Pokemon
+from showdown.search.state_mutator import StateMutator
+
+
+class TestEvaluations(unittest.TestCase):
+    def setUp(self):
+        self.state = State(
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("pikachu", 100).to_dict()),
+                {
+                    "rattata": Pokemon.from_state_pokemon_dict(StatePokemon("rattata", 100).to_dict()),
+                },
+                defaultdict(int),
+                False
+            ),
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("aromatisse", 81).to_dict()),
+                {
+                    "gyarados": Pokemon.from_state_pokemon_dict(StatePokemon("gyarados", 81).to_dict()),
+                },
+                defaultdict(int),
+                False
+            ),
+            None,
+            None,
+            False,
+            False
+        )
+        self.state.self.active.hp = self.state.self.active.maxhp // 2
+        self.state.self.active.attack_boost = 2
+        self.state.self.active.status = constants.PARALYZED
+        self.state.opponent.side_conditions[constants.STEALTH_ROCK] = 1
+
+        self.original_evaluations = dict(evaluations.evaluations)
+        self.original_evaluation_file = config.evaluation_file
+        self.original_evaluation = config.evaluation
+
+    def tearDown(self):
+        evaluations.evaluations.clear()
+        evaluations.evaluations.update(self.original_evaluations)
+        config.evaluation_file = self.original_evaluation_file
+        config.evaluation = self.original_evaluation
+        use_evaluation(DEFAULT_EVALUATION)
+
+    def test_default_evaluation_does_not_change_the_score(self):
+        score = evaluate(self.state)
+        use_evaluation(DEFAULT_EVALUATION)
+
+        self.assertEqual(score, evaluate(self.state))
+
+    def test_compiled_boost_scores_are_the_weighted_diminishing_returns(self):
+        for stat, boost_scores in zip(scoring.SCORED_BOOSTS, scoring.BOOST_SCORES):
+            for boost in range(-6, 7):
+                self.assertEqual(
+                    scoring.weights['POKEMON_BOOST_DIMINISHING_RETURNS'][boost] * scoring.weights['POKEMON_BOOSTS'][stat],
+                    boost_scores[boost + 6]
+                )
+
+    def test_evaluation_changes_the_score_and_the_bounds(self):
+        score = evaluate(self.state)
+        max_evaluation = scoring.MAX_EVALUATION
+        register_evaluation('test', {'POKEMON_HP': 200})
+        use_evaluation('test')
+
+        self.assertNotEqual(score, evaluate(self.state))
+        self.assertEqual(max_evaluation + scoring.TEAM_SIZE * 100, scoring.MAX_EVALUATION)
+
+    def test_scalar_evaluation_reads_the_compiled_weights_of_the_evaluation(self):
+        self.state.self.active.volatile_status.add(constants.SUBSTITUTE)
+        side_conditions = {constants.REFLECT: 1, constants.STEALTH_ROCK: 1}
+        pokemon_score = evaluate_pokemon(self.state.self.active)
+        side_condition_score = evaluate_side_conditions(side_conditions, 2)
+        matchup_score = evaluate_matchup(self.state.self.active, self.state.opponent.active)
+
+        register_evaluation('test', {
+            'POKEMON_STATUSES': {constants.PARALYZED: -45},
+            'POKEMON_VOLATILE_STATUSES': {constants.SUBSTITUTE: 50},
+            'STATIC_SCORED_SIDE_CONDITIONS': {constants.REFLECT: 30},
+            'POKEMON_COUNT_SCORED_SIDE_CONDITIONS': {constants.STEALTH_ROCK: -25},
+            'FASTER_POKEMON_IN_MATCHUP': 20,
+        })
+        use_evaluation('test')
+
+        # pikachu is paralyzed (-20) behind a substitute (+10), and is faster than aromatisse (+10)
+        self.assertEqual(pokemon_score - 10, evaluate_pokemon(self.state.self.active))
+        self.assertEqual(side_condition_score + 10 - 2 * 10, evaluate_side_conditions(side_conditions, 2))
+        self.assertEqual(matchup_score + 10, evaluate_matchup(self.state.self.active, self.state.opponent.active))
+
+    def test_evaluation_only_changes_the_keys_of_a_weight_that_it_names(self):
+        register_evaluation('test', {'POKEMON_STATUSES': {constants.PARALYZED: -50}})
+        use_evaluation('test')
+
+        self.assertEqual(-50, scoring.weights['POKEMON_STATUSES'][constants.PARALYZED])
+        self.assertEqual(-20, scoring.weights['POKEMON_STATUSES'][constants.BURN])
+
+    def test_evaluations_do_not_build_on_each_other(self):
+        register_evaluation('first', {'POKEMON_HP': 200})
+        register_evaluation('second', {'WEAK_TO_OPPONENT_TYPE': 10})
+        use_evaluation('first')
+        use_evaluation('second')
+
+        self.assertEqual(100, scoring.weights['POKEMON_HP'])
+        self.assertEqual(10, scoring.weights['WEAK_TO_OPPONENT_TYPE'])
+
+    def test_evaluation_does_not_change_the_default_weights(self):
+        register_evaluation('test', {'POKEMON_HP': 200, 'POKEMON_STATUSES': {constants.PARALYZED: -50}})
+        use_evaluation('test')
+
+        self.assertEqual(100, scoring.POKEMON_HP)
+        self.assertEqual(-25, scoring.POKEMON_STATUSES[constants.PARALYZED])
+        self.assertEqual(200, scoring.weights['POKEMON_HP'])
+
+    def test_unknown_weight_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            register_evaluation('test', {'POKEMON_WEIGHT': 1})
+
+    def test_unknown_evaluation_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            use_evaluation('not_an_evaluation')
+
+    def test_batched_leaves_are_evaluated_with_the_evaluation(self):
+        register_evaluation('test', {
+            'POKEMON_HP': 150,
+            'POKEMON_BOOSTS': {constants.SPEED: 40},
+            'POKEMON_STATUSES': {None: 5},
+            'POKEMON_COUNT_SCORED_SIDE_CONDITIONS': {constants.STEALTH_ROCK: -30},
+        })
+        use_evaluation('test')
+
+        mutator = StateMutator(self.state)
+        self.state.self.active.moves = [{'id': 'thunderbolt', 'disabled': False, 'current_pp': 16}]
+        user_options, opponent_options = get_all_options(mutator)
+        compiled_instruction_lists = [
+            instructions.compiled_instructions
+            for instructions in get_all_state_instructions(mutator, user_options[0], opponent_options[0])
+        ]
+
+        scores = []
+        for compiled_instructions in compiled_instruction_lists:
+            mutator.apply_compiled(compiled_instructions)
+            scores.append(evaluate(self.state))
+            mutator.reverse_compiled(compiled_instructions)
+
+        self.assertEqual(scores, evaluate_leaves(self.state, compiled_instruction_lists).tolist())
+
+
+class TestLoadEvaluations(unittest.TestCase):
+    def setUp(self):
+        self.original_evaluations = dict(evaluations.evaluations)
+        self.original_evaluation_file = config.evaluation_file
+        self.original_evaluation = config.evaluation
+
+        file_descriptor, self.path = tempfile.mkstemp(suffix='.json')
+        with os.fdopen(file_descriptor, 'w') as f:
+            json.dump(
+                {
+                    'gen7ou': {
+                        'POKEMON_ALIVE': {'0.5': 60},
+                        'POKEMON_BOOST_DIMINISHING_RETURNS': {'6': 4},
+                        'POKEMON_STATUSES': {'null': 5},
+                    },
+                    'aggressive': {
+                        'POKEMON_BOOSTS': {constants.ATTACK: 30},
+                    }
+                },
+                f
+            )
+
+    def tearDown(self):
+        os.remove(self.path)
+        evaluations.evaluations.clear()
+        evaluations.evaluations.update(self.original_evaluations)
+        config.evaluation_file = self.original_evaluation_file
+        config.evaluation = self.original_evaluation
+        use_evaluation(DEFAULT_EVALUATION)
+
+    def test_loaded_keys_are_converted_to_the_keys_of_the_weights(self):
+        load_evaluations(self.path)
+        use_evaluation('gen7ou')
+
+        self.assertEqual(60, scoring.weights['POKEMON_ALIVE'][0.5])
+        self.assertEqual(4, scoring.weights['POKEMON_BOOST_DIMINISHING_RETURNS'][6])
+        self.assertEqual(5, scoring.weights['POKEMON_STATUSES'][None])
+        self.assertEqual(3, len(scoring.weights['POKEMON_ALIVE']))
+
+    def test_evaluation_named_after_the_format_is_used(self):
+        config.evaluation_file = self.path
+        config.evaluation = None
+
+        self.assertEqual('gen7ou', apply_evaluation('gen7ou'))
+        self.assertEqual(5, scoring.weights['POKEMON_STATUSES'][None])
+
+    def test_configured_evaluation_is_used_instead_of_the_format(self):
+        config.evaluation_file = self.path
+        config.evaluation = 'aggressive'
+
+        self.assertEqual('aggressive', apply_evaluation('gen7ou'))
+        self.assertEqual(30, scoring.weights['POKEMON_BOOSTS'][constants.ATTACK])
+        self.assertEqual(0, scoring.weights['POKEMON_STATUSES'][None])
+
+    def test_default_evaluation_is_used_for_a_format_without_one(self):
+        config.evaluation_file = self.path
+        config.evaluation = None
+
+        self.assertEqual(DEFAULT_EVALUATION, apply_evaluation('gen7randombattle'))
+        self.assertEqual(15, scoring.weights['POKEMON_BOOSTS'][constants.ATTACK])
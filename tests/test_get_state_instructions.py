@@ -6,6 +6,11 @@ from showdown.search.transpose_instruction import TransposeInstruction
 from showdown.search.find_state_instructions import get_all_state_instructions
 from showdown.search.find_state_instructions import lookup_move
 from showdown.search.find_state_instructions import user_moves_first
+from showdown.search.find_state_instructions import prune_unlikely_instructions
+from showdown.search.find_state_instructions import merge_equivalent_instructions
+from showdown.search.find_state_instructions import pruned_branch_counter
+from showdown.search.find_state_instructions import get_modified_move_and_plan
+from showdown.search.find_state_instructions import update_damage_calc_from_abilities_and_items
 from showdown.search.objects import State
 from showdown.search.objects import Pokemon
 from showdown.search.objects import Side
@@ -546,7 +551,7 @@ class TestGetStateInstructions(unittest.TestCase):
                 1,
                 [
                     (constants.MUTATOR_DAMAGE, constants.SELF, 35),
-                    (constants.MUTATOR_HEAL, constants.OPPONENT, -18.5),
+                    (constants.MUTATOR_HEAL, constants.OPPONENT, -18),
                 ],
                 False
             )
@@ -1121,7 +1126,7 @@ class TestGetStateInstructions(unittest.TestCase):
                 1,
                 [
                     ('damage', 'opponent', 33),
-                    ('heal', 'self', -20.8),
+                    ('heal', 'self', -20),
                     ('damage', 'self', 35)
                 ],
                 False
@@ -1177,7 +1182,7 @@ class TestGetStateInstructions(unittest.TestCase):
                 [
                     ('damage', 'opponent', 25),
                     ('damage', 'self', 35),
-                    ('heal', 'opponent', -49.33333333333333)
+                    ('heal', 'opponent', -49)
                 ],
                 False
             )
@@ -1310,15 +1315,7 @@ class TestGetStateInstructions(unittest.TestCase):
                 False
             ),
             TransposeInstruction(
-                0.1875,
-                [
-                    ('damage', 'opponent', 95),
-                    ('apply_status', 'opponent', 'par'),
-                ],
-                True
-            ),
-            TransposeInstruction(
-                0.125,
+                0.3125,
                 [
                     ('damage', 'opponent', 95),
                     ('apply_status', 'opponent', 'par'),
@@ -1410,7 +1407,7 @@ class TestGetStateInstructions(unittest.TestCase):
                 False
             ),
             TransposeInstruction(
-                0.1,
+                0.30000000000000004,
                 [
                 ],
                 False
@@ -1438,12 +1435,6 @@ class TestGetStateInstructions(unittest.TestCase):
                 ],
                 False
             ),
-            TransposeInstruction(
-                0.1,
-                [
-                ],
-                False
-            ),
             TransposeInstruction(
                 0.05249999999999999,
                 [
@@ -1467,12 +1458,6 @@ class TestGetStateInstructions(unittest.TestCase):
                 ],
                 False
             ),
-            TransposeInstruction(
-                0.1,
-                [
-                ],
-                False
-            ),
         ]
 
         self.assertEqual(expected_instructions, instructions)
@@ -1625,7 +1610,7 @@ class TestGetStateInstructions(unittest.TestCase):
                 1,
                 [
                     ('switch', 'opponent', 'aromatisse', 'toxapex'),
-                    ('damage', 'opponent', 24.125),
+                    ('damage', 'opponent', 24),
                 ],
                 False
             ),
@@ -4331,3 +4316,211 @@ class TestUserMovesFirst(unittest.TestCase):
         opponent.active.speed = 2
 
         self.assertFalse(user_moves_first(self.state, user_move, opponent_move))
+
+
+class TestMergeEquivalentInstructions(unittest.TestCase):
+    def test_identical_instructions_are_merged_and_their_percentages_added(self):
+        instructions = [
+            TransposeInstruction(0.25, [('damage', 'opponent', 10)], False),
+            TransposeInstruction(0.5, [('damage', 'opponent', 20)], False),
+            TransposeInstruction(0.25, [('damage', 'opponent', 10)], False),
+        ]
+        expected_instructions = [
+            TransposeInstruction(0.5, [('damage', 'opponent', 10)], False),
+            TransposeInstruction(0.5, [('damage', 'opponent', 20)], False),
+        ]
+
+        self.assertEqual(expected_instructions, merge_equivalent_instructions(instructions))
+
+    def test_identical_instructions_that_are_not_equally_frozen_are_not_merged(self):
+        instructions = [
+            TransposeInstruction(0.25, [('damage', 'opponent', 10)], True),
+            TransposeInstruction(0.75, [('damage', 'opponent', 10)], False),
+        ]
+
+        self.assertEqual(instructions, merge_equivalent_instructions(instructions))
+
+    def test_instructions_with_no_effect_are_removed_before_merging(self):
+        instructions = [
+            TransposeInstruction(0.5, [('damage', 'opponent', 10), ('boost', 'self', 'attack', 0)], False),
+            TransposeInstruction(0.5, [('damage', 'opponent', 10), ('heal', 'self', 0)], False),
+        ]
+        expected_instructions = [
+            TransposeInstruction(1, [('damage', 'opponent', 10)], False),
+        ]
+
+        self.assertEqual(expected_instructions, merge_equivalent_instructions(instructions))
+
+    def test_instructions_in_a_different_order_are_not_merged(self):
+        instructions = [
+            TransposeInstruction(0.5, [('damage', 'opponent', 10), ('damage', 'self', 10)], False),
+            TransposeInstruction(0.5, [('damage', 'self', 10), ('damage', 'opponent', 10)], False),
+        ]
+
+        self.assertEqual(2, len(merge_equivalent_instructions(instructions)))
+
+
+class TestPruneUnlikelyInstructions(unittest.TestCase):
+    def setUp(self):
+        pruned_branch_counter.reset()
+        self.instructions = [
+            TransposeInstruction(0.5, [('damage', 'opponent', 10)], False),
+            TransposeInstruction(0.3, [('damage', 'opponent', 20)], False),
+            TransposeInstruction(0.15, [('damage', 'opponent', 30)], False),
+            TransposeInstruction(0.05, [('damage', 'opponent', 40)], False),
+        ]
+
+    def test_instructions_below_the_floor_are_dropped_and_the_rest_are_renormalized(self):
+        kept = prune_unlikely_instructions(self.instructions, 0.1, None)
+
+        self.assertEqual([('damage', 'opponent', 10)], kept[0].instructions)
+        self.assertEqual(3, len(kept))
+        self.assertAlmostEqual(1, sum(i.percentage for i in kept))
+        self.assertAlmostEqual(0.5 / 0.95, kept[0].percentage)
+
+    def test_only_the_most_likely_instructions_are_kept_in_their_original_order(self):
+        self.instructions.reverse()
+        kept = prune_unlikely_instructions(self.instructions, 0, 2)
+
+        self.assertEqual([[('damage', 'opponent', 20)], [('damage', 'opponent', 10)]], [i.instructions for i in kept])
+        self.assertAlmostEqual(1, sum(i.percentage for i in kept))
+
+    def test_most_likely_instruction_is_kept_when_every_instruction_is_below_the_floor(self):
+        kept = prune_unlikely_instructions(self.instructions, 0.9, None)
+
+        self.assertEqual([('damage', 'opponent', 10)], kept[0].instructions)
+        self.assertEqual(1, len(kept))
+        self.assertAlmostEqual(1, kept[0].percentage)
+
+    def test_renormalized_percentages_add_up_to_the_original_total(self):
+        for i in self.instructions:
+            i.update_percentage(0.5)
+        kept = prune_unlikely_instructions(self.instructions, 0.05, None)
+
+        self.assertAlmostEqual(0.5, sum(i.percentage for i in kept))
+
+    def test_pruned_branches_and_mass_are_counted(self):
+        prune_unlikely_instructions(self.instructions, 0.2, None)
+
+        self.assertEqual(2, pruned_branch_counter.branches)
+        self.assertAlmostEqual(0.2, pruned_branch_counter.mass)
+
+    def test_nothing_is_counted_when_nothing_is_pruned(self):
+        kept = prune_unlikely_instructions(self.instructions, 0.01, None)
+
+        self.assertIs(self.instructions, kept)
+        self.assertEqual(0, pruned_branch_counter.branches)
+
+
+class TestGetStateInstructionsWithBranchPruning(unittest.TestCase):
+    def setUp(self):
+        config.damage_calc_type = "all"
+        self.state = State(
+                        Side(
+                            Pokemon.from_state_pokemon_dict(StatePokemon("raichu", 73).to_dict()),
+                            dict(),
+                            defaultdict(lambda: 0),
+                            False
+                        ),
+                        Side(
+                            Pokemon.from_state_pokemon_dict(StatePokemon("aromatisse", 81).to_dict()),
+                            dict(),
+                            defaultdict(lambda: 0),
+                            False
+                        ),
+                        None,
+                        None,
+                        False,
+                        False
+                    )
+        self.mutator = StateMutator(self.state)
+
+    def tearDown(self):
+        config.damage_calc_type = "average"
+        config.branch_probability_floor = 0
+        config.max_branches = None
+
+    def test_probability_floor_reduces_the_number_of_instructions(self):
+        all_instructions = get_all_state_instructions(self.mutator, 'thunderbolt', 'moonblast')
+
+        config.branch_probability_floor = 0.01
+        pruned_instructions = get_all_state_instructions(self.mutator, 'thunderbolt', 'moonblast')
+
+        self.assertLess(len(pruned_instructions), len(all_instructions))
+        self.assertAlmostEqual(1, sum(i.percentage for i in pruned_instructions))
+
+    def test_max_branches_limits_the_number_of_instructions(self):
+        config.max_branches = 5
+        instructions = get_all_state_instructions(self.mutator, 'thunderbolt', 'moonblast')
+
+        self.assertEqual(5, len(instructions))
+        self.assertAlmostEqual(1, sum(i.percentage for i in instructions))
+
+
+class TestGetModifiedMoveAndPlan(unittest.TestCase):
+    def setUp(self):
+        self.attacker = Pokemon.from_state_pokemon_dict(StatePokemon("typhlosion", 100).to_dict())
+        self.defender = Pokemon.from_state_pokemon_dict(StatePokemon("gyarados", 100).to_dict())
+        self.attacker.ability = None
+        self.attacker.item = None
+        self.defender.ability = None
+        self.defender.item = None
+
+    def test_unmodified_move_is_not_copied(self):
+        move = lookup_move('tackle')
+        modified_move, _ = get_modified_move_and_plan(self.attacker, self.defender, move, lookup_move('tackle'), True)
+
+        self.assertIs(move, modified_move)
+
+    def test_modified_move_matches_the_modifier_pipeline(self):
+        self.attacker.hp = self.attacker.maxhp / 2
+        move = lookup_move('eruption')
+        modified_move, plan = get_modified_move_and_plan(self.attacker, self.defender, move, lookup_move('tackle'), True)
+
+        self.assertEqual(
+            update_damage_calc_from_abilities_and_items(self.attacker, self.defender, move, lookup_move('tackle'), True),
+            modified_move
+        )
+        self.assertTrue(plan.damaging)
+
+    def test_modified_move_is_only_copied_once(self):
+        move = lookup_move('eruption')
+        first, _ = get_modified_move_and_plan(self.attacker, self.defender, move, lookup_move('tackle'), True)
+        second, _ = get_modified_move_and_plan(self.attacker, self.defender, move, lookup_move('tackle'), True)
+
+        self.assertIs(first, second)
+
+    def test_modified_move_changes_when_an_attribute_the_modifier_reads_changes(self):
+        move = lookup_move('eruption')
+        full_hp_move, _ = get_modified_move_and_plan(self.attacker, self.defender, move, lookup_move('tackle'), True)
+        self.attacker.hp = self.attacker.maxhp / 2
+        half_hp_move, _ = get_modified_move_and_plan(self.attacker, self.defender, move, lookup_move('tackle'), True)
+
+        self.assertEqual(2 * half_hp_move[constants.BASE_POWER], full_hp_move[constants.BASE_POWER])
+
+    def test_modified_move_depends_on_the_category_of_the_other_move(self):
+        move = lookup_move('suckerpunch')
+        against_attack, _ = get_modified_move_and_plan(self.attacker, self.defender, move, lookup_move('tackle'), True)
+        against_status, _ = get_modified_move_and_plan(self.attacker, self.defender, move, lookup_move('willowisp'), True)
+
+        self.assertNotEqual(0, against_attack[constants.ACCURACY])
+        self.assertEqual(0, against_status[constants.ACCURACY])
+
+    def test_modified_move_is_shared_when_only_an_attribute_the_modifiers_do_not_read_changes(self):
+        move = lookup_move('hex')
+        full_hp_move, _ = get_modified_move_and_plan(self.attacker, self.defender, move, lookup_move('tackle'), True)
+        self.attacker.hp = self.attacker.maxhp / 2
+        self.defender.hp = self.defender.maxhp / 2
+        self.attacker.attack_boost = 1
+        half_hp_move, _ = get_modified_move_and_plan(self.attacker, self.defender, move, lookup_move('tackle'), True)
+
+        self.assertIs(full_hp_move, half_hp_move)
+
+    def test_modified_move_changes_when_an_attribute_an_ability_reads_changes(self):
+        self.defender.ability = 'multiscale'
+        move = lookup_move('tackle')
+        full_hp_move, _ = get_modified_move_and_plan(self.attacker, self.defender, move, lookup_move('tackle'), True)
+        self.defender.hp = self.defender.maxhp / 2
+        half_hp_move, _ = get_modified_move_and_plan(self.attacker, self.defender, move, lookup_move('tackle'), True)
+
+        self.assertEqual(2 * full_hp_move[constants.BASE_POWER], half_hp_move[constants.BASE_POWER])
@@ -0,0 +1,107 @@
+import unittest
+from unittest import mock
+
+import constants
+
+from collections import defaultdict
+from showdown.search import select_best_move
+from showdown.search.select_best_move import get_move_combination_scores
+from showdown.search.find_state_instructions import get_all_state_instructions
+from showdown.search.instruction_cache import InstructionCache
+from showdown.search.transpose_instruction import TransposeInstruction
+from showdown.search.objects import State
+from showdown.search.objects import Side
+from showdown.state.pokemon import Pokemon as StatePokemon
+from showdown.search.objects import Pokemon
+from showdown.search.state_mutator import StateMutator
+
+
+class TestInstructionCache(unittest.TestCase):
+    def setUp(self):
+        self.state = State(
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("pikachu", 100).to_dict()),
+                {
+                    "rattata": Pokemon.from_state_pokemon_dict(StatePokemon("rattata", 100).to_dict()),
+                },
+                defaultdict(int),
+                False
+            ),
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("aromatisse", 81).to_dict()),
+                dict(),
+                defaultdict(int),
+                False
+            ),
+            None,
+            None,
+            False,
+            False
+        )
+        self.state.self.active.moves = [
+            {'id': 'return', 'disabled': False, 'current_pp': 16},
+            {'id': 'thunderbolt', 'disabled': False, 'current_pp': 16},
+        ]
+        self.state.self.reserve['rattata'].moves = [
+            {'id': 'tackle', 'disabled': False, 'current_pp': 16}
+        ]
+        self.state.opponent.active.moves = [
+            {'id': 'return', 'disabled': False, 'current_pp': 16}
+        ]
+        self.mutator = StateMutator(self.state)
+        self.instruction_cache = InstructionCache(1000)
+
+        # ensure that the opposing pokemon has no moves from the data lookup
+        get_move_set_patcher = mock.patch.object(select_best_move, 'get_move_set', return_value=set())
+        get_move_set_patcher.start()
+        self.addCleanup(get_move_set_patcher.stop)
+
+    def test_cached_instructions_are_the_same_as_generated_instructions(self):
+        expected_instructions = get_all_state_instructions(self.mutator, 'thunderbolt', 'return')
+
+        get_all_state_instructions(self.mutator, 'thunderbolt', 'return', instruction_cache=self.instruction_cache)
+        instructions = get_all_state_instructions(self.mutator, 'thunderbolt', 'return', instruction_cache=self.instruction_cache)
+
+        self.assertEqual(expected_instructions, instructions)
+        self.assertEqual(1, self.instruction_cache.hits)
+
+    def test_instructions_are_not_reused_for_a_different_state(self):
+        get_all_state_instructions(self.mutator, 'thunderbolt', 'return', instruction_cache=self.instruction_cache)
+        self.mutator.apply([(constants.MUTATOR_DAMAGE, constants.OPPONENT, 10)])
+        get_all_state_instructions(self.mutator, 'thunderbolt', 'return', instruction_cache=self.instruction_cache)
+
+        self.assertEqual(0, self.instruction_cache.hits)
+        self.assertEqual(2, len(self.instruction_cache))
+
+    def test_instructions_are_not_reused_for_a_different_move_pair(self):
+        get_all_state_instructions(self.mutator, 'thunderbolt', 'return', instruction_cache=self.instruction_cache)
+        get_all_state_instructions(self.mutator, 'return', 'return', instruction_cache=self.instruction_cache)
+
+        self.assertEqual(0, self.instruction_cache.hits)
+
+    def test_weight_is_the_number_of_instructions(self):
+        instructions = [
+            TransposeInstruction(0.5, [('damage', 'opponent', 10), ('damage', 'self', 10)], False),
+            TransposeInstruction(0.5, [], False),
+        ]
+
+        self.assertEqual(4, self.instruction_cache.weigh(instructions))
+
+    def test_search_with_instruction_cache_produces_the_same_scores(self):
+        expected_scores = get_move_combination_scores(self.mutator, 3)
+
+        scores = get_move_combination_scores(self.mutator, 3, instruction_cache=self.instruction_cache)
+
+        self.assertEqual(expected_scores, scores)
+        self.assertGreater(self.instruction_cache.hits, 0)
+
+    def test_pruned_search_with_instruction_cache_produces_the_same_scores(self):
+        expected_scores = get_move_combination_scores(self.mutator, 3)
+
+        scores = get_move_combination_scores(self.mutator, 3, pruning=True, instruction_cache=self.instruction_cache)
+
+        self.assertEqual(expected_scores, scores)
+
+
+if __name__ == '__main__':
+    unittest.main()
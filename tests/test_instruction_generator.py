@@ -1470,7 +1470,7 @@ class TestGetStateFromSwitch(unittest.TestCase):
                     (
                         constants.MUTATOR_DAMAGE,
                         attacker,
-                        27.75  # 1/8th of rattata's 222 maxhp is 27.75 damage
+                        27  # 1/8th of rattata's 222 maxhp is 27.75 damage, which is rounded down
                     ),
                 ]
         ,
@@ -1774,7 +1774,7 @@ class TestGetStateFromSwitch(unittest.TestCase):
                     (
                         constants.MUTATOR_DAMAGE,
                         attacker,
-                        60.5  # 1/4 of pidgey's 242 max hp is 60.5
+                        60  # 1/4 of pidgey's 242 max hp is 60.5, which is rounded down
                     ),
                 ]
                 ,
@@ -1927,7 +1927,7 @@ class TestGetStateFromHealingMoves(unittest.TestCase):
         heal_instruction = (
             constants.MUTATOR_HEAL,
             attacker,
-            1/3 * self.state.self.active.maxhp
+            int(1/3 * self.state.self.active.maxhp)
         )
 
         expected_instructions = [
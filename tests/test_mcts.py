@@ -0,0 +1,167 @@
+import random
+import unittest
+from unittest import mock
+
+import constants
+
+from collections import defaultdict
+from showdown.search import select_best_move
+from showdown.search.mcts import MCTSNode
+from showdown.search.mcts import _run_iteration
+from showdown.search.mcts import get_move_combination_scores_mcts
+from showdown.search.state_hash import compute_state_hash
+from showdown.decide.decide import decide_from_safest
+from showdown.search.objects import State
+from showdown.search.objects import Side
+from showdown.state.pokemon import Pokemon as StatePokemon
+from showdown.search.objects import Pokemon
+from showdown.search.state_mutator import StateMutator
+
+
+class TestMCTS(unittest.TestCase):
+    def setUp(self):
+        self.state = State(
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("pikachu", 100).to_dict()),
+                {
+                    "rattata": Pokemon.from_state_pokemon_dict(StatePokemon("rattata", 100).to_dict()),
+                },
+                defaultdict(int),
+                False
+            ),
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("gyarados", 100).to_dict()),
+                dict(),
+                defaultdict(int),
+                False
+            ),
+            None,
+            None,
+            False,
+            False
+        )
+        self.state.self.active.moves = [
+            {'id': 'tackle', 'disabled': False, 'current_pp': 16},
+            {'id': 'thunderbolt', 'disabled': False, 'current_pp': 16},
+        ]
+        self.state.self.reserve['rattata'].moves = [
+            {'id': 'tackle', 'disabled': False, 'current_pp': 16}
+        ]
+        self.state.opponent.active.moves = [
+            {'id': 'tackle', 'disabled': False, 'current_pp': 16},
+            {'id': 'waterfall', 'disabled': False, 'current_pp': 16},
+        ]
+        self.mutator = StateMutator(self.state)
+        self.random_generator = random.Random(0)
+
+        # ensure that the opposing pokemon has no moves from the data lookup
+        get_move_set_patcher = mock.patch.object(select_best_move, 'get_move_set', return_value=set())
+        get_move_set_patcher.start()
+        self.addCleanup(get_move_set_patcher.stop)
+
+    def test_returns_a_score_for_every_move_combination(self):
+        scores = get_move_combination_scores_mcts(self.mutator, iterations=50, random_generator=self.random_generator)
+
+        expected_pairs = {
+            (user_move, opponent_move)
+            for user_move in ['tackle', 'thunderbolt', 'switch rattata']
+            for opponent_move in ['tackle', 'waterfall']
+        }
+        self.assertEqual(expected_pairs, set(scores))
+
+    def test_returns_a_score_for_every_move_combination_when_there_are_not_enough_iterations(self):
+        scores = get_move_combination_scores_mcts(self.mutator, iterations=1, random_generator=self.random_generator)
+
+        self.assertEqual(6, len(scores))
+
+    def test_super_effective_move_is_chosen(self):
+        scores = get_move_combination_scores_mcts(self.mutator, iterations=300, random_generator=self.random_generator)
+
+        self.assertEqual('thunderbolt', decide_from_safest(scores))
+
+    def test_search_does_not_modify_the_state(self):
+        expected_hash = compute_state_hash(self.state)
+        get_move_combination_scores_mcts(self.mutator, iterations=100, random_generator=self.random_generator)
+
+        self.assertEqual(expected_hash, compute_state_hash(self.state))
+        self.assertEqual(expected_hash, self.mutator.state_hash)
+
+    def test_force_switch_is_restored_after_searching(self):
+        self.state.force_switch = True
+        scores = get_move_combination_scores_mcts(self.mutator, iterations=20, random_generator=self.random_generator)
+
+        self.assertTrue(self.state.force_switch)
+        self.assertEqual({('switch rattata', constants.DO_NOTHING_MOVE)}, set(scores))
+
+    def test_time_budget_of_zero_still_returns_scores(self):
+        scores = get_move_combination_scores_mcts(self.mutator, time_budget=0, random_generator=self.random_generator)
+
+        self.assertEqual(6, len(scores))
+
+    def test_no_budget_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            get_move_combination_scores_mcts(self.mutator)
+
+
+
+class TestMCTSOpponent(unittest.TestCase):
+    def setUp(self):
+        self.state = State(
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("pikachu", 100).to_dict()),
+                {
+                    "pidgeot": Pokemon.from_state_pokemon_dict(StatePokemon("pidgeot", 100).to_dict()),
+                },
+                defaultdict(int),
+                False
+            ),
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("dugtrio", 100).to_dict()),
+                dict(),
+                defaultdict(int),
+                False
+            ),
+            None,
+            None,
+            False,
+            False
+        )
+        # earthquake punishes nastyplot, and does nothing to pidgeot
+        self.state.self.active.moves = [
+            {'id': 'nastyplot', 'disabled': False, 'current_pp': 16},
+        ]
+        self.state.self.reserve['pidgeot'].moves = [
+            {'id': 'tackle', 'disabled': False, 'current_pp': 16}
+        ]
+        self.state.opponent.active.moves = [
+            {'id': 'splash', 'disabled': False, 'current_pp': 16},
+            {'id': 'earthquake', 'disabled': False, 'current_pp': 16},
+        ]
+        self.mutator = StateMutator(self.state)
+        self.random_generator = random.Random(0)
+
+        get_move_set_patcher = mock.patch.object(select_best_move, 'get_move_set', return_value=set())
+        get_move_set_patcher.start()
+        self.addCleanup(get_move_set_patcher.stop)
+
+    def test_opponent_reply_that_punishes_the_bot_is_visited_most(self):
+        root = MCTSNode(self.mutator)
+        root_pairs = dict()
+        for _ in range(300):
+            _run_iteration(self.mutator, root, 1, 100, self.random_generator, root_pairs=root_pairs)
+
+        earthquake_visits = root.opponent_visits[root.opponent_options.index('earthquake')]
+        splash_visits = root.opponent_visits[root.opponent_options.index('splash')]
+        switch_visits = root.user_visits[root.user_options.index('switch pidgeot')]
+        nastyplot_visits = root.user_visits[root.user_options.index('nastyplot')]
+        self.assertGreater(earthquake_visits, splash_visits)
+        self.assertGreater(switch_visits, nastyplot_visits)
+
+    def test_bot_avoids_the_move_that_the_opponent_punishes(self):
+        scores = get_move_combination_scores_mcts(self.mutator, iterations=300, max_depth=1, random_generator=self.random_generator)
+
+        self.assertEqual('switch pidgeot', decide_from_safest(scores))
+
+
+if __name__ == '__main__':
+    unittest.main()
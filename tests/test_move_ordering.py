@@ -0,0 +1,114 @@
+import unittest
+from unittest import mock
+
+import constants
+
+from collections import defaultdict
+from showdown.search import select_best_move
+from showdown.search.select_best_move import get_move_combination_scores
+from showdown.search.select_best_move import get_safest_score
+from showdown.search.move_ordering import MoveOrdering
+from showdown.search.objects import State
+from showdown.search.objects import Side
+from showdown.state.pokemon import Pokemon as StatePokemon
+from showdown.search.objects import Pokemon
+from showdown.search.state_mutator import StateMutator
+
+
+class TestMoveOrdering(unittest.TestCase):
+    def setUp(self):
+        self.state = State(
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("pikachu", 100).to_dict()),
+                {
+                    "rattata": Pokemon.from_state_pokemon_dict(StatePokemon("rattata", 100).to_dict()),
+                },
+                defaultdict(int),
+                False
+            ),
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("gyarados", 100).to_dict()),
+                dict(),
+                defaultdict(int),
+                False
+            ),
+            None,
+            None,
+            False,
+            False
+        )
+        self.state.self.active.moves = [
+            {'id': 'tackle', 'disabled': False, 'current_pp': 16},
+            {'id': 'thunderbolt', 'disabled': False, 'current_pp': 16},
+            {'id': 'agility', 'disabled': False, 'current_pp': 16},
+        ]
+        self.state.self.reserve['rattata'].moves = [
+            {'id': 'tackle', 'disabled': False, 'current_pp': 16}
+        ]
+        self.state.opponent.active.moves = [
+            {'id': 'tackle', 'disabled': False, 'current_pp': 16},
+            {'id': 'waterfall', 'disabled': False, 'current_pp': 16},
+        ]
+        self.mutator = StateMutator(self.state)
+        self.move_ordering = MoveOrdering()
+
+        # ensure that the opposing pokemon has no moves from the data lookup
+        get_move_set_patcher = mock.patch.object(select_best_move, 'get_move_set', return_value=set())
+        get_move_set_patcher.start()
+        self.addCleanup(get_move_set_patcher.stop)
+
+    def test_super_effective_damaging_move_is_ordered_first(self):
+        options = ['tackle', 'agility', 'thunderbolt', 'switch rattata']
+        ordered = self.move_ordering.order_options(self.state, constants.SELF, options, 1)
+
+        self.assertEqual('thunderbolt', ordered[0])
+
+    def test_damaging_moves_are_ordered_before_non_damaging_options(self):
+        options = ['agility', 'switch rattata', 'tackle']
+        ordered = self.move_ordering.order_options(self.state, constants.SELF, options, 1)
+
+        self.assertEqual(['tackle', 'agility', 'switch rattata'], ordered)
+
+    def test_opponent_options_are_scored_against_the_bots_pokemon(self):
+        options = ['tackle', 'waterfall']
+        ordered = self.move_ordering.order_options(self.state, constants.OPPONENT, options, 1)
+
+        self.assertEqual('waterfall', ordered[0])
+
+    def test_killer_move_is_ordered_first_at_the_same_depth(self):
+        self.move_ordering.record_cutoff(constants.SELF, 'agility', 1)
+        options = ['tackle', 'thunderbolt', 'agility']
+
+        self.assertEqual('agility', self.move_ordering.order_options(self.state, constants.SELF, options, 1)[0])
+        self.assertEqual('thunderbolt', self.move_ordering.order_options(self.state, constants.SELF, options, 0)[0])
+
+    def test_only_the_most_recent_killer_moves_are_kept(self):
+        self.move_ordering.record_cutoff(constants.SELF, 'tackle', 1)
+        self.move_ordering.record_cutoff(constants.SELF, 'thunderbolt', 1)
+        self.move_ordering.record_cutoff(constants.SELF, 'agility', 1)
+
+        self.assertEqual(['agility', 'thunderbolt'], self.move_ordering.killer_moves[(constants.SELF, 1)])
+
+    def test_aging_halves_the_history_table(self):
+        self.move_ordering.record_cutoff(constants.SELF, 'tackle', 1)
+        self.move_ordering.age()
+
+        self.assertEqual(2, self.move_ordering.history[(constants.SELF, 'tackle')])
+
+    def test_search_with_move_ordering_produces_the_same_scores(self):
+        expected_scores = get_move_combination_scores(self.mutator, 3)
+
+        scores = get_move_combination_scores(self.mutator, 3, pruning=True, move_ordering=self.move_ordering)
+
+        self.assertEqual(expected_scores, scores)
+
+    def test_safest_score_with_move_ordering_is_the_same_as_without(self):
+        expected_score = get_safest_score(self.mutator, 3)
+
+        score = get_safest_score(self.mutator, 3, move_ordering=self.move_ordering)
+
+        self.assertEqual(expected_score, score)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+
+import constants
+from data import all_move_json
+from showdown.search.move_plan import build_move_plan
+from showdown.search.move_plan import get_move_plan
+
+
+class TestMovePlan(unittest.TestCase):
+    def test_secondary_status_is_in_the_plan(self):
+        plan = get_move_plan(all_move_json['thunderbolt'], True)
+
+        self.assertTrue(plan.damaging)
+        self.assertEqual(constants.PARALYZED, plan.status)
+        self.assertEqual(10, plan.status_accuracy)
+
+    def test_flinch_only_applies_to_the_first_move(self):
+        self.assertEqual(30, get_move_plan(all_move_json['ironhead'], True).flinch_accuracy)
+        self.assertIsNone(get_move_plan(all_move_json['ironhead'], False).flinch_accuracy)
+
+    def test_boosts_from_a_status_move_targeting_self_boost_the_attacker(self):
+        plan = get_move_plan(all_move_json['dragondance'], True)
+
+        self.assertEqual({constants.ATTACK: 1, constants.SPEED: 1}, plan.boosts)
+        self.assertTrue(plan.boosts_attacker)
+
+    def test_secondary_boosts_boost_the_defender(self):
+        plan = get_move_plan(all_move_json['crunch'], True)
+
+        self.assertEqual({constants.DEFENSE: -1}, plan.boosts)
+        self.assertFalse(plan.boosts_attacker)
+        self.assertEqual(20, plan.boosts_chance)
+
+    def test_guaranteed_self_boosts_boost_the_attacker(self):
+        plan = get_move_plan(all_move_json['dracometeor'], True)
+
+        self.assertTrue(plan.boosts_attacker)
+        self.assertEqual(100, plan.boosts_chance)
+
+    def test_side_condition_and_hazard_clearing_moves(self):
+        self.assertEqual(constants.STEALTH_ROCK, get_move_plan(all_move_json['stealthrock'], True).side_condition)
+        self.assertTrue(get_move_plan(all_move_json['defog'], True).hazard_clearing)
+
+    def test_drag_and_heal_flags(self):
+        self.assertTrue(get_move_plan(all_move_json['roar'], True).drag)
+        self.assertTrue(get_move_plan(all_move_json['recover'], True).heal)
+        self.assertFalse(get_move_plan(all_move_json['thunderbolt'], True).drag)
+
+    def test_plan_of_an_unmodified_move_is_built_once(self):
+        self.assertIs(
+            get_move_plan(all_move_json['thunderbolt'], True),
+            get_move_plan(all_move_json['thunderbolt'], True)
+        )
+
+    def test_modified_copy_of_a_move_gets_its_own_plan(self):
+        attacking_move = all_move_json['dragondance'].copy()
+        attacking_move[constants.BOOSTS] = {constants.SPEED: 2}
+
+        self.assertEqual({constants.SPEED: 2}, get_move_plan(attacking_move, True).boosts)
+
+    def test_built_plan_matches_the_stored_plan(self):
+        self.assertEqual(build_move_plan(all_move_json['crunch'], False), get_move_plan(all_move_json['crunch'], False))
+
+
+if __name__ == '__main__':
+    unittest.main()
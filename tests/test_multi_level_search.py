@@ -1,3 +1,4 @@
+import sys
 import unittest
 from unittest import mock
 
@@ -5,6 +6,9 @@ import constants
 
 from collections import defaultdict
 from showdown.search.select_best_move import get_move_combination_scores
+from showdown.search.select_best_move import get_move_combination_scores_iterative
+from showdown.search.select_best_move import get_safest_score
+from showdown.decide.decide import pick_safest
 from showdown.decide.decide import decide_random_from_average_and_safest
 from showdown.search import select_best_move
 from showdown.search.objects import State
@@ -12,6 +16,7 @@ from showdown.search.objects import Side
 from showdown.state.pokemon import Pokemon as StatePokemon
 from showdown.search.objects import Pokemon
 from showdown.search.state_mutator import StateMutator
+from showdown.search.state_hash import compute_state_hash
 
 
 class TestSelectBestMove(unittest.TestCase):
@@ -337,5 +342,147 @@ class TestSelectBestMove(unittest.TestCase):
         self.assertEqual("switch slurpuff", safest)
 
 
+class TestSelectBestMoveWithPruning(TestSelectBestMove):
+    """Runs every test in TestSelectBestMove with a pruned search,
+       and asserts that the pruned search produces the same scores as the exhaustive search"""
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(
+            sys.modules[__name__],
+            'get_move_combination_scores',
+            self.get_pruned_scores_and_compare
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get_pruned_scores_and_compare(self, mutator, depth):
+        # `get_all_options` modifies these values, so they are reset before each search
+        force_switch = mutator.state.force_switch
+        trapped = mutator.state.self.trapped
+
+        expected_scores = select_best_move.get_move_combination_scores(mutator, depth)
+        expected_safest_score = pick_safest(expected_scores)[1]
+
+        mutator.state.force_switch = force_switch
+        mutator.state.self.trapped = trapped
+        safest_score = get_safest_score(mutator, depth)
+
+        mutator.state.force_switch = force_switch
+        mutator.state.self.trapped = trapped
+        scores = select_best_move.get_move_combination_scores(mutator, depth, pruning=True)
+
+        self.assertEqual(expected_scores, scores)
+        self.assertEqual(expected_safest_score, safest_score)
+        return scores
+
+    def test_pruned_search_calculates_fewer_state_instructions(self):
+        select_best_move.get_move_set = mock.MagicMock(return_value=set())
+        self.state.self.active.moves.append({'id': 'dragondance', 'disabled': False, 'current_pp': 16})
+        self.state.self.active.moves.append({'id': 'thunderbolt', 'disabled': False, 'current_pp': 16})
+        self.state.opponent.active.moves.append({'id': 'thunderbolt', 'disabled': False, 'current_pp': 16})
+
+        with mock.patch.object(select_best_move, 'get_all_state_instructions', wraps=select_best_move.get_all_state_instructions) as m:
+            select_best_move.get_move_combination_scores(self.mutator, 3)
+            exhaustive_calls = m.call_count
+            m.reset_mock()
+            select_best_move.get_move_combination_scores(self.mutator, 3, pruning=True)
+            pruned_calls = m.call_count
+
+        self.assertLess(pruned_calls, exhaustive_calls)
+
+
+class TestIterativeDeepening(unittest.TestCase):
+    def setUp(self):
+        self.state = State(
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("pikachu", 100).to_dict()),
+                {
+                    "rattata": Pokemon.from_state_pokemon_dict(StatePokemon("rattata", 100).to_dict()),
+                },
+                defaultdict(lambda: 0),
+                False
+            ),
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("aromatisse", 81).to_dict()),
+                dict(),
+                defaultdict(lambda: 0),
+                False
+            ),
+            None,
+            None,
+            False,
+            False
+        )
+        self.state.self.active.moves = [
+            {
+                'id': 'return',
+                'disabled': False,
+                'current_pp': 16
+            },
+            {
+                'id': 'thunderbolt',
+                'disabled': False,
+                'current_pp': 16
+            }
+        ]
+        self.state.self.reserve['rattata'].moves = [
+            {
+                'id': 'tackle',
+                'disabled': False,
+                'current_pp': 16
+            }
+        ]
+        self.state.opponent.active.moves = [
+            {
+                'id': 'return',
+                'disabled': False,
+                'current_pp': 16
+            }
+        ]
+        self.mutator = StateMutator(self.state)
+
+        # ensure that the opposing pokemon has no moves from the data lookup
+        select_best_move.get_move_set = mock.MagicMock(return_value=set())
+
+    def test_large_time_budget_produces_the_same_scores_as_a_fixed_depth_search(self):
+        expected_scores = get_move_combination_scores(self.mutator, 2)
+
+        scores, depth = get_move_combination_scores_iterative(self.mutator, 1000, 2)
+
+        self.assertEqual(2, depth)
+        self.assertEqual(expected_scores, scores)
+
+    def test_first_depth_is_completed_when_there_is_no_time(self):
+        expected_scores = get_move_combination_scores(self.mutator, 1)
+
+        scores, depth = get_move_combination_scores_iterative(self.mutator, 0, 4)
+
+        self.assertEqual(1, depth)
+        self.assertEqual(expected_scores, scores)
+
+    def test_force_switch_is_restored_after_searching(self):
+        self.state.force_switch = True
+
+        scores, _ = get_move_combination_scores_iterative(self.mutator, 1000, 2)
+
+        self.assertTrue(self.state.force_switch)
+        self.assertEqual({('switch rattata', constants.DO_NOTHING_MOVE)}, set(scores))
+
+    @mock.patch('showdown.search.select_best_move.time')
+    def test_timing_out_part_way_through_a_depth_leaves_the_state_unchanged(self, time_mock):
+        # the clock jumps past the deadline after the first depth finishes and the second depth starts
+        time_mock.time.side_effect = [0, 0, 0, 0] + [100] * 1000
+        expected_hash = compute_state_hash(self.state)
+        expected_scores = get_move_combination_scores(self.mutator, 1)
+
+        scores, depth = get_move_combination_scores_iterative(self.mutator, 10, 3)
+
+        self.assertEqual(1, depth)
+        self.assertEqual(expected_scores, scores)
+        self.assertEqual(expected_hash, compute_state_hash(self.state))
+        self.assertEqual(expected_hash, self.mutator.state_hash)
+
+
 if __name__ == '__main__':
     unittest.main()
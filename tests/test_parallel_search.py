@@ -0,0 +1,117 @@
+import pickle
+import unittest
+import multiprocessing
+import concurrent.futures
+from unittest import mock
+
+from collections import defaultdict
+from showdown.search import select_best_move
+from showdown.search.select_best_move import get_move_combination_scores
+from showdown.search.parallel_search import get_move_combination_scores_parallel
+from showdown.search.objects import State
+from showdown.search.objects import Side
+from showdown.state.pokemon import Pokemon as StatePokemon
+from showdown.search.objects import Pokemon
+from showdown.search.state_mutator import StateMutator
+
+
+class TestParallelSearch(unittest.TestCase):
+    def setUp(self):
+        self.state = State(
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("pikachu", 100).to_dict()),
+                {
+                    "rattata": Pokemon.from_state_pokemon_dict(StatePokemon("rattata", 100).to_dict()),
+                },
+                defaultdict(int),
+                False
+            ),
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("aromatisse", 81).to_dict()),
+                dict(),
+                defaultdict(int),
+                False
+            ),
+            None,
+            None,
+            False,
+            False
+        )
+        self.state.self.active.moves = [
+            {
+                'id': 'return',
+                'disabled': False,
+                'current_pp': 16
+            },
+            {
+                'id': 'thunderbolt',
+                'disabled': False,
+                'current_pp': 16
+            }
+        ]
+        self.state.self.reserve['rattata'].moves = [
+            {
+                'id': 'tackle',
+                'disabled': False,
+                'current_pp': 16
+            }
+        ]
+        self.state.opponent.active.moves = [
+            {
+                'id': 'return',
+                'disabled': False,
+                'current_pp': 16
+            }
+        ]
+        self.mutator = StateMutator(self.state)
+
+        # ensure that the opposing pokemon has no moves from the data lookup
+        # the worker processes are forked so that they see this mock as well
+        get_move_set_patcher = mock.patch.object(select_best_move, 'get_move_set', return_value=set())
+        get_move_set_patcher.start()
+        self.addCleanup(get_move_set_patcher.stop)
+        self.executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=2,
+            mp_context=multiprocessing.get_context('fork')
+        )
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def test_state_can_be_pickled(self):
+        state = pickle.loads(pickle.dumps(self.state))
+
+        self.assertEqual(str(self.state), str(state))
+
+    def test_parallel_search_produces_the_same_scores_as_the_sequential_search(self):
+        expected_scores = get_move_combination_scores(self.mutator, 2)
+
+        scores = get_move_combination_scores_parallel(self.mutator, 2, self.executor)
+
+        self.assertEqual(expected_scores, scores)
+
+    def test_pruned_parallel_search_produces_the_same_scores_as_the_sequential_search(self):
+        expected_scores = get_move_combination_scores(self.mutator, 2)
+
+        scores = get_move_combination_scores_parallel(self.mutator, 2, self.executor, pruning=True)
+
+        self.assertEqual(expected_scores, scores)
+
+    def test_parallel_search_of_a_pokemon_with_a_fractional_hp(self):
+        self.state.opponent.active.hp -= 0.5
+        expected_scores = get_move_combination_scores(self.mutator, 2)
+
+        scores = get_move_combination_scores_parallel(self.mutator, 2, self.executor)
+
+        self.assertEqual(expected_scores, scores)
+
+    def test_parallel_search_with_force_switch_only_searches_switches(self):
+        self.state.force_switch = True
+
+        scores = get_move_combination_scores_parallel(self.mutator, 2, self.executor)
+
+        self.assertEqual({('switch rattata', 'splash')}, set(scores))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import asyncio
+import unittest
+import threading
+
+from showdown.search_service import SearchService
+from showdown.search.parallel_search import start_worker_battle
+from showdown.evaluate_state.evaluate_pokemon import evaluation_cache
+from showdown.search.find_state_instructions import damage_calculator
+
+
+def _fill_worker_caches():
+    start_worker_battle()
+    evaluation_cache.put('key', 1)
+    damage_calculator.cache.put('key', (1,))
+
+
+def _worker_cache_sizes():
+    start_worker_battle()
+    return len(evaluation_cache), len(damage_calculator.cache)
+
+
+class TestSearchService(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.search_service = SearchService("gen7ou", thread_count=1)
+
+    def tearDown(self):
+        self.search_service.shutdown()
+        self.loop.close()
+
+    def test_run_returns_the_result_of_the_function(self):
+        result = self.loop.run_until_complete(self.search_service.run(sum, [1, 2, 3]))
+
+        self.assertEqual(6, result)
+
+    def test_completed_searches_are_counted(self):
+        self.loop.run_until_complete(self.search_service.run(sum, [1, 2, 3]))
+        self.loop.run_until_complete(self.search_service.run(sum, [1, 2, 3]))
+
+        self.assertEqual(2, self.search_service.completed)
+        self.assertEqual(0, self.search_service.queue_depth)
+        self.assertEqual(0, self.search_service.in_progress)
+
+    def test_search_waiting_for_a_thread_is_counted_in_the_queue_depth(self):
+        release = threading.Event()
+        started = threading.Event()
+
+        def blocking_search():
+            started.set()
+            release.wait()
+
+        async def run_searches():
+            first = asyncio.ensure_future(self.search_service.run(blocking_search))
+            second = asyncio.ensure_future(self.search_service.run(blocking_search))
+            await asyncio.sleep(0)
+            await self.loop.run_in_executor(None, started.wait)
+
+            queue_depth = self.search_service.queue_depth
+            release.set()
+            await asyncio.gather(first, second)
+            return queue_depth
+
+        self.assertEqual(1, self.loop.run_until_complete(run_searches()))
+
+    def test_exception_from_the_function_is_raised_and_counted(self):
+        with self.assertRaises(ZeroDivisionError):
+            self.loop.run_until_complete(self.search_service.run(divmod, 1, 0))
+
+        self.assertEqual(1, self.search_service.completed)
+
+    def test_start_battle_empties_the_caches(self):
+        evaluation_cache.put('key', 1)
+        damage_calculator.cache.put('key', (1,))
+        self.search_service.start_battle()
+
+        self.assertEqual(0, len(evaluation_cache))
+        self.assertEqual(0, len(damage_calculator.cache))
+
+
+class TestSearchServiceWithProcesses(unittest.TestCase):
+    def setUp(self):
+        self.search_service = SearchService("gen7ou", thread_count=1, process_count=1)
+
+    def tearDown(self):
+        self.search_service.shutdown()
+
+    def test_worker_keeps_its_caches_during_a_battle(self):
+        self.search_service.start_battle()
+        self.search_service.process_pool.submit(_fill_worker_caches).result()
+
+        self.assertEqual((1, 1), self.search_service.process_pool.submit(_worker_cache_sizes).result())
+
+    def test_worker_empties_its_caches_when_a_battle_starts(self):
+        self.search_service.start_battle()
+        self.search_service.process_pool.submit(_fill_worker_caches).result()
+        self.search_service.start_battle()
+
+        self.assertEqual((0, 0), self.search_service.process_pool.submit(_worker_cache_sizes).result())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,6 +8,11 @@ from showdown.search.objects import State
 from showdown.search.objects import Side
 from showdown.search.objects import Pokemon
 from showdown.search.state_mutator import StateMutator
+from showdown.search.state_mutator import compile_instructions
+from showdown.search.transpose_instruction import TransposeInstruction
+from showdown.search.state_hash import compute_state_hash
+from showdown.search.state_hash import zobrist_key
+from showdown.search.state_hash import ZobristKeys
 
 
 class TestStatemutator(unittest.TestCase):
@@ -411,3 +416,217 @@ class TestStatemutator(unittest.TestCase):
         self.mutator.reverse(list_of_instructions)
 
         self.assertTrue(move[constants.DISABLED])
+
+    def test_disable_move_that_was_added_after_another_move_was_disabled(self):
+        self.state.self.active.moves = [{'id': 'return', 'disabled': False, 'current_pp': 16}]
+        self.mutator.apply([(constants.MUTATOR_DISABLE_MOVE, constants.SELF, "return")])
+        move = {'id': 'tackle', 'disabled': False, 'current_pp': 16}
+        self.state.self.active.moves.insert(0, move)
+
+        self.mutator.apply([(constants.MUTATOR_DISABLE_MOVE, constants.SELF, "tackle")])
+
+        self.assertTrue(move[constants.DISABLED])
+
+    def test_disabling_a_move_the_pokemon_does_not_have_raises_value_error(self):
+        self.state.self.active.moves = [{'id': 'return', 'disabled': False, 'current_pp': 16}]
+
+        with self.assertRaises(ValueError):
+            self.mutator.apply([(constants.MUTATOR_DISABLE_MOVE, constants.SELF, "tackle")])
+
+    def test_integer_and_float_amounts_keep_their_type(self):
+        self.mutator.apply([(constants.MUTATOR_DAMAGE, constants.SELF, 10.0)])
+        self.mutator.apply([(constants.MUTATOR_HEAL, constants.SELF, 10.0)])
+        self.assertIsInstance(self.state.self.active.hp, float)
+
+        self.state.self.active.hp = 100
+        self.mutator.rehash()
+        self.mutator.apply([(constants.MUTATOR_DAMAGE, constants.SELF, 10)])
+
+        self.assertIsInstance(self.state.self.active.hp, int)
+
+
+class TestStateMutatorHash(unittest.TestCase):
+    def setUp(self):
+        self.state = State(
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("pikachu", 100).to_dict()),
+                {
+                    "rattata": Pokemon.from_state_pokemon_dict(StatePokemon("rattata", 100).to_dict()),
+                    "charmander": Pokemon.from_state_pokemon_dict(StatePokemon("charmander", 100).to_dict()),
+                },
+                defaultdict(lambda: 0),
+                False
+            ),
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("pikachu", 100).to_dict()),
+                {
+                    "rattata": Pokemon.from_state_pokemon_dict(StatePokemon("rattata", 100).to_dict()),
+                    "charmander": Pokemon.from_state_pokemon_dict(StatePokemon("charmander", 100).to_dict()),
+                },
+                defaultdict(lambda: 0),
+                False
+            ),
+            None,
+            None,
+            False,
+            False
+        )
+        self.state.self.active.moves = [
+            {
+                'id': 'return',
+                'disabled': False,
+                'current_pp': 16
+            }
+        ]
+        self.mutator = StateMutator(self.state, check_hash=True)
+        self.instructions = [
+            (constants.MUTATOR_DAMAGE, constants.SELF, 25),
+            (constants.MUTATOR_HEAL, constants.OPPONENT, 10),
+            (constants.MUTATOR_BOOST, constants.SELF, constants.ATTACK, 2),
+            (constants.MUTATOR_UNBOOST, constants.OPPONENT, constants.SPEED, 1),
+            (constants.MUTATOR_APPLY_STATUS, constants.OPPONENT, constants.BURN),
+            (constants.MUTATOR_APPLY_VOLATILE_STATUS, constants.SELF, constants.CONFUSION),
+            (constants.MUTATOR_SIDE_START, constants.OPPONENT, constants.SPIKES, 1),
+            (constants.MUTATOR_DISABLE_MOVE, constants.SELF, "return"),
+            (constants.MUTATOR_ENABLE_MOVE, constants.SELF, "return"),
+            (constants.MUTATOR_REMOVE_VOLATILE_STATUS, constants.SELF, constants.CONFUSION),
+            (constants.MUTATOR_SWITCH, constants.SELF, "pikachu", "rattata"),
+            (constants.MUTATOR_DAMAGE, constants.SELF, 10),
+            (constants.MUTATOR_SIDE_END, constants.OPPONENT, constants.SPIKES, 1),
+            (constants.MUTATOR_REMOVE_STATUS, constants.OPPONENT, constants.BURN),
+        ]
+
+    def test_incremental_hash_matches_full_computation_after_applying_instructions(self):
+        self.mutator.apply(self.instructions)
+        self.assertEqual(compute_state_hash(self.state), self.mutator.state_hash)
+
+    def test_reversing_instructions_restores_the_original_hash(self):
+        original_hash = self.mutator.state_hash
+        self.mutator.apply(self.instructions)
+        self.mutator.reverse(self.instructions)
+
+        self.assertEqual(original_hash, self.mutator.state_hash)
+
+    def test_applying_instructions_changes_the_hash(self):
+        original_hash = self.mutator.state_hash
+        self.mutator.apply([(constants.MUTATOR_DAMAGE, constants.SELF, 1)])
+
+        self.assertNotEqual(original_hash, self.mutator.state_hash)
+
+    def test_different_instructions_reaching_the_same_state_have_the_same_hash(self):
+        self.mutator.apply([(constants.MUTATOR_DAMAGE, constants.SELF, 20)])
+        first_hash = self.mutator.state_hash
+        self.mutator.reverse([(constants.MUTATOR_DAMAGE, constants.SELF, 20)])
+
+        self.mutator.apply([(constants.MUTATOR_DAMAGE, constants.SELF, 30), (constants.MUTATOR_HEAL, constants.SELF, 10)])
+
+        self.assertEqual(first_hash, self.mutator.state_hash)
+
+    def test_switching_out_and_back_in_restores_the_hash(self):
+        original_hash = self.mutator.state_hash
+        self.mutator.apply([
+            (constants.MUTATOR_SWITCH, constants.SELF, "pikachu", "rattata"),
+            (constants.MUTATOR_SWITCH, constants.SELF, "rattata", "pikachu"),
+        ])
+
+        self.assertEqual(original_hash, self.mutator.state_hash)
+
+    def test_hash_is_deferred_until_accessed(self):
+        self.mutator.apply(self.instructions)
+        self.mutator.rehash()
+
+        self.assertEqual(compute_state_hash(self.state), self.mutator.state_hash)
+
+    def test_check_hash_raises_when_state_is_modified_outside_of_the_mutator(self):
+        self.mutator.state_hash
+        self.state.self.active.hp -= 1
+
+        with self.assertRaises(ValueError):
+            self.mutator.apply([(constants.MUTATOR_DAMAGE, constants.SELF, 1)])
+
+    def test_applying_compiled_instructions_matches_applying_instruction_tuples(self):
+        self.mutator.apply(self.instructions)
+        expected_hash = compute_state_hash(self.state)
+        self.mutator.reverse(self.instructions)
+
+        self.mutator.apply_compiled(compile_instructions(self.instructions))
+
+        self.assertEqual(expected_hash, compute_state_hash(self.state))
+        self.assertEqual(expected_hash, self.mutator.state_hash)
+
+    def test_reversing_compiled_instructions_restores_the_original_hash(self):
+        original_hash = self.mutator.state_hash
+        compiled_instructions = compile_instructions(self.instructions)
+        self.mutator.apply_compiled(compiled_instructions)
+        self.mutator.reverse_compiled(compiled_instructions)
+
+        self.assertEqual(original_hash, self.mutator.state_hash)
+        self.assertEqual(original_hash, compute_state_hash(self.state))
+
+    def test_zobrist_key_table_holds_the_key_of_each_feature(self):
+        keys = ZobristKeys(constants.SELF, 'pikachu', depth=2)
+
+        self.assertEqual(zobrist_key(constants.SELF, 'pikachu', constants.HITPOINTS, 100), keys[constants.HITPOINTS][100])
+        self.assertEqual(zobrist_key(constants.SELF, 'pikachu', constants.STATUS, None), keys[constants.STATUS][None])
+
+    def test_compiling_an_invalid_stat_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            compile_instructions([(constants.MUTATOR_BOOST, constants.SELF, 'not_a_stat', 1)])
+
+    def test_compiling_an_invalid_side_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            compile_instructions([(constants.MUTATOR_DAMAGE, 'not_a_side', 1)])
+
+    def test_compiled_instructions_are_updated_when_an_instruction_is_added(self):
+        instruction = TransposeInstruction(1, [(constants.MUTATOR_DAMAGE, constants.SELF, 1)], False)
+        instruction.compiled_instructions
+        instruction.add_instruction((constants.MUTATOR_HEAL, constants.SELF, 1))
+
+        self.assertEqual(compile_instructions(instruction.instructions), instruction.compiled_instructions)
+
+    def test_advance_to_leaves_the_state_with_the_instructions_applied(self):
+        self.mutator.apply(self.instructions)
+        expected_hash = compute_state_hash(self.state)
+        self.mutator.reverse(self.instructions)
+
+        self.mutator.advance_to(self.instructions)
+
+        self.assertEqual(expected_hash, compute_state_hash(self.state))
+
+    def test_advance_to_only_applies_instructions_after_the_common_prefix(self):
+        self.mutator.advance_to(self.instructions[:5])
+        applied = []
+        apply = self.mutator.apply
+        self.mutator.apply = lambda instructions: applied.extend(instructions) or apply(instructions)
+
+        self.mutator.advance_to(self.instructions[:8])
+
+        self.assertEqual(self.instructions[5:8], applied)
+
+    def test_advance_to_a_different_branch_reverses_to_the_common_prefix(self):
+        self.mutator.apply(self.instructions[:4])
+        expected_hash = compute_state_hash(self.state)
+        self.mutator.reverse(self.instructions[:4])
+
+        self.mutator.advance_to(self.instructions[:3] + [(constants.MUTATOR_DAMAGE, constants.OPPONENT, 5)])
+        self.mutator.advance_to(self.instructions[:4])
+
+        self.assertEqual(expected_hash, compute_state_hash(self.state))
+
+    def test_rollback_restores_the_checkpoint(self):
+        original_hash = self.mutator.state_hash
+        self.mutator.advance_to(self.instructions)
+        self.mutator.rollback()
+
+        self.assertEqual(original_hash, self.mutator.state_hash)
+        self.assertEqual(original_hash, compute_state_hash(self.state))
+        self.assertEqual((), self.mutator.cursor)
+
+    def test_advance_to_is_not_affected_by_the_instruction_list_changing_afterwards(self):
+        instructions = list(self.instructions[:3])
+        self.mutator.advance_to(instructions)
+        instructions.append(self.instructions[3])
+        self.mutator.advance_to(instructions)
+        self.mutator.rollback()
+
+        self.assertEqual(compute_state_hash(self.state), self.mutator.state_hash)
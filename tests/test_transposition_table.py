@@ -0,0 +1,186 @@
+import unittest
+from unittest import mock
+
+from collections import defaultdict
+from showdown.lru_cache import LRUCache
+from showdown.search import select_best_move
+from showdown.search.select_best_move import get_move_combination_scores
+from showdown.search.transposition_table import TranspositionTable
+from showdown.search.transposition_table import get_state_key
+from showdown.search.objects import State
+from showdown.search.objects import Side
+from showdown.state.pokemon import Pokemon as StatePokemon
+from showdown.search.objects import Pokemon
+from showdown.search.state_mutator import StateMutator
+
+
+class TestLRUCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = LRUCache(2)
+
+    def test_get_returns_stored_value(self):
+        self.cache.put('a', 1)
+        self.assertEqual(1, self.cache.get('a'))
+
+    def test_get_returns_default_for_missing_key(self):
+        self.assertIsNone(self.cache.get('a'))
+
+    def test_least_recently_used_item_is_evicted(self):
+        self.cache.put('a', 1)
+        self.cache.put('b', 2)
+        self.cache.get('a')
+        self.cache.put('c', 3)
+
+        self.assertIn('a', self.cache)
+        self.assertNotIn('b', self.cache)
+        self.assertEqual(1, self.cache.evictions)
+
+    def test_hits_and_misses_are_counted(self):
+        self.cache.put('a', 1)
+        self.cache.get('a')
+        self.cache.get('b')
+
+        self.assertEqual(1, self.cache.hits)
+        self.assertEqual(1, self.cache.misses)
+        self.assertEqual(0.5, self.cache.hit_rate)
+
+    def test_non_positive_size_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            LRUCache(0)
+
+    def test_items_are_evicted_when_the_cache_is_over_max_weight(self):
+        cache = LRUCache(10, max_weight=3)
+        cache.weigh = len
+        cache.put('a', [1, 2])
+        cache.put('b', [1, 2])
+
+        self.assertNotIn('a', cache)
+        self.assertEqual(2, cache.weight)
+
+    def test_replacing_an_item_updates_the_weight(self):
+        cache = LRUCache(10, max_weight=3)
+        cache.weigh = len
+        cache.put('a', [1, 2])
+        cache.put('a', [1])
+
+        self.assertEqual(1, cache.weight)
+
+
+class TestTranspositionTable(unittest.TestCase):
+    def setUp(self):
+        self.state = State(
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("pikachu", 100).to_dict()),
+                {
+                    "rattata": Pokemon.from_state_pokemon_dict(StatePokemon("rattata", 100).to_dict()),
+                },
+                defaultdict(lambda: 0),
+                False
+            ),
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("aromatisse", 81).to_dict()),
+                dict(),
+                defaultdict(lambda: 0),
+                False
+            ),
+            None,
+            None,
+            False,
+            False
+        )
+        self.state.self.active.moves = [
+            {
+                'id': 'return',
+                'disabled': False,
+                'current_pp': 16
+            },
+            {
+                'id': 'thunderbolt',
+                'disabled': False,
+                'current_pp': 16
+            }
+        ]
+        self.state.self.reserve['rattata'].moves = [
+            {
+                'id': 'tackle',
+                'disabled': False,
+                'current_pp': 16
+            }
+        ]
+        self.state.opponent.active.moves = [
+            {
+                'id': 'return',
+                'disabled': False,
+                'current_pp': 16
+            }
+        ]
+        self.mutator = StateMutator(self.state)
+
+        # ensure that the opposing pokemon has no moves from the data lookup
+        get_move_set_patcher = mock.patch.object(select_best_move, 'get_move_set', return_value=set())
+        get_move_set_patcher.start()
+        self.addCleanup(get_move_set_patcher.stop)
+
+    def test_state_key_does_not_depend_on_volatile_status_order(self):
+        self.state.self.active.volatile_status = {'confusion', 'leechseed'}
+        self.mutator.rehash()
+        first_key = get_state_key(self.mutator)
+
+        self.state.self.active.volatile_status = {'leechseed', 'confusion'}
+        self.mutator.rehash()
+        second_key = get_state_key(self.mutator)
+
+        self.assertEqual(first_key, second_key)
+
+    def test_state_key_does_not_depend_on_zero_side_conditions(self):
+        first_key = get_state_key(self.mutator)
+        self.state.self.side_conditions['reflect'] = 0
+        self.mutator.rehash()
+
+        self.assertEqual(first_key, get_state_key(self.mutator))
+
+    def test_state_key_changes_when_hp_changes(self):
+        first_key = get_state_key(self.mutator)
+        self.state.self.active.hp -= 1
+        self.mutator.rehash()
+
+        self.assertNotEqual(first_key, get_state_key(self.mutator))
+
+    def test_state_key_changes_when_force_switch_changes(self):
+        first_key = get_state_key(self.mutator)
+        self.state.force_switch = True
+
+        self.assertNotEqual(first_key, get_state_key(self.mutator))
+
+    def test_scores_are_stored_per_depth(self):
+        table = TranspositionTable(10)
+        table.store_scores(1, 1, {('a', 'b'): 10})
+
+        self.assertEqual({('a', 'b'): 10}, table.get_scores(1, 1))
+        self.assertIsNone(table.get_scores(1, 2))
+
+    def test_search_with_transposition_table_produces_the_same_scores(self):
+        expected_scores = get_move_combination_scores(self.mutator, 3)
+
+        table = TranspositionTable(1000)
+        scores = get_move_combination_scores(self.mutator, 3, transposition_table=table)
+
+        self.assertEqual(expected_scores, scores)
+
+    def test_search_with_transposition_table_reuses_transposed_states(self):
+        table = TranspositionTable(1000)
+        get_move_combination_scores(self.mutator, 3, transposition_table=table)
+
+        self.assertGreater(table.hits, 0)
+
+    def test_search_does_not_modify_the_state(self):
+        expected_key = get_state_key(self.mutator)
+
+        table = TranspositionTable(1000)
+        get_move_combination_scores(self.mutator, 3, transposition_table=table)
+
+        self.assertEqual(expected_key, get_state_key(self.mutator))
+
+
+if __name__ == '__main__':
+    unittest.main()
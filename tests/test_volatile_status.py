@@ -0,0 +1,53 @@
+import pickle
+import unittest
+
+import constants
+
+from showdown.state.pokemon import Pokemon as StatePokemon
+from showdown.search.objects import Pokemon
+from showdown.search.objects.volatile_status import VolatileStatusSet
+
+
+class TestVolatileStatusSet(unittest.TestCase):
+    def test_added_volatile_status_is_contained(self):
+        volatile_statuses = VolatileStatusSet()
+        volatile_statuses.add(constants.SUBSTITUTE)
+
+        self.assertIn(constants.SUBSTITUTE, volatile_statuses)
+        self.assertNotIn(constants.LEECH_SEED, volatile_statuses)
+
+    def test_removing_a_missing_volatile_status_raises_key_error(self):
+        with self.assertRaises(KeyError):
+            VolatileStatusSet().remove(constants.SUBSTITUTE)
+
+    def test_equals_a_set_of_the_same_names(self):
+        self.assertEqual({'confusion', 'leechseed'}, VolatileStatusSet(['leechseed', 'confusion']))
+
+    def test_mask_does_not_depend_on_insertion_order(self):
+        self.assertEqual(
+            VolatileStatusSet(['leechseed', 'confusion']).mask,
+            VolatileStatusSet(['confusion', 'leechseed']).mask
+        )
+
+    def test_copy_is_independent(self):
+        volatile_statuses = VolatileStatusSet(['confusion'])
+        copied = volatile_statuses.copy()
+        copied.add('leechseed')
+
+        self.assertEqual({'confusion'}, volatile_statuses)
+
+    def test_pickle_round_trips_by_name(self):
+        volatile_statuses = VolatileStatusSet(['confusion', 'leechseed'])
+
+        self.assertEqual(volatile_statuses, pickle.loads(pickle.dumps(volatile_statuses)))
+
+    def test_pokemon_converts_an_assigned_set(self):
+        pkmn = Pokemon.from_state_pokemon_dict(StatePokemon("pikachu", 100).to_dict())
+        pkmn.volatile_status = {'confusion'}
+
+        self.assertIsInstance(pkmn.volatile_status, VolatileStatusSet)
+        self.assertIn('confusion', pkmn.volatile_status)
+
+
+if __name__ == '__main__':
+    unittest.main()